@@ -0,0 +1,330 @@
+"""
+A long-lived process that lints and renders recipes for short-lived callers (editor
+integrations, pre-commit hooks), so they don't pay for imports, the schema download and
+validator construction on every call.
+
+The daemon listens on a Unix socket. Requests and responses are JSON objects, one per line:
+
+    {"command": "lint", "recipe": "/path/to/recipe.yaml"}
+    {"ok": true, "result": {"lints": [...], "hints": [...], "messages": [...]}}
+
+Commands are `ping`, `lint`, `render` (the recipe rendered by rattler-build for every
+variant, see `render.render`), `render_context` (only the Jinja context of the recipe
+evaluated, see `render_recipe_with_context`) and `shutdown`. Failed requests are answered
+with `{"ok": false, "error": "..."}`.
+
+`render` keeps conda-build imported and one conda-build `Config` per target platform, whose
+copies are used for every request, so the default and system variants are only set up once.
+
+The schema, its validator and the PyPI name mapping are kept in memory between requests and
+dropped every `cache_max_age` seconds, so a long-running daemon picks up upstream changes.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import json
+import logging
+import os
+import socket
+import socketserver
+import threading
+import time
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+from rattler_build_conda_compat import lint, lint_data
+from rattler_build_conda_compat.jinja.jinja import _shared_jinja_env, render_recipe_with_context
+from rattler_build_conda_compat.lint_rules import LintMessage, LintReport, lint_recipe
+from rattler_build_conda_compat.loader import load_yaml
+from rattler_build_conda_compat.remote_data import RemoteDataUnavailableError, cache_dir
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+logger = logging.getLogger(__name__)
+
+SOCKET_ENV = "RATTLER_BUILD_CONDA_COMPAT_SOCKET"
+CLIENT_TIMEOUT = 120.0
+# Seconds after which the remote lint data held in memory is loaded again.
+CACHE_MAX_AGE = float(lint_data.LINT_DATA_MAX_AGE)
+
+
+class DaemonError(Exception):
+    def __init__(self, message: str) -> None:
+        self.message = message
+        super().__init__(self.message)
+
+
+def default_socket_path() -> Path:
+    """`$RATTLER_BUILD_CONDA_COMPAT_SOCKET`, or `daemon.sock` in the cache directory."""
+    if configured := os.environ.get(SOCKET_ENV):
+        return Path(configured)
+    return cache_dir() / "daemon.sock"
+
+
+def _warm_up() -> None:
+    _shared_jinja_env()
+    try:
+        # conda-build is imported by `render`, and is optional for linting
+        from rattler_build_conda_compat import render  # noqa: F401
+    except ImportError as e:
+        logger.warning("Rendering is not available: %s", e)
+    try:
+        lint.get_recipe_schema_validator()
+        lint_data.get_linter_hints()
+    except RemoteDataUnavailableError as e:
+        logger.warning("Could not load remote lint data, will retry on the first lint: %s", e)
+
+
+def _clear_caches() -> None:
+    lint.get_recipe_schema.cache_clear()
+    lint.get_recipe_schema_validator.cache_clear()
+    lint_data.get_pypi_name_mapping.cache_clear()
+
+
+def _ping(server: DaemonServer, request: dict[str, Any]) -> Any:  # noqa: ARG001, ANN401
+    return {"pid": os.getpid(), "uptime": time.monotonic() - server.started_at}
+
+
+def _lint(server: DaemonServer, request: dict[str, Any]) -> Any:  # noqa: ARG001, ANN401
+    report = lint_recipe(request["recipe"], max_schema_errors=request.get("max_schema_errors"))
+    return {"lints": report.lints, "hints": report.hints, "messages": report.messages}
+
+
+def _render(server: DaemonServer, request: dict[str, Any]) -> Any:  # noqa: ANN401
+    from rattler_build_conda_compat.render import render
+
+    config = server.render_config(request.get("platform"), request.get("arch"))
+    rendered = render(request["recipe"], config=config, variants=request.get("variants"))
+    return [
+        {
+            "name": metadata.name(),
+            "version": metadata.version(),
+            "used_variant": metadata.get_used_variant(),
+            "recipe": metadata.meta.get("recipe"),
+        }
+        for metadata, _, _ in rendered
+    ]
+
+
+def _render_context(server: DaemonServer, request: dict[str, Any]) -> Any:  # noqa: ARG001, ANN401
+    return render_recipe_with_context(load_yaml(Path(request["recipe"]).read_text()))
+
+
+def _shutdown(server: DaemonServer, request: dict[str, Any]) -> Any:  # noqa: ARG001, ANN401
+    # `shutdown` waits for the serve loop, which waits for this request
+    threading.Thread(target=server.shutdown, daemon=True).start()
+    return {"stopping": True}
+
+
+COMMANDS: dict[str, Callable[[DaemonServer, dict[str, Any]], Any]] = {
+    "ping": _ping,
+    "lint": _lint,
+    "render": _render,
+    "render_context": _render_context,
+    "shutdown": _shutdown,
+}
+
+
+class _RequestHandler(socketserver.StreamRequestHandler):
+    server: DaemonServer
+
+    def handle(self) -> None:
+        for line in self.rfile:
+            if not line.strip():
+                continue
+            response = self.server.dispatch(line)
+            self.wfile.write(json.dumps(response).encode() + b"\n")
+            self.wfile.flush()
+
+
+class DaemonServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+    def __init__(self, socket_path: Path, cache_max_age: float = CACHE_MAX_AGE) -> None:
+        self.socket_path = socket_path
+        self.started_at = time.monotonic()
+        self.cache_max_age = cache_max_age
+        self.caches_loaded_at = self.started_at
+        self._cache_lock = threading.Lock()
+        # conda-build `Config` objects, by platform and arch
+        self._render_configs: dict[tuple[str | None, str | None], Any] = {}
+        self._render_config_lock = threading.Lock()
+        super().__init__(str(socket_path), _RequestHandler)
+
+    def render_config(self, platform: str | None, arch: str | None) -> Any:  # noqa: ANN401
+        """
+        A fresh copy of the conda-build config of `platform` and `arch` (by default those of
+        this machine). The config itself is set up once per daemon.
+        """
+        from rattler_build_conda_compat.render import get_or_merge_config
+
+        with self._render_config_lock:
+            config = self._render_configs.get((platform, arch))
+            if config is None:
+                overrides = {"platform": platform, "arch": arch}
+                config = get_or_merge_config(
+                    None, **{key: value for key, value in overrides.items() if value}
+                )
+                self._render_configs[(platform, arch)] = config
+        # `render` stores the variants of the recipe on the config
+        return config.copy()
+
+    def refresh_caches(self) -> None:
+        """Drop the remote lint data held in memory if it is older than `cache_max_age`."""
+        with self._cache_lock:
+            if time.monotonic() - self.caches_loaded_at < self.cache_max_age:
+                return
+            # requests that are running keep the objects they already got
+            _clear_caches()
+            self.caches_loaded_at = time.monotonic()
+
+    def dispatch(self, line: bytes) -> dict[str, Any]:
+        try:
+            request = json.loads(line)
+        except ValueError as e:
+            return {"id": None, "ok": False, "error": f"Invalid request: {e}"}
+
+        request_id = request.get("id")
+        command = COMMANDS.get(request.get("command"))
+        if command is None:
+            return {
+                "id": request_id,
+                "ok": False,
+                "error": f"Unknown command {request.get('command')!r}",
+            }
+
+        try:
+            self.refresh_caches()
+            return {"id": request_id, "ok": True, "result": command(self, request)}
+        except Exception as e:  # noqa: BLE001
+            logger.debug("Request failed", exc_info=True)
+            return {"id": request_id, "ok": False, "error": f"{type(e).__name__}: {e}"}
+
+    def server_close(self) -> None:
+        super().server_close()
+        with contextlib.suppress(FileNotFoundError):
+            self.socket_path.unlink()
+
+
+def _is_listening(socket_path: Path) -> bool:
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        try:
+            sock.connect(str(socket_path))
+        except OSError:
+            return False
+    return True
+
+
+def create_server(
+    socket_path: str | os.PathLike[str] | None = None, cache_max_age: float = CACHE_MAX_AGE
+) -> DaemonServer:
+    """
+    Warm up and bind the daemon, without serving yet. The remote lint data is loaded again
+    every `cache_max_age` seconds.
+
+    Raises:
+    -------
+    * `DaemonError` - If another daemon is listening on the socket already.
+    """
+    path = Path(socket_path) if socket_path is not None else default_socket_path()
+    if path.exists():
+        if _is_listening(path):
+            msg = f"A daemon is already listening on {path}"
+            raise DaemonError(msg)
+        # left behind by a daemon that did not shut down cleanly
+        path.unlink()
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    _warm_up()
+    return DaemonServer(path, cache_max_age)
+
+
+def serve(socket_path: str | os.PathLike[str] | None = None) -> None:
+    """Run the daemon until it receives a `shutdown` request."""
+    with create_server(socket_path) as server:
+        logger.info("Listening on %s", server.socket_path)
+        server.serve_forever()
+
+
+class DaemonClient:
+    """A client for the daemon. Every request opens a new connection."""
+
+    def __init__(
+        self, socket_path: str | os.PathLike[str] | None = None, timeout: float = CLIENT_TIMEOUT
+    ) -> None:
+        self.socket_path = Path(socket_path) if socket_path is not None else default_socket_path()
+        self.timeout = timeout
+
+    def request(self, command: str, **params: Any) -> Any:  # noqa: ANN401
+        """
+        Send a request and return its result.
+
+        Raises:
+        -------
+        * `DaemonError` - If the daemon is not running or the request failed.
+        """
+        try:
+            with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+                sock.settimeout(self.timeout)
+                sock.connect(str(self.socket_path))
+                with sock.makefile("rwb") as f:
+                    f.write(json.dumps({"command": command, **params}).encode() + b"\n")
+                    f.flush()
+                    line = f.readline()
+        except OSError as e:
+            msg = f"Could not talk to the daemon on {self.socket_path}: {e}"
+            raise DaemonError(msg) from e
+
+        if not line:
+            msg = "The daemon closed the connection without answering"
+            raise DaemonError(msg)
+        response = json.loads(line)
+        if not response["ok"]:
+            raise DaemonError(response["error"])
+        return response["result"]
+
+    def ping(self) -> bool:
+        try:
+            self.request("ping")
+        except DaemonError:
+            return False
+        return True
+
+    def lint(self, recipe_file: str | os.PathLike[str]) -> LintReport:
+        result = self.request("lint", recipe=os.path.abspath(recipe_file))
+        return LintReport([LintMessage(*message) for message in result["messages"]])
+
+    def render(
+        self,
+        recipe_file: str | os.PathLike[str],
+        platform: str | None = None,
+        arch: str | None = None,
+        variants: dict[str, Any] | None = None,
+    ) -> list[dict[str, Any]]:
+        """
+        Render the recipe with rattler-build, one result per rendered output and variant with
+        its `name`, `version`, `used_variant` and rendered `recipe`.
+        """
+        return self.request(
+            "render",
+            recipe=os.path.abspath(recipe_file),
+            platform=platform,
+            arch=arch,
+            variants=variants,
+        )
+
+    def render_context(self, recipe_file: str | os.PathLike[str]) -> dict[str, Any]:
+        """The recipe with its Jinja context evaluated, without running rattler-build."""
+        return self.request("render_context", recipe=os.path.abspath(recipe_file))
+
+    def shutdown(self) -> None:
+        self.request("shutdown")
+
+
+if __name__ == "__main__":
+    import sys
+
+    logging.basicConfig(level=logging.INFO)
+    serve(sys.argv[1] if len(sys.argv) > 1 else None)
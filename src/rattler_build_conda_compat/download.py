@@ -0,0 +1,402 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from http import HTTPStatus
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, List, NamedTuple, Union
+from urllib.parse import urlparse
+
+import requests
+
+from rattler_build_conda_compat.remote_data import atomic_write
+
+if TYPE_CHECKING:
+    from collections.abc import Sequence
+
+logger = logging.getLogger(__name__)
+
+UrlOrMirrors = Union[str, List[str]]
+
+# Seconds to wait for a mirror to start answering before the next one is raced against it.
+HEDGE_DELAY = 2.0
+DOWNLOAD_TIMEOUT = 100
+CHUNK_SIZE = 2**16
+RESUME_ATTEMPTS = 5
+
+
+class NoMirrorAvailableError(Exception):
+    def __init__(self, errors: list[str]) -> None:
+        self.errors = errors
+        self.message = "Could not download from any mirror:\n" + "\n".join(errors)
+        super().__init__(self.message)
+
+
+class MirrorMismatchError(Exception):
+    def __init__(self, digests: dict[str, str]) -> None:
+        self.digests = digests
+        self.message = "Mirrors serve different content:\n" + "\n".join(
+            f"{url}: {digest}" for url, digest in digests.items()
+        )
+        super().__init__(self.message)
+
+
+def _as_mirror_list(url: UrlOrMirrors) -> list[str]:
+    if isinstance(url, str):
+        return [url]
+    return list(url)
+
+
+def _open_stream(url: str, timeout: float) -> requests.Response:
+    response = requests.get(url, stream=True, timeout=timeout)
+    try:
+        response.raise_for_status()
+    except requests.HTTPError:
+        response.close()
+        raise
+    return response
+
+
+def _close_response(future: Future[requests.Response]) -> None:
+    if not future.cancelled() and future.exception() is None:
+        future.result().close()
+
+
+def hedged_get(  # noqa: C901
+    urls: Sequence[str],
+    *,
+    hedge_delay: float = HEDGE_DELAY,
+    timeout: float = DOWNLOAD_TIMEOUT,
+) -> requests.Response:
+    """
+    Open a streaming response for the first mirror that answers successfully.
+
+    The first URL is requested immediately. Whenever `hedge_delay` seconds pass without
+    an answer, or a mirror fails, the next URL is requested as well. The first successful
+    response wins; all other responses are closed as soon as they arrive.
+
+    Arguments:
+    ----------
+    * `urls` - The mirrors to race, in order of preference.
+    * `hedge_delay` - Seconds to wait before starting the next mirror.
+    * `timeout` - The timeout passed to `requests.get` for each mirror.
+
+    Returns:
+    --------
+    The winning `requests.Response`. The caller is responsible for closing it.
+    """
+    if not urls:
+        msg = "At least one URL is required"
+        raise ValueError(msg)
+
+    remaining = iter(urls)
+    pending: dict[Future[requests.Response], str] = {}
+    errors: list[str] = []
+    winner: requests.Response | None = None
+
+    executor = ThreadPoolExecutor(max_workers=len(urls))
+
+    def start_next() -> None:
+        url = next(remaining, None)
+        if url is not None:
+            pending[executor.submit(_open_stream, url, timeout)] = url
+
+    try:
+        start_next()
+        while pending and winner is None:
+            done, _ = wait(pending, timeout=hedge_delay, return_when=FIRST_COMPLETED)
+            if not done:
+                logger.debug("No mirror answered within %ss, starting the next one", hedge_delay)
+                start_next()
+                continue
+
+            for future in done:
+                url = pending.pop(future)
+                try:
+                    response = future.result()
+                except requests.RequestException as e:
+                    logger.debug("Mirror %s failed: %s", url, e)
+                    errors.append(f"{url}: {e}")
+                    start_next()
+                    continue
+
+                if winner is None:
+                    winner = response
+                else:
+                    response.close()
+    finally:
+        # the losers are still in flight, close them once they arrive
+        for future in pending:
+            future.add_done_callback(_close_response)
+        executor.shutdown(wait=False)
+
+    if winner is None:
+        raise NoMirrorAvailableError(errors)
+    return winner
+
+
+def _hash_response(response: requests.Response) -> str:
+    hasher = hashlib.sha256()
+    for chunk in response.iter_content(chunk_size=CHUNK_SIZE):
+        hasher.update(chunk)
+    return hasher.hexdigest()
+
+
+def _hash_single_url(url: str, timeout: float) -> str:
+    with _open_stream(url, timeout) as response:
+        return _hash_response(response)
+
+
+class SpooledDownload(NamedTuple):
+    path: Path
+    sha256: str
+
+
+def _spool_name(url: str) -> str:
+    basename = os.path.basename(urlparse(url).path) or "download"
+    url_hash = hashlib.sha256(url.encode()).hexdigest()[:16]
+    return f"{url_hash}-{basename}"
+
+
+def _read_json(path: Path) -> dict[str, Any] | None:
+    try:
+        with path.open() as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _write_json(path: Path, data: dict[str, Any]) -> None:
+    atomic_write(path, json.dumps(data).encode())
+
+
+def _hash_file(path: Path, hasher: Any) -> None:  # noqa: ANN401
+    with path.open("rb") as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+            hasher.update(chunk)
+
+
+def _content_range_start(response: requests.Response) -> int | None:
+    # Content-Range: bytes <start>-<end>/<size>
+    content_range = response.headers.get("Content-Range", "")
+    try:
+        return int(content_range.split()[1].split("-")[0])
+    except (IndexError, ValueError):
+        return None
+
+
+def _content_range_size(response: requests.Response) -> int | None:
+    # Content-Range: bytes */<size>, sent with `416 Range Not Satisfiable`
+    content_range = response.headers.get("Content-Range", "")
+    try:
+        return int(content_range.rsplit("/", 1)[1])
+    except (IndexError, ValueError):
+        return None
+
+
+def _validator(state: dict[str, Any]) -> str | None:
+    return state.get("etag") or state.get("last_modified")
+
+
+class _PartialDownload:
+    """The bookkeeping of a download into `<name>.part`, see `download_resumable`."""
+
+    def __init__(self, url: str, part: Path, state_file: Path) -> None:
+        self.url = url
+        self.part = part
+        self.state_file = state_file
+        self.state: dict[str, Any] = {"url": url}
+        self.hasher = hashlib.sha256()
+        self.offset = 0
+
+        state = _read_json(state_file)
+        if state is not None and state.get("url") == url and _validator(state) and part.exists():
+            # continue the hash over the prefix we already have
+            self.state = state
+            _hash_file(part, self.hasher)
+            self.offset = part.stat().st_size
+
+    def restart(self) -> None:
+        self.state = {"url": self.url}
+        self.hasher = hashlib.sha256()
+        self.offset = 0
+
+    def range_headers(self) -> dict[str, str]:
+        validator = _validator(self.state)
+        if not self.offset or not validator:
+            # without a validator the server could serve a different file by now
+            self.restart()
+            return {}
+        return {"Range": f"bytes={self.offset}-", "If-Range": validator}
+
+    def receive(self, response: requests.Response) -> None:
+        """Write the body of `response` to the partial file, restarting it if needed."""
+        if self.offset and response.status_code == requests.codes.range_not_satisfiable:
+            if _content_range_size(response) == self.offset:
+                # the partial file is complete, e.g. the connection broke after the last chunk
+                return
+            logger.debug("Cannot resume %s from %s bytes, restarting", self.url, self.offset)
+            self.restart()
+
+        response.raise_for_status()
+        if self.offset and (
+            response.status_code != requests.codes.partial_content
+            or _content_range_start(response) != self.offset
+        ):
+            # the server ignored the range or the file changed, start over
+            logger.debug("Cannot resume %s, restarting the download", self.url)
+            self.restart()
+
+        if not self.offset:
+            self.state = {
+                "url": self.url,
+                "etag": response.headers.get("ETag"),
+                "last_modified": response.headers.get("Last-Modified"),
+            }
+            _write_json(self.state_file, self.state)
+
+        with self.part.open("ab" if self.offset else "wb") as f:
+            for chunk in response.iter_content(chunk_size=CHUNK_SIZE):
+                f.write(chunk)
+                self.hasher.update(chunk)
+                self.offset += len(chunk)
+
+
+def _is_retryable(error: requests.RequestException) -> bool:
+    if isinstance(error, requests.HTTPError) and error.response is not None:
+        status = error.response.status_code
+        # a `416` restarts the partial download, see `_PartialDownload.receive`
+        return status >= HTTPStatus.INTERNAL_SERVER_ERROR or (
+            status == HTTPStatus.REQUESTED_RANGE_NOT_SATISFIABLE
+        )
+    return isinstance(
+        error,
+        (requests.ConnectionError, requests.Timeout, requests.exceptions.ChunkedEncodingError),
+    )
+
+
+def download_resumable(
+    url: str,
+    spool_dir: str | os.PathLike[str],
+    *,
+    max_attempts: int = RESUME_ATTEMPTS,
+    timeout: float = DOWNLOAD_TIMEOUT,
+) -> SpooledDownload:
+    """
+    Download `url` into `spool_dir`, resuming interrupted transfers with HTTP Range requests.
+
+    While downloading, the data is written to `<name>.part` and the validators of the
+    response (`ETag` / `Last-Modified`) are recorded in `<name>.part.json`. A later attempt,
+    in this call or in a later one, continues from the end of the partial file as long as
+    the server still serves the same file. Downloads without a validator are restarted from
+    zero instead, as there is no way to tell whether the file changed in between. The sha256
+    of the partial file is recomputed before continuing. Finished downloads are kept in the spool directory and are reused
+    without touching the network.
+
+    Arguments:
+    ----------
+    * `url` - The URL to download.
+    * `spool_dir` - The directory that holds partial and finished downloads.
+    * `max_attempts` - How many requests to make before giving up. Only connection errors,
+      timeouts and `5xx` responses are retried, other errors are raised right away.
+    * `timeout` - The timeout passed to `requests.get`.
+
+    Returns:
+    --------
+    The path of the finished download and its sha256 hex digest.
+    """
+    spool = Path(spool_dir)
+    spool.mkdir(parents=True, exist_ok=True)
+    target = spool / _spool_name(url)
+    done_file = target.with_name(target.name + ".json")
+    part = target.with_name(target.name + ".part")
+    state_file = target.with_name(target.name + ".part.json")
+
+    done = _read_json(done_file)
+    if done is not None and done.get("url") == url and target.exists():
+        return SpooledDownload(target, done["sha256"])
+
+    download = _PartialDownload(url, part, state_file)
+    last_error: requests.RequestException | None = None
+    for _ in range(max_attempts):
+        try:
+            with requests.get(
+                url, headers=download.range_headers(), stream=True, timeout=timeout
+            ) as response:
+                download.receive(response)
+        except requests.RequestException as e:
+            if not _is_retryable(e):
+                raise
+            logger.debug("Download of %s interrupted at %s bytes: %s", url, download.offset, e)
+            last_error = e
+            continue
+        break
+    else:
+        assert last_error is not None  # noqa: S101
+        raise last_error
+
+    os.replace(part, target)
+    digest = download.hasher.hexdigest()
+    _write_json(done_file, {"url": url, "sha256": digest})
+    state_file.unlink()
+    return SpooledDownload(target, digest)
+
+
+def remove_spooled_download(download: SpooledDownload) -> None:
+    """Remove a finished download and its bookkeeping from the spool directory."""
+    download.path.unlink()
+    download.path.with_name(download.path.name + ".json").unlink()
+
+
+def sha256_of_url(  # noqa: PLR0913
+    url: UrlOrMirrors,
+    *,
+    verify_mirrors: bool = False,
+    hedge_delay: float = HEDGE_DELAY,
+    timeout: float = DOWNLOAD_TIMEOUT,
+    spool_dir: str | os.PathLike[str] | None = None,
+    keep_download: bool = False,
+) -> str:
+    """
+    Download a file and return its `sha256` hex digest.
+
+    Arguments:
+    ----------
+    * `url` - A single URL, or a list of mirrors that serve the same file.
+    * `verify_mirrors` - Download from every mirror and raise a `MirrorMismatchError`
+      if they do not all serve the same content.
+    * `hedge_delay` - Seconds to wait for a mirror before racing the next one.
+    * `timeout` - The timeout passed to `requests.get` for each mirror.
+    * `spool_dir` - If set, download with `download_resumable` into this directory
+      instead of streaming. Mirrors are then tried one after another instead of being raced.
+    * `keep_download` - Keep the finished download in `spool_dir` for later steps.
+    """
+    urls = _as_mirror_list(url)
+
+    if verify_mirrors and len(urls) > 1:
+        with ThreadPoolExecutor(max_workers=len(urls)) as executor:
+            digests: dict[str, str] = dict(
+                zip(urls, executor.map(lambda u: _hash_single_url(u, timeout), urls))
+            )
+        if len(set(digests.values())) > 1:
+            raise MirrorMismatchError(digests)
+        return digests[urls[0]]
+
+    if spool_dir is not None:
+        errors = []
+        for mirror in urls:
+            try:
+                download = download_resumable(mirror, spool_dir, timeout=timeout)
+            except requests.RequestException as e:
+                errors.append(f"{mirror}: {e}")
+                continue
+            if not keep_download:
+                remove_spooled_download(download)
+            return download.sha256
+        raise NoMirrorAvailableError(errors)
+
+    with hedged_get(urls, hedge_delay=hedge_delay, timeout=timeout) as response:
+        return _hash_response(response)
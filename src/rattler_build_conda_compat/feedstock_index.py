@@ -0,0 +1,161 @@
+"""
+Discover the recipe format of many feedstock checkouts at once.
+
+`scan_feedstocks` classifies every feedstock below a root directory as `v1` (`recipe.yaml`),
+`legacy` (`meta.yaml`) or `mixed`, and keeps the result in a JSON index. On the next scan,
+only feedstocks whose directories changed are looked at again.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Literal, NamedTuple
+
+from rattler_build_conda_compat.remote_data import atomic_write, cache_dir
+from rattler_build_conda_compat.utils import IGNORED_DIRS, VALID_METAS, StatCache, _find_files
+
+RecipeFormat = Literal["v1", "legacy", "mixed", "none"]
+
+LEGACY_METAS = ("meta.yaml",)
+# scanning is mostly waiting for the file system
+MAX_WORKERS = 32
+INDEX_VERSION = 1
+
+
+class FeedstockInfo(NamedTuple):
+    path: str
+    format: RecipeFormat
+    # the v1 recipe if there is exactly one, otherwise the legacy one
+    recipe_path: str | None
+    # modification times of the feedstock and of every directory holding a recipe
+    mtimes: dict[str, float]
+    recipe_paths: list[str]
+
+
+def default_index_path() -> Path:
+    return cache_dir() / "feedstock-index.json"
+
+
+def _mtime(path: str) -> float | None:
+    try:
+        return os.stat(path).st_mtime
+    except OSError:
+        return None
+
+
+def classify_feedstock(
+    feedstock_dir: str | os.PathLike[str], ignores: tuple[str, ...] = IGNORED_DIRS
+) -> FeedstockInfo:
+    """Find the v1 and legacy recipes of a single feedstock."""
+    path = os.path.abspath(feedstock_dir)
+    stat_cache = StatCache()
+    recipes = sorted(_find_files(path, VALID_METAS, ignores, stat_cache))
+    legacy = sorted(_find_files(path, LEGACY_METAS, ignores, stat_cache))
+
+    recipe_format: RecipeFormat
+    if recipes and legacy:
+        recipe_format = "mixed"
+    elif recipes:
+        recipe_format = "v1"
+    elif legacy:
+        recipe_format = "legacy"
+    else:
+        recipe_format = "none"
+
+    # resolved like `find_recipe`: a single recipe, or the one at the top level
+    candidates = recipes or legacy
+    top_level = [c for c in candidates if os.path.dirname(c) == path]
+    recipe_path = None
+    if len(candidates) == 1:
+        recipe_path = candidates[0]
+    elif len(top_level) == 1:
+        recipe_path = top_level[0]
+
+    watched = {path, *(os.path.dirname(p) for p in recipes + legacy)}
+    recipe_dir = os.path.join(path, "recipe")
+    if os.path.isdir(recipe_dir):
+        watched.add(recipe_dir)
+    mtimes = {d: mtime for d in sorted(watched) if (mtime := _mtime(d)) is not None}
+    return FeedstockInfo(path, recipe_format, recipe_path, mtimes, recipes + legacy)
+
+
+def _is_current(info: FeedstockInfo) -> bool:
+    return all(_mtime(d) == mtime for d, mtime in info.mtimes.items())
+
+
+def load_index(index_path: str | os.PathLike[str] | None = None) -> dict[str, FeedstockInfo]:
+    """The feedstocks of the last scan, keyed by their absolute path."""
+    path = Path(index_path) if index_path is not None else default_index_path()
+    try:
+        with path.open() as f:
+            stored = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if stored.get("version") != INDEX_VERSION:
+        return {}
+    return {info[0]: FeedstockInfo(*info) for info in stored["feedstocks"]}
+
+
+def _store_index(index_path: Path, feedstocks: dict[str, FeedstockInfo]) -> None:
+    stored = {"version": INDEX_VERSION, "feedstocks": list(feedstocks.values())}
+    atomic_write(index_path, json.dumps(stored).encode())
+
+
+def scan_feedstocks(
+    root: str | os.PathLike[str],
+    *,
+    index_path: str | os.PathLike[str] | None = None,
+    max_workers: int = MAX_WORKERS,
+    ignores: tuple[str, ...] = IGNORED_DIRS,
+) -> dict[str, FeedstockInfo]:
+    """
+    Classify every feedstock (every directory) directly below `root`.
+
+    Feedstocks that are in the index and whose watched directories kept their modification
+    time are not scanned again. The others are scanned concurrently.
+
+    Arguments:
+    ----------
+    * `root` - The directory holding the feedstock checkouts.
+    * `index_path` - Where the index is kept. Defaults to `feedstock-index.json` in the cache
+      directory.
+    * `max_workers` - The number of feedstocks scanned at the same time.
+    * `ignores` - Directories that are not searched for recipes, see `find_recipe`.
+
+    Returns:
+    --------
+    The feedstocks below `root`, keyed by their absolute path.
+    """
+    index_path = Path(index_path) if index_path is not None else default_index_path()
+    index = load_index(index_path)
+
+    root = os.path.abspath(root)
+    with os.scandir(root) as entries:
+        feedstock_dirs = sorted(
+            entry.path
+            for entry in entries
+            if entry.is_dir() and entry.name not in ignores and not entry.name.startswith(".")
+        )
+
+    feedstocks = {}
+    stale = []
+    for feedstock_dir in feedstock_dirs:
+        info = index.get(feedstock_dir)
+        if info is not None and _is_current(info):
+            feedstocks[feedstock_dir] = info
+        else:
+            stale.append(feedstock_dir)
+
+    if stale:
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            for info in executor.map(lambda d: classify_feedstock(d, ignores), stale):
+                feedstocks[info.path] = info
+
+    # keep the entries of other roots
+    index = {path: info for path, info in index.items() if os.path.dirname(path) != root}
+    index.update(feedstocks)
+    _store_index(index_path, index)
+    return dict(sorted(feedstocks.items()))
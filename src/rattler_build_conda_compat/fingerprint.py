@@ -0,0 +1,97 @@
+"""
+A stable identity for a rendered variant, so that builds whose inputs did not change can be
+skipped. See `MetaData.fingerprint`.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import subprocess
+from functools import lru_cache
+from typing import Any
+
+from rattler_build_conda_compat.utils import IGNORED_DIRS
+
+FINGERPRINT_VERSION = 1
+FILE_DIGEST_CACHE_SIZE = 4096
+
+
+def _normalized_json(data: Any) -> bytes:  # noqa: ANN401
+    # sorted keys make the hash independent of the order of mappings
+    return json.dumps(data, sort_keys=True, separators=(",", ":"), default=str).encode()
+
+
+@lru_cache(maxsize=FILE_DIGEST_CACHE_SIZE)
+def _file_digest(path: str, mtime_ns: int, size: int) -> bytes:  # noqa: ARG001
+    # `mtime_ns` and `size` are part of the cache key, so changed files are hashed again
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.digest()
+
+
+def directory_digest(path: str | os.PathLike[str], ignores: tuple[str, ...] = IGNORED_DIRS) -> str:
+    """
+    A hash of the names and contents of all files below `path`. Unchanged files are not read
+    again on later calls.
+    """
+    digest = hashlib.sha256()
+    root = os.fspath(path)
+    stack = [root]
+    while stack:
+        directory = stack.pop()
+        with os.scandir(directory) as entries:
+            for entry in sorted(entries, key=lambda e: e.name):
+                if entry.name in ignores:
+                    continue
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append(entry.path)
+                elif entry.is_file():
+                    stat = entry.stat()
+                    relative = os.path.relpath(entry.path, root).replace(os.sep, "/")
+                    digest.update(relative.encode() + b"\0")
+                    digest.update(_file_digest(entry.path, stat.st_mtime_ns, stat.st_size))
+    return digest.hexdigest()
+
+
+@lru_cache(maxsize=None)
+def rattler_build_version() -> str:
+    """The output of `rattler-build --version`, or `unknown` if it cannot be run."""
+    try:
+        result = subprocess.run(  # noqa: S603
+            ["rattler-build", "--version"],  # noqa: S607
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+    return result.stdout.strip()
+
+
+def variant_fingerprint(
+    rendered_recipe: Any,  # noqa: ANN401
+    used_variant: dict[str, Any],
+    recipe_dir: str | os.PathLike[str],
+    tool_version: str | None = None,
+) -> str:
+    """
+    Hash everything a build of a rendered variant depends on.
+
+    Arguments:
+    ----------
+    * `rendered_recipe` - The rendered recipe of the variant.
+    * `used_variant` - Only the variant values the variant uses.
+    * `recipe_dir` - The recipe directory, including build scripts and patches.
+    * `tool_version` - Defaults to the version of the installed `rattler-build`.
+    """
+    if tool_version is None:
+        tool_version = rattler_build_version()
+    digest = hashlib.sha256(f"{FINGERPRINT_VERSION}:{tool_version}\0".encode())
+    digest.update(_normalized_json(rendered_recipe) + b"\0")
+    digest.update(_normalized_json(used_variant) + b"\0")
+    digest.update(directory_digest(recipe_dir).encode())
+    return digest.hexdigest()
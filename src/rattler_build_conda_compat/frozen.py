@@ -0,0 +1,107 @@
+"""
+Structural sharing for rendered recipes.
+
+The variants of a render mostly agree: `about`, `extra`, the sources and most requirements
+are the same for all of them. `share_rendered_recipes` interns all strings and replaces equal
+subtrees by a single read-only `FrozenDict` or `FrozenList`, so a render with hundreds of
+variants keeps one copy of every distinct subtree.
+
+`FrozenDict` and `FrozenList` are subclasses of `dict` and `list`, so code that checks for
+those types keeps working. Mutating them raises a `TypeError`.
+"""
+
+from __future__ import annotations
+
+import sys
+from typing import TYPE_CHECKING, Any, NoReturn
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+
+
+def _read_only(self: object, *args: object, **kwargs: object) -> NoReturn:  # noqa: ARG001
+    msg = f"{type(self).__name__} is read-only"
+    raise TypeError(msg)
+
+
+class FrozenDict(dict):  # type: ignore[type-arg]
+    """A read-only `dict`."""
+
+    __slots__ = ()
+
+    __setitem__ = __delitem__ = __ior__ = _read_only
+    clear = pop = popitem = setdefault = update = _read_only
+
+    def __copy__(self) -> FrozenDict:
+        return self
+
+    def __deepcopy__(self, memo: dict[int, Any]) -> FrozenDict:
+        return self
+
+    def __reduce__(self) -> tuple[type[FrozenDict], tuple[dict[Any, Any]]]:
+        return FrozenDict, (dict(self),)
+
+
+class FrozenList(list):  # type: ignore[type-arg]
+    """A read-only `list`."""
+
+    __slots__ = ()
+
+    __setitem__ = __delitem__ = __iadd__ = __imul__ = _read_only
+    append = extend = insert = pop = remove = clear = sort = reverse = _read_only
+
+    def __copy__(self) -> FrozenList:
+        return self
+
+    def __deepcopy__(self, memo: dict[int, Any]) -> FrozenList:
+        return self
+
+    def __reduce__(self) -> tuple[type[FrozenList], tuple[list[Any]]]:
+        return FrozenList, (list(self),)
+
+
+class TreeInterner:
+    """
+    Hash-conses JSON-like trees: equal subtrees passed to the same interner come back as
+    the same `FrozenDict` or `FrozenList` object.
+    """
+
+    def __init__(self) -> None:
+        self._nodes: dict[tuple[Any, ...], FrozenDict | FrozenList] = {}
+
+    @staticmethod
+    def _child_key(value: Any) -> Any:  # noqa: ANN401
+        if isinstance(value, (FrozenDict, FrozenList)):
+            # interned children are unique, so their identity stands for their content
+            return id(value)
+        # keep `1`, `1.0` and `True` apart
+        return type(value), value
+
+    def intern(self, value: Any) -> Any:  # noqa: ANN401
+        if isinstance(value, str):
+            return sys.intern(value)
+        if isinstance(value, dict):
+            items = [(self.intern(k), self.intern(v)) for k, v in value.items()]
+            key: tuple[Any, ...] = (dict, *((k, self._child_key(v)) for k, v in items))
+            node = self._nodes.get(key)
+            if node is None:
+                node = self._nodes[key] = FrozenDict(items)
+            return node
+        if isinstance(value, (list, tuple)):
+            children = [self.intern(v) for v in value]
+            key = (list, *(self._child_key(v) for v in children))
+            node = self._nodes.get(key)
+            if node is None:
+                node = self._nodes[key] = FrozenList(children)
+            return node
+        return value
+
+
+def share_rendered_recipes(rendered_recipes: Iterable[dict[str, Any]]) -> list[dict[str, Any]]:
+    """
+    Intern the rendered recipes of one render, see `TreeInterner`. The returned recipes are
+    plain dicts, so their top-level keys can still be set, but everything below is shared
+    and read-only.
+    """
+    interner = TreeInterner()
+    return [dict(interner.intern(rendered)) for rendered in rendered_recipes]
@@ -0,0 +1,158 @@
+from __future__ import annotations
+
+import os
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from http import HTTPStatus
+from typing import TYPE_CHECKING, Any, NamedTuple, TypeVar
+
+from rattler_build_conda_compat import instrumentation
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterable
+
+    import github
+
+# Existence of users and repositories rarely changes, keep answers for an hour.
+DEFAULT_TTL = 3600.0
+MAX_WORKERS = 16
+
+T = TypeVar("T")
+
+
+class _CacheEntry(NamedTuple):
+    expires_at: float
+    etag: str | None
+    value: Any
+
+
+class TTLCache:
+    """A thread-safe cache whose entries expire after `ttl` seconds, but keep their ETag."""
+
+    def __init__(self, ttl: float = DEFAULT_TTL) -> None:
+        self.ttl = ttl
+        self._entries: dict[Any, _CacheEntry] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: Any) -> _CacheEntry | None:  # noqa: ANN401
+        with self._lock:
+            return self._entries.get(key)
+
+    def set(self, key: Any, value: Any, etag: str | None = None) -> None:  # noqa: ANN401
+        with self._lock:
+            self._entries[key] = _CacheEntry(time.monotonic() + self.ttl, etag, value)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+# shared by all lookups of a process, so linting many recipes asks for each user once
+_shared_cache = TTLCache()
+_shared_executor: ThreadPoolExecutor | None = None
+_executor_lock = threading.Lock()
+
+
+def _default_executor() -> ThreadPoolExecutor:
+    global _shared_executor  # noqa: PLW0603
+    with _executor_lock:
+        if _shared_executor is None:
+            _shared_executor = ThreadPoolExecutor(
+                max_workers=MAX_WORKERS, thread_name_prefix="github-lookups"
+            )
+        return _shared_executor
+
+
+def _reset_after_fork() -> None:
+    # the threads of the executor are not copied into a forked child, and a lock held
+    # by one of them at the time of the fork would never be released
+    global _shared_executor, _executor_lock  # noqa: PLW0603
+    _shared_executor = None
+    _executor_lock = threading.Lock()
+    _shared_cache._lock = threading.Lock()  # noqa: SLF001
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+class PullRequestParticipants(NamedTuple):
+    author: str
+    commenters: set[str]
+
+
+class GitHubLookups:
+    """
+    Cached and concurrent read-only lookups against the GitHub API.
+
+    Existence checks are answered from a TTL cache. Expired entries are revalidated with
+    a conditional request, which GitHub answers with a `304` that does not count against
+    the rate limit.
+    """
+
+    def __init__(
+        self,
+        gh: github.Github,
+        *,
+        cache: TTLCache | None = None,
+        executor: ThreadPoolExecutor | None = None,
+    ) -> None:
+        self._gh = gh
+        self._cache = cache if cache is not None else _shared_cache
+        self.executor = executor if executor is not None else _default_executor()
+
+    def _exists(self, path: str, lookup: str) -> bool:
+        key = (self._gh.requester.base_url, path)
+        entry = self._cache.get(key)
+        if entry is not None and entry.expires_at > time.monotonic():
+            return entry.value
+
+        headers = {}
+        if entry is not None and entry.etag:
+            headers["If-None-Match"] = entry.etag
+
+        with instrumentation.timed("github", lookup):
+            status, response_headers, _ = self._gh.requester.requestJson(
+                "GET", path, headers=headers
+            )
+        if status == HTTPStatus.NOT_MODIFIED and entry is not None:
+            exists = entry.value
+        elif status == HTTPStatus.NOT_FOUND:
+            exists = False
+        elif status == HTTPStatus.OK:
+            exists = True
+        else:
+            from github import GithubException
+
+            raise GithubException(status, None, response_headers)
+
+        self._cache.set(key, exists, etag=response_headers.get("etag"))
+        return exists
+
+    def user_exists(self, login: str) -> bool:
+        return self._exists(f"/users/{login}", "user_exists")
+
+    def repo_exists(self, owner: str, repo: str) -> bool:
+        return self._exists(f"/repos/{owner}/{repo}", "repo_exists")
+
+    def path_exists(self, owner: str, repo: str, path: str) -> bool:
+        return self._exists(f"/repos/{owner}/{repo}/contents/{path}", "path_exists")
+
+    def users_exist(self, logins: Iterable[str]) -> dict[str, bool]:
+        """Check all `logins` concurrently."""
+        logins = list(logins)
+        return dict(zip(logins, self.executor.map(self.user_exists, logins)))
+
+    def pr_participants(self, repo: str, number: int) -> PullRequestParticipants:
+        """The author of a pull request and everyone who commented on or reviewed it."""
+        with instrumentation.timed("github", "pr_participants") as timer:
+            pull = self._gh.get_repo(repo).get_pull(number)
+            commenters = {comment.user.login for comment in pull.get_issue_comments()}
+            commenters.update(review.user.login for review in pull.get_reviews())
+            timer.results = len(commenters)
+        return PullRequestParticipants(pull.user.login, commenters)
+
+    def submit(self, fn: Callable[..., T], *args: Any) -> Future[T]:  # noqa: ANN401
+        """Run one of the lookups in the background."""
+        return self.executor.submit(fn, *args)
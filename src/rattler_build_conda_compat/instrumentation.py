@@ -0,0 +1,171 @@
+"""
+Opt-in timing and counters for linting.
+
+When enabled (with `enable()` or the `RATTLER_BUILD_CONDA_COMPAT_INSTRUMENT` environment
+variable), the lint rules, the functions of the conda-forge linter, schema validation, remote
+data fetches and GitHub API calls record their wall time, call count and result count. The totals can be exported as JSON, and hooks
+receive every single measurement.
+"""
+
+from __future__ import annotations
+
+import functools
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from typing import TYPE_CHECKING, Any, NamedTuple, TypeVar
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterator
+
+INSTRUMENT_ENV = "RATTLER_BUILD_CONDA_COMPAT_INSTRUMENT"
+
+T = TypeVar("T")
+F = TypeVar("F", bound="Callable[..., Any]")
+
+
+class Measurement(NamedTuple):
+    category: str
+    name: str
+    seconds: float
+    results: int
+
+
+@dataclass
+class Stats:
+    calls: int = 0
+    seconds: float = 0.0
+    results: int = 0
+
+
+_enabled = os.environ.get(INSTRUMENT_ENV, "").lower() in ("1", "true", "yes")
+_stats: dict[str, dict[str, Stats]] = {}
+_hooks: list[Callable[[Measurement], None]] = []
+_lock = threading.Lock()
+
+
+def enable() -> None:
+    global _enabled  # noqa: PLW0603
+    _enabled = True
+
+
+def disable() -> None:
+    global _enabled  # noqa: PLW0603
+    _enabled = False
+
+
+def is_enabled() -> bool:
+    return _enabled
+
+
+def reset() -> None:
+    """Forget all recorded totals."""
+    with _lock:
+        _stats.clear()
+
+
+def add_hook(hook: Callable[[Measurement], None]) -> None:
+    """Call `hook` with every measurement, e.g. to forward them to a profiler."""
+    _hooks.append(hook)
+
+
+def remove_hook(hook: Callable[[Measurement], None]) -> None:
+    _hooks.remove(hook)
+
+
+def record(category: str, name: str, seconds: float, results: int = 0) -> None:
+    if not _enabled:
+        return
+    with _lock:
+        stats = _stats.setdefault(category, {}).setdefault(name, Stats())
+        stats.calls += 1
+        stats.seconds += seconds
+        stats.results += results
+    measurement = Measurement(category, name, seconds, results)
+    for hook in _hooks:
+        hook(measurement)
+
+
+class _Timer:
+    __slots__ = ("results",)
+
+    def __init__(self) -> None:
+        self.results = 0
+
+
+@contextmanager
+def timed(category: str, name: str) -> Iterator[_Timer]:
+    """Time the block, which can set `results` on the yielded timer."""
+    timer = _Timer()
+    if not _enabled:
+        yield timer
+        return
+    start = time.perf_counter()
+    try:
+        yield timer
+    finally:
+        record(category, name, time.perf_counter() - start, timer.results)
+
+
+def timed_function(category: str) -> Callable[[F], F]:
+    """
+    Time every call of the decorated function under its name. A returned list (e.g. of
+    lints) is counted as the results.
+    """
+
+    def decorator(fn: F) -> F:
+        @functools.wraps(fn)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:  # noqa: ANN401
+            if not _enabled:
+                return fn(*args, **kwargs)
+            with timed(category, fn.__name__) as timer:
+                result = fn(*args, **kwargs)
+                if isinstance(result, list):
+                    timer.results = len(result)
+            return result
+
+        return wrapper  # type: ignore[return-value]
+
+    return decorator
+
+
+def timed_iter(category: str, name: str, iterator: Iterator[T]) -> Iterator[T]:
+    """
+    Yield from `iterator`, counting only the time spent producing items (and not the time
+    the consumer spends between them) and the number of items.
+    """
+    if not _enabled:
+        yield from iterator
+        return
+    seconds = 0.0
+    results = 0
+    try:
+        while True:
+            start = time.perf_counter()
+            try:
+                item = next(iterator)
+            except StopIteration:
+                seconds += time.perf_counter() - start
+                return
+            seconds += time.perf_counter() - start
+            results += 1
+            yield item
+    finally:
+        record(category, name, seconds, results)
+
+
+def report() -> dict[str, dict[str, dict[str, float]]]:
+    """The totals per category (`rule`, `lint`, `schema`, `network`, `github`) and name."""
+    with _lock:
+        return {
+            category: {name: asdict(stats) for name, stats in names.items()}
+            for category, names in _stats.items()
+        }
+
+
+def write_report(path: str | os.PathLike[str]) -> None:
+    with open(path, "w") as f:
+        json.dump(report(), f, indent=2, sort_keys=True)
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+from functools import lru_cache
 from typing import Any, TypedDict
 
 import jinja2
@@ -73,6 +74,12 @@ def jinja_env() -> SandboxedEnvironment:
     return env
 
 
+@lru_cache(maxsize=None)
+def _shared_jinja_env() -> SandboxedEnvironment:
+    # the environment is not modified after it is created, so every render can reuse it
+    return jinja_env()
+
+
 def load_recipe_context(context: dict[str, str], jinja_env: jinja2.Environment) -> dict[str, str]:
     """
     Load all string values from the context dictionary as Jinja2 templates.
@@ -106,7 +113,7 @@ def render_recipe_with_context(recipe_content: RecipeWithContext) -> dict[str, A
     >>>
     ```
     """
-    env = jinja_env()
+    env = _shared_jinja_env()
     context = recipe_content.get("context", {})
     # render out the context section and retrieve dictionary
     context_variables = load_recipe_context(context, env)
@@ -1,21 +1,52 @@
 # mypy: ignore-errors
 
+import importlib
+import json
 import re
 
 from inspect import cleandoc
 import os.path
-import tomli
-import github
-import ruamel.yaml
-from typing import Any, Dict, Mapping, Sequence, List
-import requests
-from conda.models.version import VersionOrder
+from typing import TYPE_CHECKING, Any, Dict, Iterator, Mapping, Optional, Sequence, List
 from functools import lru_cache
-from jsonschema import Draft202012Validator
-from jsonschema import ValidationError
 from textwrap import indent
 
-from rattler_build_conda_compat.loader import load_yaml
+from rattler_build_conda_compat import instrumentation
+from rattler_build_conda_compat.github_lookups import GitHubLookups
+from rattler_build_conda_compat.lint_data import conda_names_for_pypi_name, get_linter_hints
+from rattler_build_conda_compat.remote_data import RemoteDataUnavailableError, fetch_remote_data
+from rattler_build_conda_compat.requirement_spec import parse_requirement
+from rattler_build_conda_compat.yaml import _yaml_object
+
+# github, jsonschema and conda are imported where they are used, so that importing the
+# linter (e.g. only for the schema or the rules) stays cheap
+if TYPE_CHECKING:
+    from jsonschema import Draft202012Validator, ValidationError
+
+# the modules and names the linter used to import eagerly, still reachable as attributes
+_LAZY_MODULES = {
+    "github": "github",
+    "requests": "requests",
+    "ruamel": "ruamel.yaml",
+    "tomli": "tomli",
+}
+_LAZY_NAMES = {
+    "Draft202012Validator": "jsonschema",
+    "ValidationError": "jsonschema",
+    "VersionOrder": "conda.models.version",
+}
+
+
+def __getattr__(name: str) -> Any:
+    if name in _LAZY_MODULES:
+        importlib.import_module(_LAZY_MODULES[name])
+        value = importlib.import_module(name)
+    elif name in _LAZY_NAMES:
+        value = getattr(importlib.import_module(_LAZY_NAMES[name]), name)
+    else:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    globals()[name] = value
+    return value
+
 
 SCHEMA_URL = "https://raw.githubusercontent.com/prefix-dev/recipe-format/main/schema.json"
 
@@ -25,7 +56,7 @@ REQUIREMENTS_ORDER = ["build", "host", "run"]
 JINJA_VAR_PAT = re.compile(r"\${{(.*?)}}")
 
 
-def _format_validation_msg(error: ValidationError):
+def _format_validation_msg(error: "ValidationError"):
     return cleandoc(
         f"""
         In recipe.yaml: \n{indent(error.message, " " * 12 + "> ")}
@@ -35,24 +66,84 @@ def _format_validation_msg(error: ValidationError):
 
 @lru_cache
 def get_recipe_schema() -> Dict[Any, Any]:
-    return requests.get(SCHEMA_URL).json()
+    """
+    Load the recipe schema. It is kept in the on-disk cache of `remote_data`
+    and revalidated against GitHub, so offline workers can use the last known copy.
+    """
+    return json.loads(fetch_remote_data(SCHEMA_URL))
 
 
-def lint_recipe_yaml_by_schema(recipe_file):
-    schema = get_recipe_schema()
+@lru_cache
+def get_recipe_schema_validator() -> "Draft202012Validator":
+    """
+    Build the schema validator once per process and reuse it for every recipe.
+    """
+    from jsonschema import Draft202012Validator
+
+    with instrumentation.timed("schema", "build_validator"):
+        return Draft202012Validator(get_recipe_schema())
+
+
+def iter_recipe_yaml_schema_lints(
+    recipe_file,
+    max_errors: Optional[int] = None,
+    fail_fast: bool = False,
+    deduplicate: bool = False,
+) -> Iterator[str]:
+    """
+    Lazily validate the recipe against the schema and yield formatted errors.
+
+    Validation stops as soon as `max_errors` errors were yielded (or after the first one
+    with `fail_fast`), so badly broken recipes don't have to be validated completely.
+    With `deduplicate`, only the first error for each path in the schema is reported. By
+    default every error is reported, like `lint_recipe_yaml_by_schema` and `lint_recipe` do.
+    """
     yaml = _yaml_object()
 
     with open(recipe_file) as fh:
         meta = yaml.load(fh)
 
-    validator = Draft202012Validator(schema)
-    lints = []
+    yield from iter_schema_lints(
+        meta, max_errors=max_errors, fail_fast=fail_fast, deduplicate=deduplicate
+    )
 
-    for error in validator.iter_errors(meta):
-        lints.append(_format_validation_msg(error))
-    return lints
 
+def iter_schema_lints(
+    meta, max_errors: Optional[int] = None, fail_fast: bool = False, deduplicate: bool = False
+) -> Iterator[str]:
+    """
+    Like `iter_recipe_yaml_schema_lints`, for a recipe that is already loaded.
+    """
+    if fail_fast:
+        max_errors = 1
+    if max_errors is not None and max_errors <= 0:
+        return
+
+    validator = get_recipe_schema_validator()
+
+    seen_schema_paths = set()
+    yielded = 0
+    errors = instrumentation.timed_iter("schema", "validation", validator.iter_errors(meta))
+    for error in errors:
+        if deduplicate:
+            schema_path = tuple(error.absolute_schema_path)
+            if schema_path in seen_schema_paths:
+                continue
+            seen_schema_paths.add(schema_path)
+
+        yield _format_validation_msg(error)
+        yielded += 1
+        if max_errors is not None and yielded >= max_errors:
+            errors.close()
+            return
 
+
+@instrumentation.timed_function("lint")
+def lint_recipe_yaml_by_schema(recipe_file, max_errors: Optional[int] = None):
+    return list(iter_recipe_yaml_schema_lints(recipe_file, max_errors=max_errors))
+
+
+@instrumentation.timed_function("lint")
 def lint_about_contents(about_section, lints):
     for about_item in ["homepage", "license", "summary"]:
         # if the section doesn't exist, or is just empty, lint it.
@@ -60,6 +151,7 @@ def lint_about_contents(about_section, lints):
             lints.append("The {} item is expected in the about section." "".format(about_item))
 
 
+@instrumentation.timed_function("lint")
 def lint_recipe_maintainers(maintainers_section, lints):
     if not maintainers_section:
         lints.append(
@@ -71,6 +163,7 @@ def lint_recipe_maintainers(maintainers_section, lints):
         lints.append("Recipe maintainers should be a json list.")
 
 
+@instrumentation.timed_function("lint")
 def lint_recipe_tests(test_section=dict(), outputs_section=list()):
     TEST_KEYS = {"script", "python"}
     lints = []
@@ -100,18 +193,21 @@ def lint_recipe_tests(test_section=dict(), outputs_section=list()):
     return lints, hints
 
 
+@instrumentation.timed_function("lint")
 def lint_license_not_unknown(license: str, lints: List):
     license = license.lower()
     if "unknown" == license.strip():
         lints.append("The recipe license cannot be unknown.")
 
 
+@instrumentation.timed_function("lint")
 def lint_build_number(build_section: Dict, lints: List):
     build_number = build_section.get("number", None)
     if build_number is None:
         lints.append("The recipe must have a `build/number` section.")
 
 
+@instrumentation.timed_function("lint")
 def lint_requirements_order(requirements_section: Dict, lints: List):
     seen_requirements = [k for k in requirements_section if k in REQUIREMENTS_ORDER]
     requirements_order_sorted = sorted(seen_requirements, key=REQUIREMENTS_ORDER.index)
@@ -126,6 +222,7 @@ def lint_requirements_order(requirements_section: Dict, lints: List):
         )
 
 
+@instrumentation.timed_function("lint")
 def lint_package_version(package_section: dict, context_section: dict):
     package_ver = str(package_section.get("version"))
     context_ver = str(context_section.get("version"))
@@ -133,6 +230,8 @@ def lint_package_version(package_section: dict, context_section: dict):
         package_ver if package_ver is not None and not package_ver.startswith("$") else context_ver
     )
 
+    from conda.models.version import VersionOrder
+
     try:
         VersionOrder(ver)
 
@@ -140,6 +239,7 @@ def lint_package_version(package_section: dict, context_section: dict):
         return "Package version {} doesn't match conda spec".format(ver)
 
 
+@instrumentation.timed_function("lint")
 def lint_files_have_hash(sources_section: list, lints: list):
     for source_section in sources_section:
         if "url" in source_section and not ({"sha1", "sha256", "md5"} & set(source_section.keys())):
@@ -149,6 +249,7 @@ def lint_files_have_hash(sources_section: list, lints: list):
             )
 
 
+@instrumentation.timed_function("lint")
 def lint_legacy_compilers(build_reqs):
     if build_reqs and ("toolchain" in build_reqs):
         return """Using toolchain directly in this manner is deprecated. Consider
@@ -156,12 +257,14 @@ def lint_legacy_compilers(build_reqs):
             [here](https://conda-forge.org/docs/maintainer/knowledge_base.html#compilers)."""
 
 
+@instrumentation.timed_function("lint")
 def lint_has_recipe_file(about_section, lints):
     license_file = about_section.get("license_file", None)
     if not license_file:
         lints.append("license_file entry is missing, but is required.")
 
 
+@instrumentation.timed_function("lint")
 def lint_package_name(package_section: dict, context_section: dict):
     package_name = str(package_section.get("name"))
     context_name = str(context_section.get("name"))
@@ -176,6 +279,7 @@ def lint_package_name(package_section: dict, context_section: dict):
         return """Recipe name has invalid characters. only lowercase alpha, numeric, underscores, hyphens and dots allowed"""
 
 
+@instrumentation.timed_function("lint")
 def lint_legacy_patterns(requirements_section):
     lints = []
     build_reqs = requirements_section.get("build", None)
@@ -188,6 +292,15 @@ def lint_legacy_patterns(requirements_section):
     return lints
 
 
+def _noarch_selector_lint(noarch_value):
+    return (
+        "`noarch` packages can't have skips with selectors. If "
+        "the selectors are necessary, please remove "
+        "`noarch: {}`.".format(noarch_value)
+    )
+
+
+@instrumentation.timed_function("lint")
 def lint_usage_of_selectors_for_noarch(noarch_value, build_section, requirements_section):
     lints = []
     for section in requirements_section:
@@ -197,82 +310,101 @@ def lint_usage_of_selectors_for_noarch(noarch_value, build_section, requirements
             continue
 
         if any(isinstance(req, dict) for req in section_requirements):
-            lints.append(
-                "`noarch` packages can't have skips with selectors. If "
-                "the selectors are necessary, please remove "
-                "`noarch: {}`.".format(noarch_value)
-            )
+            lints.append(_noarch_selector_lint(noarch_value))
             break
 
     if "skip" in build_section:
-        lints.append(
-            "`noarch` packages can't have skips with selectors. If "
-            "the selectors are necessary, please remove "
-            "`noarch: {}`.".format(noarch_value)
-        )
+        lints.append(_noarch_selector_lint(noarch_value))
 
     return lints
 
 
-def lint_usage_of_single_space_in_pinned_requirements(requirements_section: dict):
-    def verify_requirement(requirement, section):
-        lints = []
-        if "${{" in requirement:
-            return lints
-        parts = requirement.split()
-        if len(parts) > 2 and parts[1] in [
-            "!=",
-            "=",
-            "==",
-            ">",
-            "<",
-            "<=",
-            ">=",
-        ]:
-            # check for too many spaces
-            lints.append(
-                (
-                    "``requirements: {section}: {requirement}`` should not "
-                    "contain a space between relational operator and the version, i.e. "
-                    "``{name} {pin}``"
-                ).format(
-                    section=section,
-                    requirement=requirement,
-                    name=parts[0],
-                    pin="".join(parts[1:]),
-                )
+def _lint_requirement_spacing(requirement, section):
+    lints = []
+    spec = parse_requirement(requirement)
+    if spec.is_jinja or not spec.tokens:
+        return lints
+    parts = spec.tokens
+    if len(parts) > 2 and parts[1] in [
+        "!=",
+        "=",
+        "==",
+        ">",
+        "<",
+        "<=",
+        ">=",
+    ]:
+        # check for too many spaces
+        lints.append(
+            (
+                "``requirements: {section}: {requirement}`` should not "
+                "contain a space between relational operator and the version, i.e. "
+                "``{name} {pin}``"
+            ).format(
+                section=section,
+                requirement=requirement,
+                name=parts[0],
+                pin="".join(parts[1:]),
             )
-            return lints
-        # check that there is a space if there is a pin
-        bad_char_idx = [(parts[0].find(c), c) for c in "><="]
-        bad_char_idx = [bci for bci in bad_char_idx if bci[0] >= 0]
-        if bad_char_idx:
-            bad_char_idx.sort()
-            i = bad_char_idx[0][0]
-            lints.append(
-                (
-                    "``requirements: {section}: {requirement}`` must "
-                    "contain a space between the name and the pin, i.e. "
-                    "``{name} {pin}``"
-                ).format(
-                    section=section,
-                    requirement=requirement,
-                    name=parts[0][:i],
-                    pin=parts[0][i:] + "".join(parts[1:]),
-                )
+        )
+        return lints
+    # check that there is a space if there is a pin
+    bad_char_idx = [(parts[0].find(c), c) for c in "><="]
+    bad_char_idx = [bci for bci in bad_char_idx if bci[0] >= 0]
+    if bad_char_idx:
+        bad_char_idx.sort()
+        i = bad_char_idx[0][0]
+        lints.append(
+            (
+                "``requirements: {section}: {requirement}`` must "
+                "contain a space between the name and the pin, i.e. "
+                "``{name} {pin}``"
+            ).format(
+                section=section,
+                requirement=requirement,
+                name=parts[0][:i],
+                pin=parts[0][i:] + "".join(parts[1:]),
             )
+        )
 
-        return lints
+    return lints
 
+
+@instrumentation.timed_function("lint")
+def lint_usage_of_single_space_in_pinned_requirements(requirements_section: dict):
     lints = []
     for section, requirements in requirements_section.items():
         if not requirements:
             continue
         for req in requirements:
-            lints.extend(verify_requirement(req, section))
+            lints.extend(_lint_requirement_spacing(req, section))
+    return lints
+
+
+def _lint_language_constraints(language, host_reqs, run_reqs):
+    lints = []
+    filtered_host_reqs = [
+        spec for spec in map(parse_requirement, host_reqs) if spec.name == language
+    ]
+    filtered_run_reqs = [spec for spec in map(parse_requirement, run_reqs) if spec.name == language]
+
+    if filtered_host_reqs and not filtered_run_reqs:
+        lints.append(f"If {language} is a host requirement, it should be a run requirement.")
+
+    for reqs in [filtered_host_reqs, filtered_run_reqs]:
+        if not any(spec.raw == language for spec in reqs):
+            for spec in reqs:
+                constraint = spec.constraint
+                if constraint is not None:
+                    if constraint.startswith(">") or constraint.startswith("<"):
+                        lints.append(
+                            f"Non noarch packages should have {language} requirement without any version constraints."
+                        )
+
     return lints
 
 
+@instrumentation.timed_function("lint")
 def lint_non_noarch_dont_constrain_python_and_rbase(requirements_section):
     check_languages = ["python", "r-base"]
     host_reqs = requirements_section.get("host") or []
@@ -281,26 +413,12 @@ def lint_non_noarch_dont_constrain_python_and_rbase(requirements_section):
     lints = []
 
     for language in check_languages:
-        filtered_host_reqs = [req for req in host_reqs if req.startswith(f"{language}")]
-        filtered_run_reqs = [req for req in run_reqs if req.startswith(f"{language}")]
-
-        if filtered_host_reqs and not filtered_run_reqs:
-            lints.append(f"If {language} is a host requirement, it should be a run requirement.")
-
-        for reqs in [filtered_host_reqs, filtered_run_reqs]:
-            if language not in reqs:
-                for req in reqs:
-                    split = req.split(" ", 1)
-                    if len(split) > 1:
-                        constraint = req.split(" ", 1)[1]
-                        if constraint.startswith(">") or constraint.startswith("<"):
-                            lints.append(
-                                f"Non noarch packages should have {language} requirement without any version constraints."
-                            )
+        lints.extend(_lint_language_constraints(language, host_reqs, run_reqs))
 
     return lints
 
 
+@instrumentation.timed_function("lint")
 def lint_variable_reference_should_have_space(recipe_dir, recipe_file):
     hints = []
     if recipe_dir is not None and os.path.exists(recipe_file):
@@ -324,11 +442,13 @@ def lint_variable_reference_should_have_space(recipe_dir, recipe_file):
     return hints
 
 
+@instrumentation.timed_function("lint")
 def lint_lower_bound_on_python(run_requirements, outputs_section):
     lints = []
     # if noarch_value == "python" and not outputs_section:
     for req in run_requirements:
-        if (req.strip().split()[0] == "python") and (req != "python"):
+        spec = parse_requirement(req)
+        if spec.name == "python" and spec.is_pinned:
             break
     else:
         lints.append(
@@ -337,8 +457,10 @@ def lint_lower_bound_on_python(run_requirements, outputs_section):
             "`python >=3.6` in **both** `host` and `run` but you should check "
             "upstream for the package's Python compatibility."
         )
+    return lints
 
 
+@instrumentation.timed_function("lint")
 def hint_pip_usage(build_section):
     hints = []
 
@@ -355,8 +477,7 @@ def hint_pip_usage(build_section):
     return hints
 
 
-def hint_noarch_usage(build_section, requirement_section: dict):
-    build_reqs = requirement_section.get("build", None)
+def _hint_noarch(build_reqs, has_skip, has_selectors):
     hints = []
     if (
         # move outside the call
@@ -368,28 +489,34 @@ def hint_noarch_usage(build_section, requirement_section: dict):
                 for b in build_reqs
             ]
         )
+        # only a bare `pip`, a pinned pip is not taken as a sign of a pure python package
         and ("pip" in build_reqs)
         # move outside the call
         # and (is_staged_recipes or not conda_forge)
+        and not has_skip
+        and not has_selectors
     ):
-        no_arch_possible = True
-        if "skip" in build_section:
-            no_arch_possible = False
+        hints.append(
+            "Whenever possible python packages should use noarch. "
+            "See https://conda-forge.org/docs/maintainer/knowledge_base.html#noarch-builds"
+        )
 
-        for _, section_requirements in requirement_section.items():
-            if any(isinstance(requirement, dict) for requirement in section_requirements):
-                no_arch_possible = False
-                break
+    return hints
 
-        if no_arch_possible:
-            hints.append(
-                "Whenever possible python packages should use noarch. "
-                "See https://conda-forge.org/docs/maintainer/knowledge_base.html#noarch-builds"
-            )
 
-    return hints
+@instrumentation.timed_function("lint")
+def hint_noarch_usage(build_section, requirement_section: dict):
+    has_selectors = any(
+        isinstance(requirement, dict)
+        for section_requirements in requirement_section.values()
+        for requirement in section_requirements or []
+    )
+    return _hint_noarch(
+        requirement_section.get("build", None), "skip" in build_section, has_selectors
+    )
 
 
+@instrumentation.timed_function("lint")
 def run_conda_forge_specific(
     recipe_dir,
     package_section,
@@ -401,7 +528,15 @@ def run_conda_forge_specific(
     lints = []
     hints = []
 
-    gh = github.Github(os.environ["GH_TOKEN"])
+    # the lookups below only read, so they don't need to be spaced out
+    import github
+
+    gh = github.Github(
+        os.environ["GH_TOKEN"],
+        base_url=os.environ.get("GITHUB_API_URL", github.Consts.DEFAULT_BASE_URL),
+        seconds_between_requests=None,
+    )
+    lookups = GitHubLookups(gh)
 
     # Fetch list of recipe maintainers
     maintainers = extra_section.get("recipe-maintainers", [])
@@ -409,27 +544,46 @@ def run_conda_forge_specific(
     recipe_dirname = os.path.basename(recipe_dir) if recipe_dir else "recipe"
     recipe_name = package_section.get("name", "").strip()
     is_staged_recipes = recipe_dirname != "recipe"
+    pr_number = os.environ.get("STAGED_RECIPES_PR_NUMBER")
 
-    # 1: Check that the recipe does not exist in conda-forge or bioconda
+    # Start all GitHub lookups at once, the checks below only collect the answers
     if is_staged_recipes and recipe_name:
-        cf = gh.get_user(os.getenv("GH_ORG", "conda-forge"))
+        org = os.getenv("GH_ORG", "conda-forge")
+        feedstock_lookups = [
+            (name, lookups.submit(lookups.repo_exists, org, "{}-feedstock".format(name)))
+            for name in dict.fromkeys(
+                [
+                    recipe_name,
+                    recipe_name.replace("-", "_"),
+                    recipe_name.replace("_", "-"),
+                ]
+            )
+        ]
+        bioconda_lookup = lookups.submit(
+            lookups.path_exists, "bioconda", "bioconda-recipes", "recipes/{}".format(recipe_name)
+        )
 
-        for name in set(
-            [
-                recipe_name,
-                recipe_name.replace("-", "_"),
-                recipe_name.replace("_", "-"),
-            ]
-        ):
-            try:
-                if cf.get_repo("{}-feedstock".format(name)):
+    # It's a team if there is a "/". Checking for existence is expensive. Skip for now
+    maintainer_lookups = [
+        (maintainer, lookups.submit(lookups.user_exists, maintainer))
+        for maintainer in maintainers
+        if "/" not in maintainer
+    ]
+
+    if is_staged_recipes and maintainers and pr_number:
+        participants_lookup = lookups.submit(
+            lookups.pr_participants, "conda-forge/staged-recipes", int(pr_number)
+        )
+
+    # 1: Check that the recipe does not exist in conda-forge or bioconda
+    if is_staged_recipes and recipe_name:
+        feedstock_exists = False
+        with instrumentation.timed("lint", "conda_forge_specific.existing_feedstock"):
+            for name, feedstock_lookup in feedstock_lookups:
+                if feedstock_lookup.result():
                     existing_recipe_name = name
                     feedstock_exists = True
                     break
-                else:
-                    feedstock_exists = False
-            except github.UnknownObjectException:
-                feedstock_exists = False
 
         if feedstock_exists and existing_recipe_name == recipe_name:
             lints.append("Feedstock with the same name exists in conda-forge.")
@@ -441,12 +595,9 @@ def run_conda_forge_specific(
                 )
             )
 
-        bio = gh.get_user("bioconda").get_repo("bioconda-recipes")
-        try:
-            bio.get_dir_contents("recipes/{}".format(recipe_name))
-        except github.UnknownObjectException:
-            pass
-        else:
+        with instrumentation.timed("lint", "conda_forge_specific.existing_bioconda_recipe"):
+            bioconda_recipe_exists = bioconda_lookup.result()
+        if bioconda_recipe_exists:
             hints.append(
                 "Recipe with the same name exists in bioconda: "
                 "please discuss with @conda-forge/bioconda-recipes."
@@ -464,28 +615,19 @@ def run_conda_forge_specific(
         if url:
             # get pypi name from  urls like "https://pypi.io/packages/source/b/build/build-0.4.0.tar.gz"
             pypi_name = url.split("/")[6]
-            mapping_request = requests.get(
-                "https://raw.githubusercontent.com/regro/cf-graph-countyfair/master/mappings/pypi/name_mapping.yaml"
-            )
-            if mapping_request.status_code == 200:
-                mapping_raw_yaml = mapping_request.content
-                mapping = load_yaml(mapping_raw_yaml)
-                for pkg in mapping:
-                    if pkg.get("pypi_name", "") == pypi_name:
-                        conda_name = pkg["conda_name"]
-                        hints.append(
-                            f"A conda package with same name ({conda_name}) already exists."
-                        )
+            try:
+                with instrumentation.timed("lint", "conda_forge_specific.existing_pypi_name"):
+                    conda_names = conda_names_for_pypi_name(pypi_name)
+            except RemoteDataUnavailableError:
+                conda_names = []
+            for conda_name in conda_names:
+                hints.append(f"A conda package with same name ({conda_name}) already exists.")
 
     # 2: Check that the recipe maintainers exists:
-    for maintainer in maintainers:
-        if "/" in maintainer:
-            # It's a team. Checking for existence is expensive. Skip for now
-            continue
-        try:
-            gh.get_user(maintainer)
-        except github.UnknownObjectException:
-            lints.append('Recipe maintainer "{}" does not exist'.format(maintainer))
+    with instrumentation.timed("lint", "conda_forge_specific.maintainers_exist"):
+        for maintainer, maintainer_lookup in maintainer_lookups:
+            if not maintainer_lookup.result():
+                lints.append('Recipe maintainer "{}" does not exist'.format(maintainer))
 
     # 3: if the recipe dir is inside the example dir
     if recipe_dir is not None and "recipes/example/" in recipe_dir:
@@ -516,35 +658,24 @@ def run_conda_forge_specific(
         else:
             run_reqs += _req
 
-    hints_toml_url = "https://raw.githubusercontent.com/conda-forge/conda-forge-pinning-feedstock/main/recipe/linter_hints/hints.toml"
-    hints_toml_req = requests.get(hints_toml_url)
-    if hints_toml_req.status_code != 200:
+    try:
+        with instrumentation.timed("lint", "conda_forge_specific.linter_hints"):
+            specific_hints = get_linter_hints()
+    except RemoteDataUnavailableError:
         # too bad, but not important enough to throw an error;
         # linter will rerun on the next commit anyway
         return
-    hints_toml_str = hints_toml_req.content.decode("utf-8")
-    specific_hints = tomli.loads(hints_toml_str)["hints"]
 
     for rq in build_reqs + host_reqs + run_reqs:
-        dep = rq.split(" ")[0].strip()
+        dep = parse_requirement(rq).name
         if dep in specific_hints and specific_hints[dep] not in hints:
             hints.append(specific_hints[dep])
 
     # 6: Check if all listed maintainers have commented:
-    pr_number = os.environ.get("STAGED_RECIPES_PR_NUMBER")
-
     if is_staged_recipes and maintainers and pr_number:
-        # Get PR details using GitHub API
-        current_pr = gh.get_repo("conda-forge/staged-recipes").get_pull(int(pr_number))
-
-        # Get PR author, issue comments, and review comments
-        pr_author = current_pr.user.login
-        issue_comments = current_pr.get_issue_comments()
-        review_comments = current_pr.get_reviews()
-
-        # Combine commenters from both issue comments and review comments
-        commenters = {comment.user.login for comment in issue_comments}
-        commenters.update({review.user.login for review in review_comments})
+        # PR author and everyone who left an issue comment or a review
+        with instrumentation.timed("lint", "conda_forge_specific.maintainers_confirmed"):
+            pr_author, commenters = participants_lookup.result()
 
         # Check if all maintainers have either commented or are the PR author
         non_participating_maintainers = set()
@@ -0,0 +1,79 @@
+"""
+Lint many recipes at once on a pool of worker processes.
+
+Every worker builds the schema validator once, when it starts, and then lints recipe after
+recipe with that warm state.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import TYPE_CHECKING
+
+from rattler_build_conda_compat import lint
+from rattler_build_conda_compat.lint_rules import LintMessage, LintReport, lint_recipe
+from rattler_build_conda_compat.parallel import imap_unordered
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Iterator
+
+logger = logging.getLogger(__name__)
+
+# recipes handed to every worker ahead of time, so workers never wait for the next one
+QUEUE_DEPTH = 4
+
+
+def _warm_up() -> None:
+    # an exception in a pool initializer breaks the whole pool, if the schema can't be
+    # loaded now it is loaded (or its error reported) by the first recipe instead
+    try:
+        lint.get_recipe_schema_validator()
+    except Exception:  # noqa: BLE001
+        logger.debug("Could not build the schema validator, will retry per recipe", exc_info=True)
+
+
+def _lint_one(recipe_file: str, max_schema_errors: int | None) -> tuple[str, LintReport]:
+    try:
+        report = lint_recipe(recipe_file, max_schema_errors=max_schema_errors)
+    except Exception as e:  # noqa: BLE001
+        report = LintReport([LintMessage("lint", "load", f"Could not lint {recipe_file}: {e}")])
+    return recipe_file, report
+
+
+def lint_many(
+    recipe_files: Iterable[str | os.PathLike[str]],
+    max_workers: int | None = None,
+    max_schema_errors: int | None = None,
+) -> Iterator[tuple[str, LintReport]]:
+    """
+    Lint `recipe_files` in parallel and yield `(recipe_file, report)` as soon as each
+    recipe is done, so results arrive in completion order rather than input order.
+
+    A recipe that cannot be linted at all (e.g. invalid YAML) gets a report with a single
+    lint from the `load` rule instead of aborting the whole batch.
+
+    Arguments:
+    ----------
+    * `recipe_files` - The paths of the `recipe.yaml` files. They are consumed lazily.
+    * `max_workers` - The number of worker processes. Defaults to the number of CPUs.
+      With `1`, the recipes are linted in this process.
+    * `max_schema_errors` - Stop the schema validation of a recipe after this many errors.
+    """
+    recipe_files = (os.fspath(recipe_file) for recipe_file in recipe_files)
+    if max_workers is None:
+        max_workers = os.cpu_count() or 1
+
+    # fetch remote data once here, forked workers inherit it and others find it cached on disk
+    _warm_up()
+
+    if max_workers == 1:
+        for recipe_file in recipe_files:
+            yield _lint_one(recipe_file, max_schema_errors)
+        return
+
+    with ProcessPoolExecutor(max_workers=max_workers, initializer=_warm_up) as executor:
+        yield from imap_unordered(
+            executor, _lint_one, recipe_files, max_workers * QUEUE_DEPTH, max_schema_errors
+        )
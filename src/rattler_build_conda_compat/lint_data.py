@@ -0,0 +1,87 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+from functools import lru_cache
+from typing import Dict, List
+
+from ruamel.yaml import YAML
+
+from rattler_build_conda_compat.remote_data import atomic_write, cached_path, fetch_remote_data
+
+logger = logging.getLogger(__name__)
+
+NAME_MAPPING_URL = "https://raw.githubusercontent.com/regro/cf-graph-countyfair/master/mappings/pypi/name_mapping.yaml"
+HINTS_URL = "https://raw.githubusercontent.com/conda-forge/conda-forge-pinning-feedstock/main/recipe/linter_hints/hints.toml"
+
+# Seconds for which remote lint data is used without asking the server whether it changed.
+LINT_DATA_MAX_AGE = 3600
+
+PypiNameMapping = Dict[str, List[str]]
+
+
+def _parse_name_mapping(raw: bytes) -> PypiNameMapping:
+    # the safe loader uses the C extension when available and skips the
+    # comment and formatting bookkeeping of the round-trip loader
+    yaml = YAML(typ="safe")
+    index: PypiNameMapping = {}
+    for pkg in yaml.load(raw) or []:
+        pypi_name = pkg.get("pypi_name")
+        conda_name = pkg.get("conda_name")
+        if pypi_name and conda_name:
+            index.setdefault(pypi_name, []).append(conda_name)
+    return index
+
+
+@lru_cache(maxsize=None)
+def get_pypi_name_mapping() -> PypiNameMapping:
+    """
+    Map PyPI names to the conda packages that provide them.
+
+    The mapping is built from the cf-graph `name_mapping.yaml`, which is revalidated with a
+    conditional request. The parsed index is stored next to the cached YAML file, so the YAML
+    only has to be parsed again when it changed upstream.
+    """
+    raw = fetch_remote_data(NAME_MAPPING_URL, max_age=LINT_DATA_MAX_AGE)
+    raw_sha256 = hashlib.sha256(raw).hexdigest()
+
+    index_path = cached_path(NAME_MAPPING_URL).with_suffix(".index.json")
+    try:
+        with index_path.open() as f:
+            stored = json.load(f)
+        if stored["sha256"] == raw_sha256:
+            return stored["index"]
+    except (OSError, ValueError, KeyError):
+        pass
+
+    index = _parse_name_mapping(raw)
+    try:
+        atomic_write(index_path, json.dumps({"sha256": raw_sha256, "index": index}).encode())
+    except OSError as e:
+        # like the rest of the cache, the stored index is only an optimization
+        logger.debug("Could not store the PyPI name mapping index: %s", e)
+    return index
+
+
+def conda_names_for_pypi_name(pypi_name: str) -> list[str]:
+    """The conda packages that provide `pypi_name`, in the order of the mapping file."""
+    return get_pypi_name_mapping().get(pypi_name, [])
+
+
+@lru_cache(maxsize=4)
+def _parse_hints(raw: bytes) -> dict[str, str]:
+    import tomli
+
+    return tomli.loads(raw.decode("utf-8"))["hints"]
+
+
+def get_linter_hints() -> dict[str, str]:
+    """
+    The package-specific hints of conda-forge, keyed by dependency name
+    (e.g. depend on `matplotlib-base` instead of `matplotlib`).
+
+    `hints.toml` is fetched at most once every `LINT_DATA_MAX_AGE` seconds, and is only
+    parsed again when it changed.
+    """
+    return _parse_hints(fetch_remote_data(HINTS_URL, max_age=LINT_DATA_MAX_AGE))
@@ -0,0 +1,522 @@
+"""
+A lint engine that walks a recipe once and dispatches every node to the rules that want it.
+
+Rules are registered with `register_rule` and declare the node kinds they are interested
+in. The engine visits the top-level recipe and every output in a single pass, so adding a
+rule does not add another traversal of the recipe.
+"""
+
+from __future__ import annotations
+
+import os
+import time
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any, ClassVar, Iterable, NamedTuple, TypeVar
+
+from rattler_build_conda_compat import instrumentation, lint
+from rattler_build_conda_compat.conditional_list import visit_conditional_list
+from rattler_build_conda_compat.requirement_spec import RequirementSpec, parse_requirement
+from rattler_build_conda_compat.yaml import _yaml_object
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Mapping
+
+T = TypeVar("T")
+
+# The kinds of nodes the engine dispatches, in the order they are visited within a scope.
+NODE_KINDS = (
+    "recipe",
+    "output",
+    "context",
+    "package",
+    "build",
+    "about",
+    "extra",
+    "source",
+    "requirements",
+    "conditional_requirement",
+    "requirement",
+    "test",
+)
+
+
+class LintMessage(NamedTuple):
+    kind: str
+    rule: str
+    message: str
+    output: str | None = None
+
+
+@dataclass
+class LintReport:
+    """All messages of a lint run, in the order they were found."""
+
+    messages: list[LintMessage] = field(default_factory=list)
+
+    def _unique(self, kind: str) -> list[str]:
+        return list(dict.fromkeys(m.message for m in self.messages if m.kind == kind))
+
+    @property
+    def lints(self) -> list[str]:
+        return self._unique("lint")
+
+    @property
+    def hints(self) -> list[str]:
+        return self._unique("hint")
+
+
+@dataclass(eq=False)
+class Scope:
+    """The top-level recipe or one of its outputs."""
+
+    recipe: Mapping[str, Any]
+    parent: Scope | None = None
+    # the requirement strings of every section (`build`, `host`, ...), collected by the walker
+    # once for all rules that look at them in `leave_scope`
+    requirements: dict[str, list[str]] = field(default_factory=dict)
+    has_conditional_requirements: bool = False
+
+    @property
+    def is_output(self) -> bool:
+        return self.parent is not None
+
+    @property
+    def name(self) -> str | None:
+        if not self.is_output:
+            return None
+        return (self.recipe.get("package") or {}).get("name")
+
+    @property
+    def build(self) -> Mapping[str, Any]:
+        return self.recipe.get("build") or {}
+
+    @property
+    def noarch(self) -> str | None:
+        """The `noarch` value of the scope, outputs inherit it from the top-level recipe."""
+        noarch = self.build.get("noarch")
+        if noarch is None and self.parent is not None:
+            return self.parent.noarch
+        return noarch
+
+
+class Node(NamedTuple):
+    kind: str
+    value: Any
+    scope: Scope
+    # the requirements section (`build`, `host`, ...) of requirement nodes
+    section: str | None = None
+
+    @property
+    def requirement(self) -> RequirementSpec:
+        """The parsed requirement of a `requirement` node, shared by all rules."""
+        return parse_requirement(self.value)
+
+
+class LintRule:
+    """
+    Base class of all rules.
+
+    A fresh instance is created for every lint run, so rules can keep state across nodes and
+    report it once a scope is complete in `leave_scope`.
+    """
+
+    name: ClassVar[str]
+    kind: ClassVar[str] = "lint"
+    node_kinds: ClassVar[tuple[str, ...]] = ()
+
+    def visit(self, node: Node, report: LintReport) -> None:
+        pass
+
+    def leave_scope(self, scope: Scope, report: LintReport) -> None:
+        pass
+
+    def emit(self, report: LintReport, messages: Iterable[str] | str | None, scope: Scope) -> None:
+        if not messages:
+            return
+        if isinstance(messages, str):
+            messages = [messages]
+        report.messages.extend(
+            LintMessage(self.kind, self.name, message, scope.name) for message in messages
+        )
+
+
+_registry: dict[str, type[LintRule]] = {}
+
+
+def register_rule(rule: type[LintRule]) -> type[LintRule]:
+    """Class decorator that adds a rule to the rules run by default."""
+    if rule.name in _registry:
+        msg = f"A lint rule named {rule.name!r} is already registered"
+        raise ValueError(msg)
+    unknown = set(rule.node_kinds) - set(NODE_KINDS)
+    if unknown:
+        msg = f"Lint rule {rule.name!r} asks for unknown node kinds: {sorted(unknown)}"
+        raise ValueError(msg)
+    _registry[rule.name] = rule
+    return rule
+
+
+def registered_rules() -> list[type[LintRule]]:
+    return list(_registry.values())
+
+
+def _instrumented(
+    name: str, fn: Callable[[T, LintReport], None]
+) -> Callable[[T, LintReport], None]:
+    def wrapper(arg: T, report: LintReport) -> None:
+        before = len(report.messages)
+        start = time.perf_counter()
+        try:
+            fn(arg, report)
+        finally:
+            instrumentation.record(
+                "rule", name, time.perf_counter() - start, len(report.messages) - before
+            )
+
+    return wrapper
+
+
+class _Walker:
+    def __init__(self, rules: list[LintRule], report: LintReport) -> None:
+        self.report = report
+        self.handlers: dict[str, list[Callable[[Node, LintReport], None]]] = defaultdict(list)
+        self.leave_handlers: list[Callable[[Scope, LintReport], None]] = []
+        # wrapping is decided once per run, so uninstrumented runs pay nothing per node
+        instrument = instrumentation.is_enabled()
+        for rule in rules:
+            visit: Callable[[Node, LintReport], None] = rule.visit
+            leave_scope: Callable[[Scope, LintReport], None] = rule.leave_scope
+            if instrument:
+                visit = _instrumented(rule.name, visit)
+                leave_scope = _instrumented(rule.name, leave_scope)
+            for kind in rule.node_kinds:
+                self.handlers[kind].append(visit)
+            if type(rule).leave_scope is not LintRule.leave_scope:
+                self.leave_handlers.append(leave_scope)
+
+    def emit(self, kind: str, value: Any, scope: Scope, section: str | None = None) -> None:  # noqa: ANN401
+        handlers = self.handlers.get(kind)
+        if not handlers:
+            return
+        node = Node(kind, value, scope, section)
+        for handler in handlers:
+            handler(node, self.report)
+
+    def leave(self, scope: Scope) -> None:
+        for leave_scope in self.leave_handlers:
+            leave_scope(scope, self.report)
+
+    def walk(self, recipe: Mapping[str, Any]) -> None:
+        top = Scope(recipe)
+        self.emit("recipe", recipe, top)
+        self.emit("context", recipe.get("context") or {}, top)
+        self.walk_scope(top)
+        for output in recipe.get("outputs") or []:
+            scope = Scope(output, parent=top)
+            self.emit("output", output, scope)
+            self.walk_scope(scope)
+            self.leave(scope)
+        self.leave(top)
+
+    def walk_scope(self, scope: Scope) -> None:
+        recipe = scope.recipe
+        # the top-level sections are always visited, so rules can lint missing ones
+        package = recipe.get("package") or recipe.get("recipe")
+        if package is not None or not scope.is_output:
+            self.emit("package", package or {}, scope)
+        for key in ("build", "about", "extra"):
+            if key in recipe or not scope.is_output:
+                self.emit(key, recipe.get(key) or {}, scope)
+
+        for source in visit_conditional_list(recipe.get("source") or []):
+            if isinstance(source, dict):
+                self.emit("source", source, scope)
+
+        requirements = recipe.get("requirements")
+        if requirements is not None or not scope.is_output:
+            requirements = requirements or {}
+            self.emit("requirements", requirements, scope)
+            for section, entries in requirements.items():
+                if isinstance(entries, list):
+                    self.walk_requirements(section, entries, scope)
+
+        for test in recipe.get("tests") or []:
+            self.emit("test", test, scope)
+
+    def walk_requirements(self, section: str, entries: list[Any], scope: Scope) -> None:
+        collected = scope.requirements.setdefault(section, [])
+        for entry in entries:
+            if isinstance(entry, dict) and "if" in entry:
+                scope.has_conditional_requirements = True
+                self.emit("conditional_requirement", entry, scope, section)
+                branches: Iterable[Any] = visit_conditional_list(entry)
+            else:
+                branches = (entry,)
+            for requirement in branches:
+                if isinstance(requirement, str):
+                    collected.append(requirement)
+                    self.emit("requirement", requirement, scope, section)
+
+
+def run_lint_rules(
+    recipe: Mapping[str, Any], rules: Iterable[type[LintRule]] | None = None
+) -> LintReport:
+    """
+    Lint a loaded recipe with all registered rules in a single pass.
+
+    Arguments:
+    ----------
+    * `recipe` - The recipe, as loaded from `recipe.yaml`.
+    * `rules` - The rules to run. Defaults to all registered rules.
+
+    Returns:
+    --------
+    A `LintReport` with the lints and hints of every rule.
+    """
+    report = LintReport()
+    instances = [rule() for rule in (registered_rules() if rules is None else rules)]
+    _Walker(instances, report).walk(recipe)
+    return report
+
+
+def lint_recipe(
+    recipe_file: str | os.PathLike[str], max_schema_errors: int | None = None
+) -> LintReport:
+    """
+    Lint a `recipe.yaml` against the schema, with all registered rules and for
+    Jinja variable references without spaces.
+
+    Arguments:
+    ----------
+    * `recipe_file` - The path to the recipe.
+    * `max_schema_errors` - Stop the schema validation after this many errors.
+    """
+    with open(recipe_file) as f:
+        recipe = _yaml_object().load(f)
+
+    report = LintReport()
+    report.messages.extend(
+        LintMessage("lint", "schema", message)
+        for message in lint.iter_schema_lints(recipe, max_errors=max_schema_errors)
+    )
+    report.messages.extend(run_lint_rules(recipe).messages)
+    recipe_file = os.fspath(recipe_file)
+    report.messages.extend(
+        LintMessage("hint", "jinja-variable-spacing", message)
+        for message in lint.lint_variable_reference_should_have_space(
+            os.path.dirname(recipe_file), recipe_file
+        )
+    )
+    return report
+
+
+@register_rule
+class RequirementSpacing(LintRule):
+    name = "requirement-spacing"
+    node_kinds = ("requirement",)
+
+    def visit(self, node: Node, report: LintReport) -> None:
+        self.emit(report, lint._lint_requirement_spacing(node.value, node.section), node.scope)  # noqa: SLF001
+
+
+@register_rule
+class LegacyNumpyPinning(LintRule):
+    name = "legacy-numpy-pinning"
+    node_kinds = ("requirement",)
+
+    def visit(self, node: Node, report: LintReport) -> None:
+        if node.section == "build" and node.value == "numpy x.x":
+            self.emit(report, lint.lint_legacy_patterns({"build": [node.value]}), node.scope)
+
+
+@register_rule
+class LegacyToolchain(LintRule):
+    name = "legacy-toolchain"
+    node_kinds = ("requirement",)
+
+    def visit(self, node: Node, report: LintReport) -> None:
+        if node.section == "build" and node.value == "toolchain":
+            self.emit(report, lint.lint_legacy_compilers([node.value]), node.scope)
+
+
+@register_rule
+class NonNoarchLanguageConstraints(LintRule):
+    name = "non-noarch-language-constraints"
+
+    def leave_scope(self, scope: Scope, report: LintReport) -> None:
+        if scope.noarch is not None:
+            return
+        requirements = scope.requirements
+        for language in ("python", "r-base"):
+            self.emit(
+                report,
+                lint._lint_language_constraints(  # noqa: SLF001
+                    language, requirements.get("host", []), requirements.get("run", [])
+                ),
+                scope,
+            )
+
+
+@register_rule
+class LowerBoundOnPython(LintRule):
+    name = "lower-bound-on-python"
+
+    def leave_scope(self, scope: Scope, report: LintReport) -> None:
+        if scope.noarch != "python":
+            return
+        # a multi-output recipe is checked per output
+        if not scope.is_output and scope.recipe.get("outputs"):
+            return
+        run_requirements = scope.requirements.get("run", [])
+        self.emit(report, lint.lint_lower_bound_on_python(run_requirements, []), scope)
+
+
+@register_rule
+class NoarchUsage(LintRule):
+    name = "noarch-usage"
+    kind = "hint"
+
+    def leave_scope(self, scope: Scope, report: LintReport) -> None:
+        if scope.noarch is not None:
+            return
+        self.emit(
+            report,
+            lint._hint_noarch(  # noqa: SLF001
+                scope.requirements.get("build"),
+                "skip" in scope.build,
+                scope.has_conditional_requirements,
+            ),
+            scope,
+        )
+
+
+@register_rule
+class SelectorsForNoarch(LintRule):
+    name = "selectors-for-noarch"
+    node_kinds = ("build", "conditional_requirement")
+
+    def __init__(self) -> None:
+        self.reported: set[Scope] = set()
+
+    def visit(self, node: Node, report: LintReport) -> None:
+        noarch = node.scope.noarch
+        if noarch is None:
+            return
+        if node.kind == "build":
+            if "skip" in node.value:
+                self.emit(report, lint._noarch_selector_lint(noarch), node.scope)  # noqa: SLF001
+        elif node.scope not in self.reported:
+            self.reported.add(node.scope)
+            self.emit(report, lint._noarch_selector_lint(noarch), node.scope)  # noqa: SLF001
+
+
+@register_rule
+class AboutContents(LintRule):
+    name = "about-contents"
+    node_kinds = ("about",)
+
+    def visit(self, node: Node, report: LintReport) -> None:
+        if node.scope.is_output:
+            return
+        lints: list[str] = []
+        lint.lint_about_contents(node.value, lints)
+        lint.lint_has_recipe_file(node.value, lints)
+        license_ = node.value.get("license")
+        if isinstance(license_, str):
+            lint.lint_license_not_unknown(license_, lints)
+        self.emit(report, lints, node.scope)
+
+
+@register_rule
+class BuildNumber(LintRule):
+    name = "build-number"
+    node_kinds = ("build",)
+
+    def visit(self, node: Node, report: LintReport) -> None:
+        if not node.scope.is_output:
+            lints: list[str] = []
+            lint.lint_build_number(node.value, lints)
+            self.emit(report, lints, node.scope)
+
+
+@register_rule
+class PipUsage(LintRule):
+    name = "pip-usage"
+    kind = "hint"
+    node_kinds = ("build",)
+
+    def visit(self, node: Node, report: LintReport) -> None:
+        self.emit(report, lint.hint_pip_usage(node.value), node.scope)
+
+
+@register_rule
+class RequirementsOrder(LintRule):
+    name = "requirements-order"
+    node_kinds = ("requirements",)
+
+    def visit(self, node: Node, report: LintReport) -> None:
+        lints: list[str] = []
+        lint.lint_requirements_order(node.value, lints)
+        self.emit(report, lints, node.scope)
+
+
+@register_rule
+class SourceHash(LintRule):
+    name = "source-hash"
+    node_kinds = ("source",)
+
+    def visit(self, node: Node, report: LintReport) -> None:
+        lints: list[str] = []
+        lint.lint_files_have_hash([node.value], lints)
+        self.emit(report, lints, node.scope)
+
+
+@register_rule
+class RecipeMaintainers(LintRule):
+    name = "recipe-maintainers"
+    node_kinds = ("extra",)
+
+    def visit(self, node: Node, report: LintReport) -> None:
+        if not node.scope.is_output:
+            lints: list[str] = []
+            lint.lint_recipe_maintainers(node.value.get("recipe-maintainers"), lints)
+            self.emit(report, lints, node.scope)
+
+
+@register_rule
+class PackageNameAndVersion(LintRule):
+    name = "package-name-and-version"
+    node_kinds = ("package",)
+
+    def visit(self, node: Node, report: LintReport) -> None:
+        if node.scope.is_output:
+            return
+        context = node.scope.recipe.get("context") or {}
+        self.emit(report, lint.lint_package_name(node.value, context), node.scope)
+        self.emit(report, lint.lint_package_version(node.value, context), node.scope)
+
+
+@register_rule
+class RecipeTests(LintRule):
+    name = "recipe-tests"
+    node_kinds = ("test",)
+
+    def __init__(self) -> None:
+        self.test_keys: dict[Scope, set[str]] = defaultdict(set)
+        self.outputs: list[dict[str, Any]] = []
+
+    def visit(self, node: Node, report: LintReport) -> None:  # noqa: ARG002
+        if isinstance(node.value, dict):
+            self.test_keys[node.scope].update(node.value)
+
+    def leave_scope(self, scope: Scope, report: LintReport) -> None:
+        if scope.is_output:
+            output: dict[str, Any] = {"tests": self.test_keys.pop(scope, set())}
+            if scope.name:
+                output["name"] = scope.name
+            self.outputs.append(output)
+            return
+        lints, hints = lint.lint_recipe_tests(self.test_keys.pop(scope, set()), self.outputs)
+        self.emit(report, lints, scope)
+        report.messages.extend(LintMessage("hint", self.name, hint) for hint in hints)
@@ -0,0 +1,140 @@
+"""
+Incremental linting: lint results are stored in SQLite together with a key of everything
+that influences them, and recipes are only linted again when their key changed.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from rattler_build_conda_compat import lint
+from rattler_build_conda_compat.lint_rules import (
+    LintMessage,
+    LintReport,
+    lint_recipe,
+    registered_rules,
+)
+from rattler_build_conda_compat.remote_data import cache_dir
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+
+PACKAGE_NAME = "rattler-build-conda-compat"
+
+
+def default_store_path() -> Path:
+    return cache_dir() / "lint-results.sqlite"
+
+
+def linter_version() -> str:
+    """The installed version of this package, together with the names of the registered rules."""
+    from importlib.metadata import PackageNotFoundError, version
+
+    try:
+        installed = version(PACKAGE_NAME)
+    except PackageNotFoundError:
+        installed = "unknown"
+    return installed + ":" + ",".join(sorted(rule.name for rule in registered_rules()))
+
+
+def lint_inputs_key() -> str:
+    """
+    A hash of everything besides the recipe itself that `lint_recipe` reads: the linter
+    version, the registered rules and the recipe schema.
+    """
+    inputs = hashlib.sha256(linter_version().encode())
+    schema = json.dumps(lint.get_recipe_schema(), sort_keys=True)
+    inputs.update(hashlib.sha256(schema.encode()).digest())
+    return inputs.hexdigest()
+
+
+def recipe_key(recipe_file: str | os.PathLike[str], inputs_key: str) -> str:
+    with open(recipe_file, "rb") as f:
+        recipe_hash = hashlib.sha256(f.read()).hexdigest()
+    return f"{inputs_key}:{recipe_hash}"
+
+
+class LintResultStore:
+    """A persistent store of lint reports, keyed by the recipe path."""
+
+    def __init__(self, path: str | os.PathLike[str] | None = None) -> None:
+        self.path = Path(path) if path is not None else default_store_path()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(self.path, check_same_thread=False)
+        with self._connection:
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS lint_results ("
+                "recipe TEXT PRIMARY KEY, key TEXT NOT NULL, messages TEXT NOT NULL)"
+            )
+
+    def get(self, recipe_file: str | os.PathLike[str], key: str) -> LintReport | None:
+        """The stored report of `recipe_file`, if it was stored with the same `key`."""
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT key, messages FROM lint_results WHERE recipe = ?",
+                (os.path.abspath(recipe_file),),
+            ).fetchone()
+        if row is None or row[0] != key:
+            return None
+        return LintReport([LintMessage(*message) for message in json.loads(row[1])])
+
+    def put(self, recipe_file: str | os.PathLike[str], key: str, report: LintReport) -> None:
+        with self._lock, self._connection:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO lint_results (recipe, key, messages) VALUES (?, ?, ?)",
+                (os.path.abspath(recipe_file), key, json.dumps(report.messages)),
+            )
+
+    def close(self) -> None:
+        self._connection.close()
+
+    def __enter__(self) -> LintResultStore:  # noqa: PYI034
+        return self
+
+    def __exit__(self, *args: object) -> None:
+        self.close()
+
+
+def lint_recipes_incremental(
+    recipe_files: Iterable[str | os.PathLike[str]],
+    *,
+    store: LintResultStore | None = None,
+) -> dict[str, LintReport]:
+    """
+    Lint many recipes, reusing the stored report of every recipe whose content, linter
+    version, schema and hints did not change since it was last linted.
+
+    Arguments:
+    ----------
+    * `recipe_files` - The paths of the `recipe.yaml` files.
+    * `store` - The store of earlier results. Defaults to one in the cache directory.
+
+    Returns:
+    --------
+    The report of every recipe, keyed by its path as given.
+    """
+    own_store = store is None
+    if store is None:
+        store = LintResultStore()
+
+    try:
+        inputs_key = lint_inputs_key()
+        reports = {}
+        for recipe_file in recipe_files:
+            key = recipe_key(recipe_file, inputs_key)
+            report = store.get(recipe_file, key)
+            if report is None:
+                report = lint_recipe(recipe_file)
+                store.put(recipe_file, key, report)
+            reports[os.fspath(recipe_file)] = report
+        return reports
+    finally:
+        if own_store:
+            store.close()
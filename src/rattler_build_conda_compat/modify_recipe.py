@@ -1,13 +1,10 @@
 from __future__ import annotations
 
 import copy
-import hashlib
 import logging
 import re
 from typing import TYPE_CHECKING, Any, Literal
 
-import requests
-
 from rattler_build_conda_compat.jinja.jinja import jinja_env, load_recipe_context
 from rattler_build_conda_compat.recipe_sources import Source, get_all_sources
 from rattler_build_conda_compat.yaml import _dump_yaml_to_string, _yaml_object
@@ -15,6 +12,8 @@ from rattler_build_conda_compat.yaml import _dump_yaml_to_string, _yaml_object
 if TYPE_CHECKING:
     from pathlib import Path
 
+    from rattler_build_conda_compat.download import UrlOrMirrors
+
 logger = logging.getLogger(__name__)
 
 HashType = Literal["md5", "sha256"]
@@ -90,15 +89,27 @@ def _has_jinja_version(url: str) -> bool:
     return re.search(pattern, url) is not None
 
 
-def update_hash(source: Source, url: str, hash_: Hash | None) -> None:
+def update_hash(  # noqa: PLR0913
+    source: Source,
+    url: UrlOrMirrors,
+    hash_: Hash | None,
+    *,
+    verify_mirrors: bool = False,
+    spool_dir: Path | None = None,
+    keep_download: bool = False,
+) -> None:
     """
     Update the sha256 hash in the source dictionary.
 
     Arguments:
     ----------
     * `source` - The source dictionary to update.
-    * `url` - The URL to download and hash (if no hash is provided).
+    * `url` - The URL to download and hash (if no hash is provided). If a list of mirrors
+      is given, they are raced and the first one to answer is used.
     * `hash_` - The hash to use. If not provided, the file will be downloaded and `sha256` hashed.
+    * `verify_mirrors` - Download from all mirrors and check that they serve the same file.
+    * `spool_dir` - Download into this directory, resuming interrupted downloads.
+    * `keep_download` - Keep the downloaded file in `spool_dir` for later steps.
     """
     hash_type: HashType = hash_.hash_type if hash_ is not None else "sha256"
     # delete all old hashes that we are not updating
@@ -110,16 +121,24 @@ def update_hash(source: Source, url: str, hash_: Hash | None) -> None:
     if hash_ is not None:
         source[hash_.hash_type] = hash_.hash_value
     else:
-        # download and hash the file
-        hasher = hashlib.sha256()
-        print(f"Retrieving and hashing {url}")
-        with requests.get(url, stream=True, timeout=100) as r:
-            for chunk in r.iter_content(chunk_size=4096):
-                hasher.update(chunk)
-        source["sha256"] = hasher.hexdigest()
+        # download and hash the file, `requests` is only imported when a download is needed
+        from rattler_build_conda_compat.download import sha256_of_url
 
-
-def update_version(file: Path, new_version: str, hash_: Hash | None) -> str:
+        print(f"Retrieving and hashing {url}")
+        source["sha256"] = sha256_of_url(
+            url, verify_mirrors=verify_mirrors, spool_dir=spool_dir, keep_download=keep_download
+        )
+
+
+def update_version(  # noqa: PLR0913
+    file: Path,
+    new_version: str,
+    hash_: Hash | None,
+    *,
+    verify_mirrors: bool = False,
+    spool_dir: Path | None = None,
+    keep_download: bool = False,
+) -> str:
     """
     Update the version in the recipe file.
 
@@ -128,6 +147,9 @@ def update_version(file: Path, new_version: str, hash_: Hash | None) -> str:
     * `file` - The path to the recipe file.
     * `new_version` - The new version to use.
     * `hash_type` - The hash type to use. If not provided, the file will be downloaded and `sha256` hashed.
+    * `verify_mirrors` - When a source lists several mirror URLs, check that they all serve the same file.
+    * `spool_dir` - Download sources into this directory, resuming interrupted downloads.
+    * `keep_download` - Keep the downloaded sources in `spool_dir` for later steps.
 
     Returns:
     --------
@@ -157,16 +179,22 @@ def update_version(file: Path, new_version: str, hash_: Hash | None) -> str:
         if "url" not in source:
             continue
 
-        url = source["url"]
-        if isinstance(url, list):
-            url = url[0]
+        urls = source["url"]
+        if not isinstance(urls, list):
+            urls = [urls]
 
-        if not _has_jinja_version(url):
+        if not _has_jinja_version(urls[0]):
             continue
 
-        template = env.from_string(url)
-        rendered_url = template.render(context_variables)
+        rendered_urls = [env.from_string(url).render(context_variables) for url in urls]
 
-        update_hash(source, rendered_url, hash_)
+        update_hash(
+            source,
+            rendered_urls,
+            hash_,
+            verify_mirrors=verify_mirrors,
+            spool_dir=spool_dir,
+            keep_download=keep_download,
+        )
 
     return _dump_yaml_to_string(data)
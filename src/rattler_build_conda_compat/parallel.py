@@ -0,0 +1,40 @@
+from __future__ import annotations
+
+from concurrent.futures import FIRST_COMPLETED, Executor, Future, wait
+from typing import TYPE_CHECKING, Any, TypeVar
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterable, Iterator
+
+T = TypeVar("T")
+
+
+def imap_unordered(
+    executor: Executor,
+    fn: Callable[..., T],
+    items: Iterable[Any],
+    max_in_flight: int,
+    *args: Any,  # noqa: ANN401
+) -> Iterator[T]:
+    """
+    Yield `fn(item, *args)` for every item, in completion order.
+
+    Unlike `Executor.map`, `items` is consumed lazily and at most `max_in_flight` calls are
+    submitted at any time, so memory stays bounded for arbitrarily long inputs. Calls that
+    were not started yet are cancelled when the caller stops iterating.
+    """
+    pending: set[Future[T]] = set()
+    try:
+        for item in items:
+            pending.add(executor.submit(fn, item, *args))
+            if len(pending) >= max_in_flight:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield future.result()
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield future.result()
+    finally:
+        for future in pending:
+            future.cancel()
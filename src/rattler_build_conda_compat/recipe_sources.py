@@ -23,10 +23,10 @@ class Source(TypedDict):
     md5: NotRequired[str]
 
 
-def get_all_sources(recipe: Mapping[Any, Any]) -> Iterator[Source]:
+def get_sources_by_output(recipe: Mapping[Any, Any]) -> Iterator[tuple[str | None, Source]]:
     """
-    Get all sources from the recipe. This can be from a list of sources,
-    a single source, or conditional and its branches.
+    Get all sources from the recipe together with the name of the output they belong to.
+    Top-level sources belong to no output (`None`).
 
     Arguments
     ---------
@@ -34,7 +34,7 @@ def get_all_sources(recipe: Mapping[Any, Any]) -> Iterator[Source]:
 
     Returns
     -------
-    A list of source objects.
+    A list of `(output name, source)` tuples.
     """
     sources = recipe.get("source", None)
     sources = typing.cast(ConditionalList[Source], sources)
@@ -43,7 +43,7 @@ def get_all_sources(recipe: Mapping[Any, Any]) -> Iterator[Source]:
     if sources is not None:
         source_list = visit_conditional_list(sources, None)
         for source in source_list:
-            yield source
+            yield None, source
 
     outputs = recipe.get("outputs", None)
     if outputs is None:
@@ -55,9 +55,26 @@ def get_all_sources(recipe: Mapping[Any, Any]) -> Iterator[Source]:
         sources = typing.cast(ConditionalList[Source], sources)
         if sources is None:
             continue
+        name = (output.get("package") or {}).get("name")
         source_list = visit_conditional_list(sources, None)
         for source in source_list:
-            yield source
+            yield name, source
+
+
+def get_all_sources(recipe: Mapping[Any, Any]) -> Iterator[Source]:
+    """
+    Get all sources from the recipe. This can be from a list of sources,
+    a single source, or conditional and its branches.
+
+    Arguments
+    ---------
+    * `recipe` - The recipe to inspect. This should be a yaml object.
+
+    Returns
+    -------
+    A list of source objects.
+    """
+    return (source for _, source in get_sources_by_output(recipe))
 
 
 def get_all_url_sources(recipe: Mapping[Any, Any]) -> Iterator[str]:
@@ -80,3 +97,25 @@ def get_all_url_sources(recipe: Mapping[Any, Any]) -> Iterator[str]:
         return source["url"]
 
     return (get_first_url(source) for source in get_all_sources(recipe) if "url" in source)
+
+
+def get_all_url_mirrors(recipe: Mapping[Any, Any]) -> Iterator[list[str]]:
+    """
+    Get the mirror URLs of every url source in the recipe. Each source yields the
+    full list of its URLs, in the order they are listed in the recipe.
+
+    Arguments
+    ---------
+    * `recipe` - The recipe to inspect. This should be a yaml object.
+
+    Returns
+    -------
+    A list of mirror lists.
+    """
+
+    def get_urls(source: Mapping[str, Any]) -> list[str]:
+        if isinstance(source["url"], list):
+            return list(source["url"])
+        return [source["url"]]
+
+    return (get_urls(source) for source in get_all_sources(recipe) if "url" in source)
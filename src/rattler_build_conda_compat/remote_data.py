@@ -0,0 +1,211 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Any
+from urllib.parse import urlparse
+
+from rattler_build_conda_compat import instrumentation
+
+logger = logging.getLogger(__name__)
+
+CACHE_DIR_ENV = "RATTLER_BUILD_CONDA_COMPAT_CACHE_DIR"
+OFFLINE_ENV = "RATTLER_BUILD_CONDA_COMPAT_OFFLINE"
+REQUEST_TIMEOUT = 30
+
+# the last content seen for every URL in this process, with the time it was fetched or revalidated
+_memory_cache: dict[str, tuple[float, bytes]] = {}
+_memory_cache_lock = threading.Lock()
+
+
+class RemoteDataUnavailableError(Exception):
+    def __init__(self, url: str, reason: str) -> None:
+        self.url = url
+        self.message = f"Could not retrieve {url}: {reason}"
+        super().__init__(self.message)
+
+
+def cache_dir() -> Path:
+    """
+    The directory that holds cached remote data.
+
+    It can be set with the `RATTLER_BUILD_CONDA_COMPAT_CACHE_DIR` environment variable,
+    and defaults to `$XDG_CACHE_HOME/rattler-build-conda-compat`.
+    """
+    if configured := os.environ.get(CACHE_DIR_ENV):
+        return Path(configured)
+    xdg_cache = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return Path(xdg_cache) / "rattler-build-conda-compat"
+
+
+def is_offline() -> bool:
+    """Whether `RATTLER_BUILD_CONDA_COMPAT_OFFLINE` asks to never touch the network."""
+    return os.environ.get(OFFLINE_ENV, "").lower() in ("1", "true", "yes")
+
+
+def cached_path(url: str) -> Path:
+    """The path of the cached copy of `url`."""
+    basename = os.path.basename(urlparse(url).path) or "data"
+    url_hash = hashlib.sha256(url.encode()).hexdigest()[:16]
+    return cache_dir() / f"{url_hash}-{basename}"
+
+
+def _metadata_path(path: Path) -> Path:
+    return path.with_name(path.name + ".json")
+
+
+def _read_metadata(path: Path) -> dict[str, Any]:
+    try:
+        with _metadata_path(path).open() as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def atomic_write(path: Path, content: bytes) -> None:
+    """
+    Replace `path` with `content` at once. The content is written to a uniquely named
+    temporary file next to `path` first, so processes sharing the cache never see (or
+    leave behind) a half-written or mixed file.
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with tempfile.NamedTemporaryFile(
+        dir=path.parent, prefix=path.name + ".", suffix=".tmp", delete=False
+    ) as f:
+        try:
+            f.write(content)
+            f.close()
+            os.replace(f.name, path)
+        except OSError:
+            os.unlink(f.name)
+            raise
+
+
+# The on-disk cache is best-effort: if it can't be written (e.g. a read-only or missing
+# cache directory), the fetched data is still returned, it is just fetched again next time.
+
+
+def _store_metadata(path: Path, metadata: dict[str, Any]) -> None:
+    try:
+        atomic_write(_metadata_path(path), json.dumps(metadata).encode())
+    except OSError as e:
+        logger.debug("Could not write the cache metadata of %s: %s", path, e)
+
+
+def _store(path: Path, content: bytes, metadata: dict[str, Any]) -> None:
+    try:
+        atomic_write(path, content)
+    except OSError as e:
+        logger.debug("Could not write %s to the cache: %s", path, e)
+        return
+    _store_metadata(path, metadata)
+
+
+def _remember(url: str, content: bytes, fetched_at: float) -> bytes:
+    with _memory_cache_lock:
+        _memory_cache[url] = (fetched_at, content)
+    return content
+
+
+def clear_memory_cache() -> None:
+    """Forget the content kept in memory, the on-disk cache is kept."""
+    with _memory_cache_lock:
+        _memory_cache.clear()
+
+
+def _conditional_headers(metadata: dict[str, Any]) -> dict[str, str]:
+    headers = {}
+    if etag := metadata.get("etag"):
+        headers["If-None-Match"] = etag
+    if last_modified := metadata.get("last_modified"):
+        headers["If-Modified-Since"] = last_modified
+    return headers
+
+
+def fetch_remote_data(
+    url: str,
+    *,
+    offline: bool | None = None,
+    max_age: float | None = None,
+    timeout: float = REQUEST_TIMEOUT,
+) -> bytes:
+    """
+    Fetch `url` through an in-memory and an on-disk cache.
+
+    A cached copy is revalidated with `If-None-Match` / `If-Modified-Since`, so an
+    unchanged file costs a single `304` round-trip. Copies that were fetched or revalidated
+    less than `max_age` seconds ago are used without a request. If the request fails, the
+    cached copy is returned instead. In offline mode the network is never touched.
+
+    Arguments:
+    ----------
+    * `url` - The URL to fetch.
+    * `offline` - Only use the cache. Defaults to `is_offline()`.
+    * `max_age` - Seconds for which a cached copy is used without revalidation.
+      By default every call revalidates.
+    * `timeout` - The timeout passed to `requests.get`.
+
+    Raises:
+    -------
+    * `RemoteDataUnavailableError` - If the data can neither be fetched nor found in the cache.
+    """
+    if offline is None:
+        offline = is_offline()
+
+    now = time.time()
+    with _memory_cache_lock:
+        remembered = _memory_cache.get(url)
+    if remembered is not None and (
+        offline or (max_age is not None and now - remembered[0] < max_age)
+    ):
+        return remembered[1]
+
+    path = cached_path(url)
+    metadata = _read_metadata(path)
+    has_cache = path.exists() and metadata.get("url") == url
+    fetched_at = metadata.get("fetched_at", 0)
+
+    if offline or (has_cache and max_age is not None and now - fetched_at < max_age):
+        if not has_cache:
+            raise RemoteDataUnavailableError(url, "offline mode and no cached copy")
+        return _remember(url, path.read_bytes(), fetched_at)
+
+    import requests
+
+    headers = _conditional_headers(metadata) if has_cache else {}
+    try:
+        with instrumentation.timed("network", url):
+            response = requests.get(url, headers=headers, timeout=timeout)
+    except requests.RequestException as e:
+        if has_cache:
+            logger.warning("Could not revalidate %s, using the cached copy: %s", url, e)
+            return path.read_bytes()
+        raise RemoteDataUnavailableError(url, str(e)) from e
+
+    if response.status_code == requests.codes.not_modified and has_cache:
+        _store_metadata(path, {**metadata, "fetched_at": now})
+        return _remember(url, path.read_bytes(), now)
+
+    if response.status_code != requests.codes.ok:
+        if has_cache:
+            logger.warning("Got HTTP %s for %s, using the cached copy", response.status_code, url)
+            return path.read_bytes()
+        raise RemoteDataUnavailableError(url, f"HTTP {response.status_code}")
+
+    _store(
+        path,
+        response.content,
+        {
+            "url": url,
+            "etag": response.headers.get("ETag"),
+            "last_modified": response.headers.get("Last-Modified"),
+            "fetched_at": now,
+        },
+    )
+    return _remember(url, response.content, now)
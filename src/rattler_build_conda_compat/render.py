@@ -3,6 +3,7 @@
 from __future__ import annotations
 
 from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 import json
 import os
 from pathlib import Path
@@ -25,9 +26,18 @@ from conda_build.variants import (
 from conda_build.metadata import get_selectors, check_bad_chrs
 from conda_build.config import Config
 
+from rattler_build_conda_compat.fingerprint import variant_fingerprint
+from rattler_build_conda_compat.frozen import share_rendered_recipes
 from rattler_build_conda_compat.jinja.jinja import render_recipe_with_context
 from rattler_build_conda_compat.loader import load_yaml, parse_recipe_config_file
 from rattler_build_conda_compat.utils import _get_recipe_metadata, find_recipe
+from rattler_build_conda_compat.variants import (
+    VariantSpace,
+    dedupe_rendered_recipes,
+    merge_rendered_recipes,
+    shard_variant_config,
+    variant_space,
+)
 from rattler_build_conda_compat.yaml import _yaml_object
 
 
@@ -62,10 +72,39 @@ class MetaData(CondaMetaData):
             self.meta["extra"] = self.meta["recipe"].get("extra", {})
 
         self.final = True
+        # the variants of rattler-build that this rendered recipe stands for
+        self.covered_variants = []
         self.undefined_jinja_vars = []
 
         self.requirements_path = os.path.join(self.path, "requirements.txt")
 
+    @property
+    def meta(self):
+        return self._meta
+
+    @meta.setter
+    def meta(self, value):
+        self._meta = value
+        self.invalidate_views()
+
+    def invalidate_views(self):
+        """
+        Forgets the cached results of `get_used_vars`, `get_used_variant`,
+        `get_used_loop_vars` and `get_section`. They are forgotten automatically when `meta`
+        or `config.variant` is replaced, but not when they are changed in place.
+        """
+        self._views = {}
+
+    def _cached_view(self, name, compute, *depends_on):
+        # the cached value is used while `depends_on` are the same objects as when it was
+        # computed. Holding on to them means their ids can't be reused by new objects.
+        cached = self._views.get(name)
+        if cached is not None and all(a is b for a, b in zip(cached[0], depends_on)):
+            return cached[1]
+        value = compute()
+        self._views[name] = (depends_on, value)
+        return value
+
     def parse_recipe(self) -> dict[str, Any]:
         recipe_path: Path = Path(self.path) / self._meta_name
 
@@ -117,7 +156,25 @@ class MetaData(CondaMetaData):
             raise ValueError(f"Fully-rendered version can't start with period -  got {version!r}")
         return version
 
-    def render_recipes(self, variants) -> List[Dict]:
+    def render_recipes(self, variants, shards: Optional[int] = None) -> List[Dict]:
+        """
+        Renders the recipe with rattler-build for all `variants`.
+
+        With `shards`, the variants are split into up to that many parts (see
+        `shard_variant_config`) that are rendered by concurrent rattler-build processes.
+        The results are merged into the order of an unsharded render, and outputs rendered
+        by more than one shard are kept once, see `merge_rendered_recipes`.
+        """
+        if shards and shards > 1 and variants:
+            variant_shards = shard_variant_config(variants, shards)
+            if len(variant_shards) > 1:
+                with ThreadPoolExecutor(max_workers=len(variant_shards)) as executor:
+                    results = list(executor.map(self._render_recipes, variant_shards))
+                return merge_rendered_recipes(results, variants)
+
+        return self._render_recipes(variants)
+
+    def _render_recipes(self, variants) -> List[Dict]:
         build_platform_and_arch = f"{self.config.platform}-{self.config.arch}"
         target_platform_and_arch = f"{self.config.host_platform}-{self.config.host_arch}"
 
@@ -156,11 +213,17 @@ class MetaData(CondaMetaData):
             raise e
 
     def get_used_vars(self, force_top_level=False, force_global=False):
+        used_vars = self._cached_view(
+            "used_vars", self._compute_used_vars, getattr(self.config, "variant", None)
+        )
+        return set(used_vars)
+
+    def _compute_used_vars(self):
         if "build_configuration" not in self.meta:
             # it could be that we skip build for this platform
             # so no variants have been discovered
             # return empty
-            return set()
+            return frozenset()
 
         used_vars = [
             var.replace("-", "_") for var in self.meta["build_configuration"]["variant"].keys()
@@ -173,9 +236,12 @@ class MetaData(CondaMetaData):
         if "target_platform" in self.config.variant and self.noarch:
             used_vars.remove("target_platform")
 
-        return set(used_vars)
+        return frozenset(used_vars)
 
     def get_used_variant(self) -> Dict:
+        return dict(self._cached_view("used_variant", self._compute_used_variant))
+
+    def _compute_used_variant(self) -> Dict:
         if "build_configuration" not in self.meta:
             # it could be that we skip build for this platform
             # so no variants have been discovered
@@ -199,31 +265,52 @@ class MetaData(CondaMetaData):
 
         return used_variant_key_normalized
 
+    def fingerprint(self) -> str:
+        """
+        Returns a hash of everything the build of this variant depends on: the rendered
+        recipe, the variant values it uses, the files in the recipe directory and the
+        version of rattler-build. It is stable across runs and orderings of the recipe.
+        """
+        recipe = self.meta.get("recipe", {}) if self._rendered else self.meta
+        return variant_fingerprint(recipe, self.get_used_variant(), self.path)
+
     def get_used_loop_vars(self, force_top_level=False, force_global=False):
-        return {
-            var
-            for var in self.get_used_vars(
-                force_top_level=force_top_level, force_global=force_global
-            )
-            if var in self.get_loop_vars()
-        }
+        # `get_loop_vars` depends on the variants of the config
+        used_loop_vars = self._cached_view(
+            "used_loop_vars",
+            lambda: frozenset(self.get_used_vars() & set(self.get_loop_vars())),
+            getattr(self.config, "variant", None),
+            getattr(self.config, "variants", None),
+            getattr(self.config, "input_variants", None),
+        )
+        return set(used_loop_vars)
 
     def get_section(self, name):
-        if not self._rendered:
-            section = self.meta.get(name)
-        else:
-            section = self.meta.get("recipe", {}).get(name)
-
+        # not cached: `meta` and its sections can be changed in place, and the lookup is
+        # cheaper than checking for that. The empty and wrapped results are new objects on
+        # every call, so callers can change them.
+        section = self._find_section(name)
         if name in OPTIONALLY_ITERABLE_FIELDS:
             if not section:
                 return []
             elif isinstance(section, dict):
                 return [section]
-            elif not isinstance(section, list):
-                raise ValueError(f"Expected {name} to be a list")
+        elif not section:
+            return {}
+        return section
+
+    def _find_section(self, name):
+        # sections of recipes rendered with `share_trees` are read-only `FrozenDict` and
+        # `FrozenList` objects, which pass the `dict` and `list` checks below
+        if not self._rendered:
+            section = self.meta.get(name)
         else:
-            if not section:
-                return {}
+            section = self.meta.get("recipe", {}).get(name)
+
+        if section:
+            if name in OPTIONALLY_ITERABLE_FIELDS:
+                if not isinstance(section, (dict, list)):
+                    raise ValueError(f"Expected {name} to be a list")
             elif not isinstance(section, dict):
                 raise ValueError(f"Expected {name} to be a dict")
 
@@ -234,6 +321,9 @@ def render_recipe(
     recipe_path,
     config=None,
     variants=None,
+    shards=None,
+    deduplicate=False,
+    share_trees=False,
 ) -> List[MetaData]:
     """Returns a list of tuples, each consisting of
 
@@ -241,17 +331,36 @@ def render_recipe(
 
     You get one tuple per variant.  Outputs are not factored in here (subpackages won't affect these
     results returned here.)
+
+    With `deduplicate`, rendered variants with the same recipe and used variant are collapsed
+    into one MetaData, whose `covered_variants` lists the variants of all of them.
+
+    With `share_trees`, equal parts of the rendered recipes are shared between the MetaData
+    objects and are read-only, see `share_rendered_recipes`.
     """
 
     metadata = MetaData(recipe_path, config=config)
-    recipes = metadata.render_recipes(variants)
+    recipes = metadata.render_recipes(variants, shards=shards)
 
     metadatas: list[MetaData] = []
     if not recipes:
         return [metadata]
 
-    for recipe in recipes:
+    if deduplicate:
+        groups = dedupe_rendered_recipes(recipes)
+    else:
+        groups = [
+            (recipe, [recipe.get("build_configuration", {}).get("variant", {})])
+            for recipe in recipes
+        ]
+
+    if share_trees:
+        shared = share_rendered_recipes(recipe for recipe, _ in groups)
+        groups = [(recipe, covered) for recipe, (_, covered) in zip(shared, groups)]
+
+    for recipe, covered_variants in groups:
         metadata = MetaData(recipe_path, rendered_recipe=recipe, config=config)
+        metadata.covered_variants = covered_variants
         # just to have the same interface as conda_build
         metadatas.append(metadata)
 
@@ -262,11 +371,18 @@ def render(
     recipe_path: os.PathLike,
     config: Optional[Config] = None,
     variants: Optional[Dict[str, Any] | None] = None,
+    shards: Optional[int] = None,
+    deduplicate: bool = False,
+    share_trees: bool = False,
     **kwargs,
 ):
     """Given path to a recipe, return the MetaData object(s) representing that recipe, with jinja2
        templates evaluated.
 
+    Pass `shards` to render large variant matrices with that many rattler-build processes,
+    `deduplicate` to get one MetaData per distinct rendered variant, and `share_trees`
+    to share equal (read-only) parts of the rendered recipes between the variants.
+
     Returns a list of (metadata, needs_download, needs_reparse in env) tuples
     """
 
@@ -285,6 +401,9 @@ def render(
         recipe_dir,
         config=config,
         variants=variants,
+        shards=shards,
+        deduplicate=deduplicate,
+        share_trees=share_trees,
     )
 
     for m in metadata_tuples:
@@ -296,29 +415,19 @@ def render(
 
             used_variant = m.get_used_variant()
 
-            package_variants = rattler_get_package_variants(m, variants=variants)
+            package_variants = rattler_package_variant_space(m, variants=variants)
 
-            m.config.variants = package_variants[:]
+            # we need to discard variants that we don't use, which is done per key (or zip
+            # group) before the product is taken instead of by scanning every variant
+            used_package_variants = list(package_variants.matching(used_variant))
 
-            # we need to discard variants that we don't use
-            for pkg_variant in package_variants[:]:
-                for (
-                    used_variant_key,
-                    used_variant_value,
-                ) in used_variant.items():
-                    if used_variant_key in pkg_variant:
-                        if (
-                            pkg_variant[used_variant_key] != used_variant_value
-                            and pkg_variant in package_variants
-                        ):
-                            package_variants.remove(pkg_variant)
-
-            m.config.variant = package_variants[0]
+            m.config.variant = used_package_variants[0]
 
             # These are always the full set.  just 'variants' is the one that gets
-            #     used mostly, and can be reduced
-            m.config.input_variants = m.config.variants
-            m.config.variants = package_variants
+            #     used mostly, and can be reduced. The space is a lazy sequence, the
+            #     variants are only generated if conda-build reads them.
+            m.config.input_variants = package_variants
+            m.config.variants = used_package_variants
 
     return [(m, False, False) for m in metadata_tuples]
 
@@ -361,3 +470,17 @@ def rattler_get_package_variants(recipedir_or_metadata, config=None, variants=No
         recipedir_or_metadata, config=config, variants=variants
     )
     return filter_combined_spec_to_used_keys(combined_spec, specs=specs)
+
+
+def rattler_package_variant_space(
+    recipedir_or_metadata, config=None, variants=None, used_keys=None
+) -> VariantSpace:
+    """
+    Returns the variants of `rattler_get_package_variants` as a lazy `VariantSpace`,
+    optionally restricted to `used_keys` (e.g. `MetaData.get_used_vars()`) before the
+    product is taken. `len()` of the space counts the variants without generating them.
+    """
+    combined_spec, specs = get_package_combined_spec(
+        recipedir_or_metadata, config=config, variants=variants
+    )
+    return variant_space(combined_spec, specs, used_keys=used_keys)
@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+import re
+import sys
+from functools import lru_cache
+from typing import NamedTuple
+
+# longest first, so `>=` is not read as `>`
+OPERATORS = ("==", "!=", ">=", "<=", "~=", ">", "<", "=")
+
+_NAME_END = re.compile(r"[\s<>=!~\[]")
+
+# distinct requirement strings are few, even across all of conda-forge
+SPEC_CACHE_SIZE = 2**16
+
+
+class RequirementSpec(NamedTuple):
+    """
+    A requirement string split into its parts, e.g. `numpy >=1.20 py*` into the name
+    `numpy`, the operator `>=`, the version `1.20` and the build `py*`.
+
+    A requirement that is a Jinja expression (`${{ pin_subpackage('foo') }}`) is not split,
+    its `name` is the whole expression. A Jinja version (`python >=${{ python_min }}`) is kept
+    in one piece as `version`.
+    """
+
+    raw: str
+    name: str
+    operator: str | None
+    version: str | None
+    build: str | None
+    is_jinja: bool
+    # the whitespace separated words of `raw`
+    tokens: tuple[str, ...]
+
+    @property
+    def constraint(self) -> str | None:
+        """
+        The operator, version and build, e.g. `>=1.20 py*`. Like `is_pinned`, this does not
+        depend on whitespace: both `numpy >=1.20` and `numpy>=1.20` have the constraint
+        `>=1.20`.
+        """
+        if not self.is_pinned:
+            return None
+        version = (self.operator or "") + (self.version or "")
+        return f"{version} {self.build}" if self.build else version
+
+    @property
+    def is_pinned(self) -> bool:
+        return self.operator is not None or self.version is not None
+
+
+@lru_cache(maxsize=SPEC_CACHE_SIZE)
+def parse_requirement(requirement: str) -> RequirementSpec:
+    """
+    Parse a requirement string. Every distinct string is parsed once per process and the
+    same `RequirementSpec` object is returned for it afterwards.
+    """
+    raw = requirement
+    requirement = requirement.strip()
+    tokens = tuple(requirement.split())
+    is_jinja = "${{" in requirement
+    if requirement.startswith("${{"):
+        return RequirementSpec(raw, requirement, None, None, None, is_jinja, tokens)
+
+    match = _NAME_END.search(requirement)
+    end = match.start() if match else len(requirement)
+    name = sys.intern(requirement[:end])
+    rest = requirement[end:].lstrip()
+
+    operator = None
+    for op in OPERATORS:
+        if rest.startswith(op):
+            operator = op
+            rest = rest[len(op) :].lstrip()
+            break
+
+    if is_jinja:
+        version, build = rest or None, None
+    else:
+        words = rest.split()
+        version = words[0] if words else None
+        build = words[1] if len(words) > 1 else None
+    return RequirementSpec(raw, name, operator, version, build, is_jinja, tokens)
@@ -0,0 +1,154 @@
+"""
+Extract the url sources of a whole corpus of recipes (e.g. all of conda-forge) at once.
+
+Recipes are loaded on a pool of worker processes with the C-based safe YAML loader, and the
+sources are streamed out one record per url source:
+
+    {"recipe": "/feedstocks/foo/recipe/recipe.yaml", "output": null,
+     "url": "https://example.com/foo-1.0.tar.gz", "mirrors": [...],
+     "hashes": {"sha256": "..."}}
+
+At most a few recipes per worker are in flight at any time, so memory stays constant no
+matter how large the corpus is.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import IO, TYPE_CHECKING, Any, TypedDict
+
+from rattler_build_conda_compat.jinja.jinja import _shared_jinja_env, load_recipe_context
+from rattler_build_conda_compat.parallel import imap_unordered
+from rattler_build_conda_compat.recipe_sources import get_sources_by_output
+from rattler_build_conda_compat.yaml import _safe_yaml_object
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Iterator
+
+# recipes handed to every worker ahead of time, so workers never wait for the next one
+QUEUE_DEPTH = 4
+HASH_KEYS = ("sha256", "md5")
+
+
+class SourceRecord(TypedDict, total=False):
+    recipe: str
+    output: str | None
+    url: str
+    mirrors: list[str]
+    hashes: dict[str, str]
+    # set instead of the source fields if the recipe could not be read
+    error: str
+
+
+def _render(value: str, context: dict[str, Any]) -> str:
+    if "${{" not in value:
+        return value
+    try:
+        return _shared_jinja_env().from_string(value).render(context)
+    except Exception:  # noqa: BLE001
+        return value
+
+
+def recipe_source_records(
+    recipe: dict[str, Any], recipe_file: str, *, render: bool = True
+) -> list[SourceRecord]:
+    """
+    The records of every url source of a loaded recipe.
+
+    Arguments:
+    ----------
+    * `recipe` - The recipe to inspect. This should be a yaml object.
+    * `recipe_file` - The path stored in the `recipe` field of the records.
+    * `render` - Render the urls and hashes with the values of the `context` section.
+      Expressions that cannot be rendered are kept as they are.
+    """
+    context: dict[str, Any] = {}
+    if render and isinstance(recipe.get("context"), dict):
+        context = load_recipe_context(dict(recipe["context"]), _shared_jinja_env())
+
+    records = []
+    for output, source in get_sources_by_output(recipe):
+        if "url" not in source:
+            continue
+        urls = source["url"] if isinstance(source["url"], list) else [source["url"]]
+        urls = [_render(str(url), context) for url in urls]
+        hashes = {
+            key: _render(str(value), context) for key, value in source.items() if key in HASH_KEYS
+        }
+        records.append(
+            SourceRecord(
+                recipe=recipe_file, output=output, url=urls[0], mirrors=urls, hashes=hashes
+            )
+        )
+    return records
+
+
+def _extract_one(recipe_file: str, render: bool) -> list[SourceRecord]:  # noqa: FBT001
+    try:
+        with open(recipe_file, "rb") as f:
+            recipe = _safe_yaml_object().load(f)
+        if isinstance(recipe, dict):
+            return recipe_source_records(recipe, recipe_file, render=render)
+        error = "the recipe is not a mapping"
+    except Exception as e:  # noqa: BLE001
+        error = str(e)
+    return [SourceRecord(recipe=recipe_file, error=f"Could not read {recipe_file}: {error}")]
+
+
+def iter_corpus_sources(
+    recipe_files: Iterable[str | os.PathLike[str]],
+    max_workers: int | None = None,
+    *,
+    render: bool = True,
+) -> Iterator[SourceRecord]:
+    """
+    Yield the url sources of all `recipe_files`, grouped by recipe and in completion order.
+
+    A recipe that cannot be read yields a single record with an `error` field instead of
+    aborting the whole extraction.
+
+    Arguments:
+    ----------
+    * `recipe_files` - The paths of the `recipe.yaml` files. They are consumed lazily.
+    * `max_workers` - The number of worker processes. Defaults to the number of CPUs.
+      With `1`, the recipes are read in this process.
+    * `render` - Render the urls and hashes with the `context` of their recipe.
+    """
+    recipe_files = (os.fspath(recipe_file) for recipe_file in recipe_files)
+    if max_workers is None:
+        max_workers = os.cpu_count() or 1
+
+    if max_workers == 1:
+        for recipe_file in recipe_files:
+            yield from _extract_one(recipe_file, render)
+        return
+
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        for records in imap_unordered(
+            executor, _extract_one, recipe_files, max_workers * QUEUE_DEPTH, render
+        ):
+            yield from records
+
+
+def write_corpus_sources(
+    recipe_files: Iterable[str | os.PathLike[str]],
+    out: IO[str],
+    max_workers: int | None = None,
+    *,
+    render: bool = True,
+) -> int:
+    """
+    Write the url sources of all `recipe_files` to `out` as JSON lines, see
+    `iter_corpus_sources`.
+
+    Returns:
+    --------
+    The number of records written.
+    """
+    count = 0
+    for record in iter_corpus_sources(recipe_files, max_workers, render=render):
+        out.write(json.dumps(record) + "\n")
+        count += 1
+    return count
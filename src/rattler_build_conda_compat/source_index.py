@@ -0,0 +1,181 @@
+"""
+A persistent reverse index of recipe sources: which recipes (and outputs) download a given
+url, from a given host, or a tarball with a given sha256.
+
+The index lives in SQLite. `SourceIndex.update` reads only the recipes whose size or
+modification time changed since they were last indexed.
+"""
+
+from __future__ import annotations
+
+import os
+import sqlite3
+import threading
+from pathlib import Path
+from typing import TYPE_CHECKING, NamedTuple
+from urllib.parse import urlsplit, urlunsplit
+
+from rattler_build_conda_compat.remote_data import cache_dir
+from rattler_build_conda_compat.source_corpus import iter_corpus_sources
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+
+DEFAULT_PORTS = {"http": 80, "https": 443, "ftp": 21}
+# fewer changed recipes than this are read in this process, without starting a pool
+POOL_THRESHOLD = 16
+
+
+class SourceReference(NamedTuple):
+    recipe: str
+    # `None` for the top-level sources of the recipe
+    output: str | None
+
+
+def default_index_path() -> Path:
+    return cache_dir() / "source-index.sqlite"
+
+
+def normalize_url(url: str) -> str:
+    """
+    Lower-case the scheme and host, drop default ports, credentials and fragments, so that
+    spellings of the same url compare equal. The path is kept as it is.
+    """
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or "").lower()
+    try:
+        port = parts.port
+    except ValueError:
+        port = None
+    netloc = host if port is None or DEFAULT_PORTS.get(scheme) == port else f"{host}:{port}"
+    return urlunsplit((scheme, netloc, parts.path, parts.query, ""))
+
+
+def url_host(url: str) -> str:
+    return (urlsplit(url.strip()).hostname or "").lower()
+
+
+def _file_key(recipe_file: str) -> str | None:
+    try:
+        stat = os.stat(recipe_file)
+    except OSError:
+        return None
+    return f"{stat.st_mtime_ns}:{stat.st_size}"
+
+
+class SourceIndex:
+    """The reverse index of the url sources of many recipes, keyed by their absolute path."""
+
+    def __init__(self, path: str | os.PathLike[str] | None = None) -> None:
+        self.path = Path(path) if path is not None else default_index_path()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(self.path, check_same_thread=False)
+        with self._connection:
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS recipes (recipe TEXT PRIMARY KEY, key TEXT NOT NULL)"
+            )
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS sources ("
+                "kind TEXT NOT NULL, value TEXT NOT NULL, recipe TEXT NOT NULL, output TEXT)"
+            )
+            self._connection.execute(
+                "CREATE INDEX IF NOT EXISTS sources_by_value ON sources (kind, value)"
+            )
+            self._connection.execute(
+                "CREATE INDEX IF NOT EXISTS sources_by_recipe ON sources (recipe)"
+            )
+
+    def update(
+        self,
+        recipe_files: Iterable[str | os.PathLike[str]],
+        *,
+        prune: bool = False,
+        max_workers: int | None = None,
+    ) -> list[str]:
+        """
+        Index the recipes that are new or changed since the last update.
+
+        Arguments:
+        ----------
+        * `recipe_files` - The paths of the `recipe.yaml` files.
+        * `prune` - Also drop the indexed recipes that are not in `recipe_files`.
+        * `max_workers` - The number of processes reading recipes, see `iter_corpus_sources`.
+
+        Returns:
+        --------
+        The absolute paths of the recipes that were (re-)indexed or dropped.
+        """
+        with self._lock:
+            known = dict(self._connection.execute("SELECT recipe, key FROM recipes").fetchall())
+
+        keys = {}
+        for recipe_file in recipe_files:
+            path = os.path.abspath(recipe_file)
+            keys[path] = _file_key(path)
+        changed = [path for path, key in keys.items() if key is not None and known.get(path) != key]
+        removed = [path for path, key in keys.items() if key is None and path in known]
+        if prune:
+            removed += [path for path in known if path not in keys]
+
+        rows: set[tuple[str, str, str, str | None]] = set()
+        workers = max_workers
+        if workers is None and len(changed) < POOL_THRESHOLD:
+            workers = 1
+        for record in iter_corpus_sources(changed, workers):
+            if "error" in record:
+                continue
+            output = record["output"]
+            for url in record["mirrors"]:
+                rows.add(("url", normalize_url(url), record["recipe"], output))
+                rows.add(("host", url_host(url), record["recipe"], output))
+            if "sha256" in record["hashes"]:
+                rows.add(("sha256", record["hashes"]["sha256"].lower(), record["recipe"], output))
+
+        with self._lock, self._connection:
+            self._connection.executemany(
+                "DELETE FROM sources WHERE recipe = ?", [(p,) for p in changed + removed]
+            )
+            self._connection.executemany(
+                "DELETE FROM recipes WHERE recipe = ?", [(p,) for p in removed]
+            )
+            self._connection.executemany(
+                "INSERT OR REPLACE INTO recipes (recipe, key) VALUES (?, ?)",
+                [(path, keys[path]) for path in changed],
+            )
+            # the same url can be listed more than once, e.g. as a mirror of itself
+            self._connection.executemany(
+                "INSERT INTO sources (kind, value, recipe, output) VALUES (?, ?, ?, ?)",
+                rows,
+            )
+        return changed + removed
+
+    def _query(self, kind: str, value: str) -> list[SourceReference]:
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT DISTINCT recipe, output FROM sources WHERE kind = ? AND value = ?",
+                (kind, value),
+            ).fetchall()
+        return sorted((SourceReference(*row) for row in rows), key=lambda r: (r[0], r[1] or ""))
+
+    def recipes_for_url(self, url: str) -> list[SourceReference]:
+        """The recipes with a source (or mirror) at `url`, compared after `normalize_url`."""
+        return self._query("url", normalize_url(url))
+
+    def recipes_for_host(self, host: str) -> list[SourceReference]:
+        """The recipes with a source (or mirror) on `host`."""
+        return self._query("host", host.lower())
+
+    def recipes_for_sha256(self, sha256: str) -> list[SourceReference]:
+        """The recipes with a source of the given sha256 hash."""
+        return self._query("sha256", sha256.lower())
+
+    def close(self) -> None:
+        self._connection.close()
+
+    def __enter__(self) -> SourceIndex:  # noqa: PYI034
+        return self
+
+    def __exit__(self, *args: object) -> None:
+        self.close()
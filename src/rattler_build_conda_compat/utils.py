@@ -1,6 +1,5 @@
 from __future__ import annotations
 import fnmatch
-from logging import getLogger
 import os
 from pathlib import Path
 from typing import Any, Iterable, Literal
@@ -8,6 +7,9 @@ from typing import Any, Iterable, Literal
 
 VALID_METAS = ("recipe.yaml",)
 
+# directories that never hold the recipe of a feedstock, but can hold a lot of files
+IGNORED_DIRS = (".git", ".AppleDouble", ".pixi", "__pycache__", "build_artifacts", "node_modules")
+
 
 def islist(arg, uniform=False, include_dict=True):
     """
@@ -113,7 +115,66 @@ def rec_glob(path, patterns, ignores=None):
                 yield os.path.join(path, f)
 
 
-def find_recipe(path):
+class StatCache:
+    """
+    Remembers directory listings, so that resolving many recipe paths in one go
+    (e.g. `has_recipe` followed by `render` of the same feedstock) lists every
+    directory only once. Only share it while the directories don't change.
+    """
+
+    def __init__(self):
+        self._listings = {}
+
+    def listdir(self, path: str) -> dict[str, tuple[bool, bool]]:
+        """Map the names in `path` to whether they are a (non-symlinked) directory and a file."""
+        listing = self._listings.get(path)
+        if listing is None:
+            listing = _listdir(path)
+            self._listings[path] = listing
+        return listing
+
+    def isfile(self, path: str) -> bool:
+        directory, name = os.path.split(path)
+        entry = self.listdir(directory).get(name)
+        return entry is not None and entry[1]
+
+
+def _listdir(path: str) -> dict[str, tuple[bool, bool]]:
+    listing = {}
+    try:
+        with os.scandir(path) as entries:
+            for entry in entries:
+                try:
+                    # like os.walk, don't descend into symlinked directories
+                    listing[entry.name] = (entry.is_dir(follow_symlinks=False), entry.is_file())
+                except OSError:
+                    continue
+    except OSError:
+        pass
+    return listing
+
+
+def _find_files(path, names, ignores, stat_cache=None):
+    """
+    Like `rec_glob(path, names, ignores)` for exact file names, but with `os.scandir`, so that
+    most entries don't need an extra `stat` call.
+    """
+    listdir = stat_cache.listdir if stat_cache is not None else _listdir
+    ignored_names = {ignore for ignore in ignores if not any(c in ignore for c in "*?[")}
+    ignored_patterns = [ignore for ignore in ignores if ignore not in ignored_names]
+
+    pending = [path]
+    while pending:
+        directory = pending.pop()
+        for name, (is_dir, is_file) in listdir(directory).items():
+            if is_file and name in names:
+                yield os.path.join(directory, name)
+            elif is_dir and name not in ignored_names:
+                if not any(fnmatch.fnmatch(name, pattern) for pattern in ignored_patterns):
+                    pending.append(os.path.join(directory, name))
+
+
+def find_recipe(path, ignores=IGNORED_DIRS, stat_cache=None):
     """
     vendored from conda_build.utils to persist same API flow
 
@@ -122,8 +183,11 @@ def find_recipe(path):
     Returns full path to meta file to be built.
 
     If we have a base level meta file and other supplemental (nested) ones, use the base level.
+    A base level meta file is returned without looking at the rest of the tree. Directories
+    matching `ignores` (names or fnmatch patterns) are not searched, and `stat_cache` can be a
+    `StatCache` that is shared between calls.
     """
-    # if initial path is absolute then any path we find (via rec_glob)
+    # if initial path is absolute then any path we find (via _find_files)
     # will also be absolute
     if not os.path.isabs(path):
         path = os.path.normpath(os.path.join(os.getcwd(), path))
@@ -133,7 +197,12 @@ def find_recipe(path):
             return path
         raise OSError("{} is not a valid meta file ({})".format(path, ", ".join(VALID_METAS)))
 
-    results = list(rec_glob(path, VALID_METAS, ignores=(".AppleDouble",)))
+    isfile = stat_cache.isfile if stat_cache is not None else os.path.isfile
+    metas = [m for m in VALID_METAS if isfile(os.path.join(path, m))]
+    if len(metas) == 1:
+        return os.path.join(path, metas[0])
+
+    results = list(_find_files(path, VALID_METAS, ensure_list(ignores), stat_cache))
 
     if not results:
         raise OSError("No meta files ({}) found in {}".format(", ".join(VALID_METAS), path))
@@ -141,22 +210,10 @@ def find_recipe(path):
     if len(results) == 1:
         return results[0]
 
-    # got multiple valid meta files
-    # check if a meta file is defined on the base level in which case use that one
-
-    metas = [m for m in VALID_METAS if os.path.isfile(os.path.join(path, m))]
-    if len(metas) == 1:
-        getLogger(__name__).warn(
-            "Multiple meta files found. "
-            f"The {metas[0]} file in the base directory ({path}) "
-            "will be used."
-        )
-        return os.path.join(path, metas[0])
-
     raise OSError("More than one meta files ({}) found in {}".format(", ".join(VALID_METAS), path))
 
 
-def has_recipe(recipe_dir: Path) -> bool:
+def has_recipe(recipe_dir: Path, stat_cache: StatCache | None = None) -> bool:
     """
 
     verify if recipe_dir contains recipe.yaml
@@ -166,7 +223,7 @@ def has_recipe(recipe_dir: Path) -> bool:
 
     """
     try:
-        recipe_path = find_recipe(recipe_dir)
+        recipe_path = find_recipe(recipe_dir, stat_cache=stat_cache)
         if recipe_path:
             return True
         return False
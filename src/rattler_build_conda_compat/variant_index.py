@@ -0,0 +1,164 @@
+"""
+A persistent index of the variant keys (and values) used by the outputs of many feedstocks,
+to find the feedstocks affected by a pinning change without rendering all of them.
+
+The index is fed with render results, see `VariantIndex.update_from_metadata`, and keeps a key
+of the inputs of every feedstock so that only changed feedstocks need to be rendered again.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import sqlite3
+import threading
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, NamedTuple
+
+from rattler_build_conda_compat.remote_data import cache_dir
+
+if TYPE_CHECKING:
+    import os
+    from collections.abc import Iterable, Mapping
+
+    from rattler_build_conda_compat.render import MetaData
+
+VARIANT_FILES = ("recipe.yaml", "variants.yaml", "conda_build_config.yaml")
+
+
+class VariantUsage(NamedTuple):
+    feedstock: str
+    output: str
+    value: str
+
+
+def default_index_path() -> Path:
+    return cache_dir() / "variant-index.sqlite"
+
+
+def _value_key(value: Any) -> str:  # noqa: ANN401
+    # variant values are strings, numbers or (for zipped keys) lists of them
+    if isinstance(value, str):
+        return value
+    return json.dumps(value, sort_keys=True)
+
+
+def feedstock_inputs_key(recipe_dir: str | os.PathLike[str]) -> str:
+    """
+    A hash of the files of a feedstock that decide which variant keys it uses: its recipe
+    and the variant files next to it.
+
+    The global pinning is deliberately left out. A pinning change would otherwise mark every
+    feedstock as changed, while `VariantIndex.affected_feedstocks` finds the few that use it.
+    """
+    inputs = hashlib.sha256()
+    for name in VARIANT_FILES:
+        inputs.update(name.encode() + b"\0")
+        try:
+            inputs.update(hashlib.sha256((Path(recipe_dir) / name).read_bytes()).digest())
+        except OSError:
+            inputs.update(b"missing")
+    return inputs.hexdigest()
+
+
+class VariantIndex:
+    """The variant keys and values used by every rendered output, keyed by feedstock."""
+
+    def __init__(self, path: str | os.PathLike[str] | None = None) -> None:
+        self.path = Path(path) if path is not None else default_index_path()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(self.path, check_same_thread=False)
+        with self._connection:
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS feedstocks (feedstock TEXT PRIMARY KEY, key TEXT)"
+            )
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS usages ("
+                "variant_key TEXT NOT NULL, value TEXT NOT NULL, "
+                "feedstock TEXT NOT NULL, output TEXT NOT NULL, "
+                "UNIQUE (variant_key, value, feedstock, output))"
+            )
+            self._connection.execute(
+                "CREATE INDEX IF NOT EXISTS usages_by_feedstock ON usages (feedstock)"
+            )
+
+    def is_current(self, feedstock: str, key: str) -> bool:
+        """Whether `feedstock` was indexed with the same inputs `key`."""
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT key FROM feedstocks WHERE feedstock = ?", (feedstock,)
+            ).fetchone()
+        return row is not None and row[0] == key
+
+    def update(
+        self,
+        feedstock: str,
+        used_variants: Iterable[tuple[str, Mapping[str, Any]]],
+        key: str | None = None,
+    ) -> None:
+        """
+        Replace what is known about `feedstock`.
+
+        Arguments:
+        ----------
+        * `feedstock` - The name (or path) of the feedstock.
+        * `used_variants` - `(output name, used variant)` of every rendered output, where the
+          used variant maps the variant keys used by the output to their values. The keys are
+          stored with `-` normalized to `_`, like they are looked up in `usages`.
+        * `key` - The inputs key of the feedstock, see `feedstock_inputs_key`.
+        """
+        rows = {
+            (variant_key.replace("-", "_"), _value_key(value), feedstock, output)
+            for output, used_variant in used_variants
+            for variant_key, value in used_variant.items()
+        }
+        with self._lock, self._connection:
+            self._connection.execute("DELETE FROM usages WHERE feedstock = ?", (feedstock,))
+            self._connection.execute(
+                "INSERT OR REPLACE INTO feedstocks (feedstock, key) VALUES (?, ?)",
+                (feedstock, key),
+            )
+            self._connection.executemany(
+                "INSERT INTO usages (variant_key, value, feedstock, output) VALUES (?, ?, ?, ?)",
+                rows,
+            )
+
+    def update_from_metadata(
+        self, feedstock: str, metadatas: Iterable[MetaData], key: str | None = None
+    ) -> None:
+        """`update` with the rendered outputs of `render`, e.g. `[m for m, _, _ in render(...)]`."""
+        self.update(feedstock, ((m.name(), m.get_used_variant()) for m in metadatas), key)
+
+    def remove(self, feedstock: str) -> None:
+        with self._lock, self._connection:
+            self._connection.execute("DELETE FROM usages WHERE feedstock = ?", (feedstock,))
+            self._connection.execute("DELETE FROM feedstocks WHERE feedstock = ?", (feedstock,))
+
+    def usages(self, variant_key: str, value: Any = None) -> list[VariantUsage]:  # noqa: ANN401
+        """
+        The outputs that use `variant_key` (with `-` normalized to `_`), optionally only those
+        built with the given `value`.
+        """
+        variant_key = variant_key.replace("-", "_")
+        query = "SELECT feedstock, output, value FROM usages WHERE variant_key = ?"
+        params: tuple[str, ...] = (variant_key,)
+        if value is not None:
+            query += " AND value = ?"
+            params += (_value_key(value),)
+        with self._lock:
+            rows = self._connection.execute(query, params).fetchall()
+        return sorted(VariantUsage(*row) for row in rows)
+
+    def affected_feedstocks(self, variant_key: str, value: Any = None) -> list[str]:  # noqa: ANN401
+        """The feedstocks that need to be rendered again when `variant_key` changes."""
+        return sorted({usage.feedstock for usage in self.usages(variant_key, value)})
+
+    def close(self) -> None:
+        self._connection.close()
+
+    def __enter__(self) -> VariantIndex:  # noqa: PYI034
+        return self
+
+    def __exit__(self, *args: object) -> None:
+        self.close()
@@ -0,0 +1,360 @@
+"""
+A lazy variant matrix.
+
+A combined variant spec (see `render.get_package_combined_spec`) maps every variant key to a
+list of values, and `zip_keys` groups keys whose values go together. `VariantSpace` keeps
+one axis per key or zip group instead of the exploded list of variants: the variants are
+generated one by one, the number of variants is known without generating them, and the
+space can be restricted to the keys a recipe uses before the product is taken.
+
+A space is a read-only sequence of variant dicts in the order of `itertools.product` over
+its axes, so it can stand in for conda-build's `config.input_variants` list.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import itertools
+import json
+import math
+from typing import TYPE_CHECKING, Any, Dict, NamedTuple, Sequence, overload
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterable, Iterator, Mapping
+
+# keys that describe the matrix instead of spanning it, passed through to every variant
+PASS_THROUGH_KEYS = ("zip_keys", "extend_keys", "pin_run_as_build")
+
+
+class Axis(NamedTuple):
+    keys: tuple[str, ...]
+    # one tuple of values (one value per key) per point on the axis
+    points: list[tuple[Any, ...]]
+
+
+def _as_list(value: Any) -> list[Any]:  # noqa: ANN401
+    if isinstance(value, (list, tuple)):
+        return list(value)
+    return [value]
+
+
+def _hashable(value: Any) -> Any:  # noqa: ANN401
+    if isinstance(value, (list, tuple)):
+        return tuple(_hashable(v) for v in value)
+    if isinstance(value, dict):
+        return tuple(sorted((k, _hashable(v)) for k, v in value.items()))
+    return value
+
+
+def _zip_groups(spec: Mapping[str, Any]) -> list[tuple[str, ...]]:
+    zip_keys = spec.get("zip_keys") or []
+    if zip_keys and all(isinstance(key, str) for key in zip_keys):
+        # a single group can be given as a flat list
+        zip_keys = [zip_keys]
+    groups = []
+    for group in zip_keys:
+        present = tuple(key for key in group if key in spec)
+        if present:
+            groups.append(present)
+    return groups
+
+
+class VariantSpace(Sequence[Dict[str, Any]]):
+    """The variants spanned by a combined variant spec, generated lazily."""
+
+    def __init__(self, axes: list[Axis], constants: dict[str, Any]) -> None:
+        self.axes = axes
+        self.constants = constants
+
+    @classmethod
+    def from_spec(cls, spec: Mapping[str, Any]) -> VariantSpace:
+        """
+        Build the space of a combined variant spec.
+
+        Raises:
+        -------
+        * `ValueError` - If the keys of a zip group have a different number of values.
+        """
+        groups = _zip_groups(spec)
+        zipped = {key for group in groups for key in group}
+        pass_through = {*PASS_THROUGH_KEYS, *_as_list(spec.get("extend_keys") or [])}
+
+        axes = []
+        for key, values in spec.items():
+            if key not in pass_through and key not in zipped:
+                axes.append(Axis((key,), [(value,) for value in _as_list(values)]))
+        for group in groups:
+            columns = [_as_list(spec[key]) for key in group]
+            if len({len(column) for column in columns}) > 1:
+                lengths = ", ".join(f"{key}: {len(c)}" for key, c in zip(group, columns))
+                msg = f"The zipped keys {list(group)} have different lengths ({lengths})"
+                raise ValueError(msg)
+            axes.append(Axis(group, list(zip(*columns))))
+
+        constants = {
+            key: spec[key]
+            for key in pass_through
+            if key in spec and (spec[key] or spec[key] == "") and key not in zipped
+        }
+        return cls(axes, constants)
+
+    def restrict(self, used_keys: Iterable[str]) -> VariantSpace:
+        """
+        The space of only the `used_keys`. Axes without used keys are dropped, zip groups
+        keep only their used keys, and points that became equal are merged.
+        """
+        used = set(used_keys)
+        axes = []
+        for axis in self.axes:
+            indices = [i for i, key in enumerate(axis.keys) if key in used]
+            if not indices:
+                continue
+            unique: dict[Any, tuple[Any, ...]] = {}
+            for point in axis.points:
+                projected = tuple(point[i] for i in indices)
+                unique.setdefault(_hashable(projected), projected)
+            axes.append(Axis(tuple(axis.keys[i] for i in indices), list(unique.values())))
+        constants = {key: value for key, value in self.constants.items() if key in used}
+        return VariantSpace(axes, constants)
+
+    def filter(self, key: str, values: Iterable[Any]) -> VariantSpace:
+        """
+        Keep the variants whose value of `key` is one of `values`. Like conda-build, a filter
+        that would leave no variants at all is ignored.
+        """
+        allowed = list(values)
+        axes = []
+        for axis in self.axes:
+            if key in axis.keys:
+                i = axis.keys.index(key)
+                kept = [p for p in axis.points if p[i] is not None and p[i] in allowed]
+                axis = Axis(axis.keys, kept) if kept else axis  # noqa: PLW2901
+            axes.append(axis)
+        return VariantSpace(axes, self.constants)
+
+    def matching(self, values: Mapping[str, Any]) -> VariantSpace:
+        """
+        Keep the variants that agree with `values` on every key they have, e.g. the variants
+        a rendered output with that used variant was built from. Unlike `filter`, the result
+        can be empty.
+        """
+        if any(values[key] != value for key, value in self.constants.items() if key in values):
+            return VariantSpace([Axis((), [])], self.constants)
+        axes = []
+        for axis in self.axes:
+            checks = [(i, values[key]) for i, key in enumerate(axis.keys) if key in values]
+            if checks:
+                kept = [p for p in axis.points if all(p[i] == value for i, value in checks)]
+                axis = Axis(axis.keys, kept)  # noqa: PLW2901
+            axes.append(axis)
+        return VariantSpace(axes, self.constants)
+
+    def keys(self) -> list[str]:
+        return [key for axis in self.axes for key in axis.keys] + list(self.constants)
+
+    def __len__(self) -> int:
+        return math.prod(len(axis.points) for axis in self.axes)
+
+    def _variant(self, points: Iterable[tuple[Any, ...]]) -> dict[str, Any]:
+        variant: dict[str, Any] = {}
+        for axis, point in zip(self.axes, points):
+            variant.update(zip(axis.keys, point))
+        variant.update(self.constants)
+        return variant
+
+    def __iter__(self) -> Iterator[dict[str, Any]]:
+        for points in itertools.product(*(axis.points for axis in self.axes)):
+            yield self._variant(points)
+
+    @overload
+    def __getitem__(self, index: int) -> dict[str, Any]: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> list[dict[str, Any]]: ...
+
+    def __getitem__(self, index: int | slice) -> dict[str, Any] | list[dict[str, Any]]:
+        """The variant at `index` of the product, found without generating the ones before it."""
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        length = len(self)
+        if index < 0:
+            index += length
+        if not 0 <= index < length:
+            msg = "variant index out of range"
+            raise IndexError(msg)
+        # the last axis varies fastest, like in `itertools.product`
+        points = []
+        for axis in reversed(self.axes):
+            index, i = divmod(index, len(axis.points))
+            points.append(axis.points[i])
+        return self._variant(reversed(points))
+
+
+def variant_space(
+    combined_spec: Mapping[str, Any],
+    specs: Mapping[str, Mapping[str, Any]] | None = None,
+    used_keys: Iterable[str] | None = None,
+) -> VariantSpace:
+    """
+    The lazy counterpart of conda-build's `filter_combined_spec_to_used_keys`.
+
+    Arguments:
+    ----------
+    * `combined_spec` - The merged variant spec.
+    * `specs` - The specs it was merged from, by source and from low to high priority. Like
+      in conda-build, the variants are narrowed to the values of every key of every spec,
+      from high to low priority, except for the `internal_defaults` spec.
+    * `used_keys` - If given, restrict the space to these keys before anything is generated.
+    """
+    space = VariantSpace.from_spec(combined_spec)
+    # conda-build skips the `extend_keys`. Filtering on the other keys that describe the
+    # matrix never removes a variant: they are mappings or never equal one of their values.
+    pass_through = {*PASS_THROUGH_KEYS, *_as_list(combined_spec.get("extend_keys") or [])}
+    for source, source_spec in reversed(list((specs or {}).items())):
+        if source == "internal_defaults":
+            continue
+        for key, values in source_spec.items():
+            if key not in pass_through and not hasattr(values, "keys"):
+                space = space.filter(key, _as_list(values))
+    if used_keys is not None:
+        space = space.restrict(used_keys)
+    return space
+
+
+def shard_variant_config(variants: Mapping[str, Any], shards: int) -> list[dict[str, Any]]:
+    """
+    Split a variant config into at most `shards` configs that together span the same
+    variants. The config is split along the key (or zip group, whose keys are split
+    together) with the most values.
+    """
+    space = VariantSpace.from_spec(variants)
+    axes = [axis for axis in space.axes if len(axis.points) > 1]
+    if shards < 2 or not axes:  # noqa: PLR2004
+        return [dict(variants)]
+
+    axis = max(axes, key=lambda axis: len(axis.points))
+    count = min(shards, len(axis.points))
+    size, rest = divmod(len(axis.points), count)
+    configs = []
+    start = 0
+    for i in range(count):
+        end = start + size + (1 if i < rest else 0)
+        config = dict(variants)
+        for column, key in enumerate(axis.keys):
+            config[key] = [point[column] for point in axis.points[start:end]]
+        configs.append(config)
+        start = end
+    return configs
+
+
+def _used_variant(rendered: Mapping[str, Any]) -> dict[str, Any]:
+    # the same normalization as `MetaData.get_used_variant`
+    variant = (rendered.get("build_configuration") or {}).get("variant") or {}
+    used = {key.replace("-", "_"): value for key, value in variant.items()}
+    build = (rendered.get("recipe") or {}).get("build") or {}
+    if build.get("noarch"):
+        used.pop("target_platform", None)
+    return used
+
+
+def _rendered_key(rendered: Mapping[str, Any]) -> str:
+    # the rest of `build_configuration` (build directories, timestamp, the subpackages
+    # rendered alongside) differs between rattler-build invocations
+    content = json.dumps(
+        [rendered.get("recipe"), _used_variant(rendered)], sort_keys=True, default=str
+    )
+    return hashlib.sha256(content.encode()).hexdigest()
+
+
+def _output_name(rendered: Mapping[str, Any]) -> str | None:
+    return ((rendered.get("recipe") or {}).get("package") or {}).get("name")
+
+
+def _normalized_spec(variants: Mapping[str, Any]) -> dict[str, Any]:
+    # the variant config with `-` normalized to `_` in its keys, like the used variants
+    spec = {key.replace("-", "_"): value for key, value in variants.items()}
+    zip_keys = spec.get("zip_keys") or []
+    if zip_keys and all(isinstance(key, str) for key in zip_keys):
+        zip_keys = [zip_keys]
+    if zip_keys:
+        spec["zip_keys"] = [[key.replace("-", "_") for key in group] for group in zip_keys]
+    return spec
+
+
+def _variant_order(variants: Mapping[str, Any]) -> Callable[[Mapping[str, Any]], tuple[int, ...]]:
+    # the unsharded space, restricted to the keys an output uses and listed like rattler-build
+    # does: the product over the axes in the order of their sorted keys
+    space = VariantSpace.from_spec(_normalized_spec(variants))
+    listings: dict[frozenset[str], list[tuple[tuple[str, ...], list[tuple[str, ...]]]]] = {}
+
+    def listing(keys: frozenset[str]) -> list[tuple[tuple[str, ...], list[tuple[str, ...]]]]:
+        if keys not in listings:
+            axes = sorted(space.restrict(keys).axes, key=lambda axis: sorted(axis.keys))
+            listings[keys] = [
+                (axis.keys, [tuple(str(value) for value in point) for point in axis.points])
+                for axis in axes
+            ]
+        return listings[keys]
+
+    def order(used_variant: Mapping[str, Any]) -> tuple[int, ...]:
+        # the position of the variant in the listing, values the config does not have last
+        positions = []
+        for keys, points in listing(frozenset(used_variant)):
+            point = tuple(str(used_variant[key]) for key in keys)
+            positions.append(points.index(point) if point in points else len(points))
+        return tuple(positions)
+
+    return order
+
+
+def merge_rendered_recipes(
+    shard_results: Iterable[list[dict[str, Any]]], variants: Mapping[str, Any] | None = None
+) -> list[dict[str, Any]]:
+    """
+    Merge the rendered recipes of several shards into the list an unsharded render returns.
+
+    Outputs that more than one shard rendered (e.g. those that do not use the key the config
+    was split on) are kept once, they are recognized by their `recipe` section and used
+    variant like in `dedupe_rendered_recipes`. rattler-build renders the outputs in
+    dependency order, and the variants of every output in the order of the product over its
+    sorted variant keys. The merged list is put in that order again, by the position of every
+    used variant in the listing of the unsharded `variants` config.
+    """
+    merged: dict[str, dict[str, Any]] = {}
+    output_ranks: dict[str | None, int] = {}
+    for results in shard_results:
+        for rendered in results:
+            output_ranks.setdefault(_output_name(rendered), len(output_ranks))
+            merged.setdefault(_rendered_key(rendered), rendered)
+
+    order = _variant_order(variants or {})
+    return sorted(
+        merged.values(),
+        key=lambda rendered: (
+            output_ranks[_output_name(rendered)],
+            order(_used_variant(rendered)),
+        ),
+    )
+
+
+def dedupe_rendered_recipes(
+    rendered_recipes: Iterable[dict[str, Any]],
+) -> list[tuple[dict[str, Any], list[dict[str, Any]]]]:
+    """
+    Collapse rendered recipes whose `recipe` section and used variant are the same, e.g.
+    noarch outputs that were rendered once per target platform.
+
+    Returns:
+    --------
+    The first of every group of equal rendered recipes, together with the variants
+    (`build_configuration.variant`) of all members of the group.
+    """
+    groups: dict[str, tuple[dict[str, Any], list[dict[str, Any]]]] = {}
+    for rendered in rendered_recipes:
+        key = _rendered_key(rendered)
+        variant = (rendered.get("build_configuration") or {}).get("variant") or {}
+        if key in groups:
+            groups[key][1].append(variant)
+        else:
+            groups[key] = (rendered, [variant])
+    return list(groups.values())
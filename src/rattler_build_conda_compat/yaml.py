@@ -2,6 +2,7 @@ import io
 from typing import Any
 
 from ruamel.yaml import YAML
+from ruamel.yaml.constructor import SafeConstructor
 
 
 # Custom constructor for loading floats as strings
@@ -24,3 +25,20 @@ def _dump_yaml_to_string(data: Any) -> str:  # noqa: ANN401
     with io.StringIO() as f:
         yaml.dump(data, f)
         return f.getvalue()
+
+
+class _StringFloatSafeConstructor(SafeConstructor):
+    pass
+
+
+_StringFloatSafeConstructor.add_constructor("tag:yaml.org,2002:float", float_as_string_constructor)
+
+
+def _safe_yaml_object() -> YAML:
+    """
+    A loader for bulk reads: plain dicts and lists, using the C parser when it is available.
+    Like the round-trip loader, it keeps floats (e.g. versions) as strings.
+    """
+    yaml = YAML(typ="safe")
+    yaml.Constructor = _StringFloatSafeConstructor
+    return yaml
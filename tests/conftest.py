@@ -1,10 +1,35 @@
 from __future__ import annotations
 
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 from os import mkdir
 from pathlib import Path
-from typing import Any
+from typing import TYPE_CHECKING, Any
 
 import pytest
+from rattler_build_conda_compat import lint
+from rattler_build_conda_compat.remote_data import CACHE_DIR_ENV, OFFLINE_ENV, clear_memory_cache
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+
+
+def pytest_configure(config: pytest.Config) -> None:
+    config.addinivalue_line(
+        "markers",
+        "import_time: import time budgets, deselect with `-m 'not import_time'` on noisy machines",
+    )
+
+
+@pytest.fixture(autouse=True)
+def _isolated_cache_dir(
+    tmp_path_factory: pytest.TempPathFactory, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setenv(CACHE_DIR_ENV, str(tmp_path_factory.mktemp("cache")))
+    monkeypatch.delenv(OFFLINE_ENV, raising=False)
+    clear_memory_cache()
 
 
 @pytest.fixture()
@@ -92,3 +117,110 @@ def feedstock_dir_with_recipe(tmpdir: Path) -> Path:
     recipe_dir.mkdir()
 
     return feedstock_dir
+
+
+class LocalHTTPServer:
+    """
+    A small HTTP server that stands in for mirrors and APIs in tests.
+
+    Routes map a path (without the query string) to a dict with an optional `status`, `body`, `headers`, `delay`
+    (in seconds, before the response is sent), `ranges` (serve Range requests) and
+    `truncate` (a list of byte counts after which successive responses are cut off).
+    Requests whose `If-None-Match` matches the `ETag` header of a route get a `304`.
+    """
+
+    def __init__(self) -> None:
+        self.routes: dict[str, dict[str, Any]] = {}
+        self.requests: list[tuple[str, dict[str, str]]] = []
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self) -> None:  # noqa: N802
+                server.requests.append((self.path, dict(self.headers)))
+                route = server.routes.get(self.path.split("?")[0])
+                if route is None:
+                    self.send_error(404)
+                    return
+                time.sleep(route.get("delay", 0))
+                body = route.get("body", b"")
+                status = route.get("status", 200)
+                headers = dict(route.get("headers", {}))
+
+                range_header = self.headers.get("Range")
+                if_range = self.headers.get("If-Range")
+                if route.get("ranges") and range_header and if_range in (None, headers.get("ETag")):
+                    start = int(range_header.split("=")[1].split("-")[0])
+                    if start >= len(body):
+                        self.send_response(416)
+                        self.send_header("Content-Range", f"bytes */{len(body)}")
+                        self.send_header("Content-Length", "0")
+                        self.end_headers()
+                        return
+                    headers["Content-Range"] = f"bytes {start}-{len(body) - 1}/{len(body)}"
+                    status = 206
+                    body = body[start:]
+
+                if_none_match = self.headers.get("If-None-Match")
+                if if_none_match is not None and if_none_match == headers.get("ETag"):
+                    self.send_response(304)
+                    self.end_headers()
+                    return
+
+                self.send_response(status)
+                for key, value in headers.items():
+                    self.send_header(key, value)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+
+                # `truncate` holds byte counts after which the next responses are cut off
+                truncate = route.get("truncate")
+                if truncate:
+                    body = body[: truncate.pop(0)]
+                self.wfile.write(body)
+
+            def log_message(self, *args: object) -> None:
+                pass
+
+        self._httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._httpd.daemon_threads = True
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+
+    def url(self, path: str) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}{path}"
+
+    def requested_paths(self) -> list[str]:
+        return [path for path, _ in self.requests]
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+
+@pytest.fixture()
+def http_server() -> Iterator[LocalHTTPServer]:
+    server = LocalHTTPServer()
+    server.start()
+    yield server
+    server.stop()
+
+
+RECIPE_SCHEMA = {
+    "type": "object",
+    "required": ["package"],
+    "properties": {"build": {"type": "object", "properties": {"number": {"type": "integer"}}}},
+}
+
+
+@pytest.fixture()
+def recipe_schema(http_server: LocalHTTPServer, monkeypatch: pytest.MonkeyPatch) -> Iterator[str]:
+    http_server.routes["/schema.json"] = {"body": json.dumps(RECIPE_SCHEMA).encode()}
+    monkeypatch.setattr(lint, "SCHEMA_URL", http_server.url("/schema.json"))
+    lint.get_recipe_schema.cache_clear()
+    lint.get_recipe_schema_validator.cache_clear()
+    yield lint.SCHEMA_URL
+    lint.get_recipe_schema.cache_clear()
+    lint.get_recipe_schema_validator.cache_clear()
@@ -0,0 +1,113 @@
+from __future__ import annotations
+
+import json
+import shutil
+import tempfile
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+import pytest
+from rattler_build_conda_compat import lint_data
+from rattler_build_conda_compat.daemon import DaemonClient, DaemonError, create_server
+from rattler_build_conda_compat.lint_rules import lint_recipe
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+
+    from conftest import LocalHTTPServer
+
+RECIPE = """\
+context:
+  name: foo
+  version: "1.0.0"
+package:
+  name: ${{ name }}
+  version: ${{ version }}
+requirements:
+  run:
+    - numpy>=1.20
+"""
+
+
+@contextmanager
+def _running_daemon(**kwargs: float) -> Iterator[DaemonClient]:
+    # unix socket paths are limited to ~100 characters, pytest's tmp_path can be longer
+    with tempfile.TemporaryDirectory() as tmp:
+        server = create_server(Path(tmp) / "daemon.sock", **kwargs)
+        thread = threading.Thread(target=server.serve_forever)
+        thread.start()
+        try:
+            yield DaemonClient(server.socket_path)
+        finally:
+            server.shutdown()
+            thread.join()
+            server.server_close()
+
+
+@pytest.fixture()
+def daemon(
+    recipe_schema: str,  # noqa: ARG001
+    http_server: LocalHTTPServer,
+    monkeypatch: pytest.MonkeyPatch,
+) -> Iterator[DaemonClient]:
+    monkeypatch.setattr(lint_data, "HINTS_URL", http_server.url("/hints.toml"))
+    with _running_daemon() as client:
+        yield client
+
+
+def test_daemon(daemon: DaemonClient, tmp_path: Path) -> None:
+    recipe = tmp_path / "recipe.yaml"
+    recipe.write_text(RECIPE)
+
+    assert daemon.ping()
+    assert daemon.lint(recipe) == lint_recipe(recipe)
+    assert daemon.render_context(recipe)["package"] == {"name": "foo", "version": "1.0.0"}
+
+    with pytest.raises(DaemonError, match="FileNotFoundError"):
+        daemon.lint(tmp_path / "missing.yaml")
+    with pytest.raises(DaemonError, match="Unknown command"):
+        daemon.request("frobnicate")
+
+
+def test_second_daemon_is_refused(daemon: DaemonClient) -> None:
+    with pytest.raises(DaemonError, match="already listening"):
+        create_server(daemon.socket_path)
+
+
+def test_client_without_daemon(tmp_path: Path) -> None:
+    client = DaemonClient(tmp_path / "nothing.sock")
+    assert not client.ping()
+
+
+def test_daemon_reloads_the_schema(
+    recipe_schema: str,  # noqa: ARG001
+    http_server: LocalHTTPServer,
+    monkeypatch: pytest.MonkeyPatch,
+    tmp_path: Path,
+) -> None:
+    monkeypatch.setattr(lint_data, "HINTS_URL", http_server.url("/hints.toml"))
+    recipe = tmp_path / "recipe.yaml"
+    recipe.write_text(RECIPE)
+
+    with _running_daemon(cache_max_age=0) as daemon:
+        lints = daemon.lint(recipe).lints
+        schema = json.loads(http_server.routes["/schema.json"]["body"])
+        http_server.routes["/schema.json"] = {
+            "body": json.dumps({**schema, "required": ["package", "about"]}).encode()
+        }
+        new_lints = set(daemon.lint(recipe).lints) - set(lints)
+        assert len(new_lints) == 1
+        assert "about" in new_lints.pop()
+
+
+def test_daemon_renders_with_rattler_build(daemon: DaemonClient, python_recipe: Path) -> None:
+    pytest.importorskip("conda_build")
+    if shutil.which("rattler-build") is None:
+        pytest.skip("needs rattler-build")
+
+    rendered = daemon.render(python_recipe / "recipe.yaml", platform="linux", arch="64")
+    assert len(rendered) == 2
+    # the second request reuses the config of the first one, but not its variants
+    assert daemon.render(python_recipe / "recipe.yaml", platform="linux", arch="64") == rendered
@@ -0,0 +1,204 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import time
+from typing import TYPE_CHECKING
+
+import pytest
+import requests
+from rattler_build_conda_compat.download import (
+    CHUNK_SIZE,
+    MirrorMismatchError,
+    NoMirrorAvailableError,
+    _spool_name,
+    download_resumable,
+    hedged_get,
+    sha256_of_url,
+)
+from rattler_build_conda_compat.modify_recipe import update_hash
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+    from conftest import LocalHTTPServer
+
+CONTENT = b"some tarball content" * 100
+CONTENT_SHA256 = hashlib.sha256(CONTENT).hexdigest()
+
+LARGE_CONTENT = bytes(range(256)) * 4096
+LARGE_CONTENT_SHA256 = hashlib.sha256(LARGE_CONTENT).hexdigest()
+
+
+def test_slow_primary_is_hedged(http_server: LocalHTTPServer) -> None:
+    http_server.routes["/primary.tar.gz"] = {"body": CONTENT, "delay": 2}
+    http_server.routes["/secondary.tar.gz"] = {"body": CONTENT}
+
+    urls = [http_server.url("/primary.tar.gz"), http_server.url("/secondary.tar.gz")]
+    start = time.monotonic()
+    with hedged_get(urls, hedge_delay=0.05) as response:
+        assert response.url == urls[1]
+        assert response.content == CONTENT
+    assert time.monotonic() - start < 1.5
+
+
+def test_fast_primary_is_not_hedged(http_server: LocalHTTPServer) -> None:
+    http_server.routes["/primary.tar.gz"] = {"body": CONTENT}
+    http_server.routes["/secondary.tar.gz"] = {"body": CONTENT}
+
+    urls = [http_server.url("/primary.tar.gz"), http_server.url("/secondary.tar.gz")]
+    assert sha256_of_url(urls, hedge_delay=1) == CONTENT_SHA256
+    assert http_server.requested_paths() == ["/primary.tar.gz"]
+
+
+def test_failing_primary_falls_through(http_server: LocalHTTPServer) -> None:
+    http_server.routes["/secondary.tar.gz"] = {"body": CONTENT}
+
+    urls = [http_server.url("/missing.tar.gz"), http_server.url("/secondary.tar.gz")]
+    source: dict = {"url": urls, "md5": "outdated"}
+    update_hash(source, urls, None)  # type: ignore[arg-type]
+    assert source == {"url": urls, "sha256": CONTENT_SHA256}
+
+
+def test_all_mirrors_failing(http_server: LocalHTTPServer) -> None:
+    urls = [http_server.url("/missing-1.tar.gz"), http_server.url("/missing-2.tar.gz")]
+    with pytest.raises(NoMirrorAvailableError) as exc_info:
+        sha256_of_url(urls, hedge_delay=0.05)
+    assert len(exc_info.value.errors) == 2
+
+
+def test_verify_mirrors(http_server: LocalHTTPServer) -> None:
+    http_server.routes["/a.tar.gz"] = {"body": CONTENT}
+    http_server.routes["/b.tar.gz"] = {"body": CONTENT}
+    http_server.routes["/c.tar.gz"] = {"body": b"tampered"}
+
+    agreeing = [http_server.url("/a.tar.gz"), http_server.url("/b.tar.gz")]
+    assert sha256_of_url(agreeing, verify_mirrors=True) == CONTENT_SHA256
+
+    with pytest.raises(MirrorMismatchError):
+        sha256_of_url([*agreeing, http_server.url("/c.tar.gz")], verify_mirrors=True)
+
+
+def test_resume_interrupted_download(http_server: LocalHTTPServer, tmp_path: Path) -> None:
+    http_server.routes["/large.tar.gz"] = {
+        "body": LARGE_CONTENT,
+        "headers": {"ETag": '"v1"'},
+        "ranges": True,
+        "truncate": [4 * CHUNK_SIZE, 3 * CHUNK_SIZE],
+    }
+
+    download = download_resumable(http_server.url("/large.tar.gz"), tmp_path)
+    assert download.sha256 == LARGE_CONTENT_SHA256
+    assert download.path.read_bytes() == LARGE_CONTENT
+
+    ranges = [headers.get("Range") for _, headers in http_server.requests]
+    assert ranges[0] is None
+    assert ranges[1] == f"bytes={4 * CHUNK_SIZE}-"
+    assert ranges[2] == f"bytes={7 * CHUNK_SIZE}-"
+    assert not list(tmp_path.glob("*.part*"))
+
+    # the finished download is reused
+    assert download_resumable(http_server.url("/large.tar.gz"), tmp_path) == download
+    assert len(http_server.requests) == 3
+
+
+def test_resume_across_calls(http_server: LocalHTTPServer, tmp_path: Path) -> None:
+    http_server.routes["/large.tar.gz"] = {
+        "body": LARGE_CONTENT,
+        "headers": {"ETag": '"v1"'},
+        "ranges": True,
+        "truncate": [2 * CHUNK_SIZE],
+    }
+    url = http_server.url("/large.tar.gz")
+
+    with pytest.raises(requests.RequestException):
+        download_resumable(url, tmp_path, max_attempts=1)
+    assert len(list(tmp_path.glob("*.part"))) == 1
+
+    assert download_resumable(url, tmp_path).sha256 == LARGE_CONTENT_SHA256
+    assert http_server.requests[1][1]["Range"] == f"bytes={2 * CHUNK_SIZE}-"
+
+
+def test_restart_when_range_is_not_honored(http_server: LocalHTTPServer, tmp_path: Path) -> None:
+    http_server.routes["/large.tar.gz"] = {"body": LARGE_CONTENT, "truncate": [100_000]}
+
+    download = download_resumable(http_server.url("/large.tar.gz"), tmp_path)
+    assert download.sha256 == LARGE_CONTENT_SHA256
+    assert download.path.read_bytes() == LARGE_CONTENT
+
+
+def test_update_hash_with_spool_dir(http_server: LocalHTTPServer, tmp_path: Path) -> None:
+    http_server.routes["/large.tar.gz"] = {"body": LARGE_CONTENT, "ranges": True}
+    url = http_server.url("/large.tar.gz")
+
+    source: dict = {"url": url}
+    update_hash(source, url, None, spool_dir=tmp_path)  # type: ignore[arg-type]
+    assert source["sha256"] == LARGE_CONTENT_SHA256
+    assert not list(tmp_path.iterdir())
+
+    update_hash(source, url, None, spool_dir=tmp_path, keep_download=True)  # type: ignore[arg-type]
+    assert [p.read_bytes() for p in tmp_path.glob("*.tar.gz")] == [LARGE_CONTENT]
+
+
+def _leave_partial_download(url: str, spool_dir: Path, content: bytes, etag: str | None) -> None:
+    name = _spool_name(url)
+    (spool_dir / f"{name}.part").write_bytes(content)
+    state = {"url": url, "etag": etag, "last_modified": None}
+    (spool_dir / f"{name}.part.json").write_text(json.dumps(state))
+
+
+def test_finish_complete_partial_download(http_server: LocalHTTPServer, tmp_path: Path) -> None:
+    http_server.routes["/large.tar.gz"] = {
+        "body": LARGE_CONTENT,
+        "headers": {"ETag": '"v1"'},
+        "ranges": True,
+    }
+    url = http_server.url("/large.tar.gz")
+    # e.g. the process died before the partial file was moved into place
+    _leave_partial_download(url, tmp_path, LARGE_CONTENT, '"v1"')
+
+    download = download_resumable(url, tmp_path)
+    assert download.sha256 == LARGE_CONTENT_SHA256
+    assert download.path.read_bytes() == LARGE_CONTENT
+    assert len(http_server.requests) == 1
+
+
+def test_restart_unsatisfiable_range(http_server: LocalHTTPServer, tmp_path: Path) -> None:
+    http_server.routes["/large.tar.gz"] = {
+        "body": CONTENT,
+        "headers": {"ETag": '"v1"'},
+        "ranges": True,
+    }
+    url = http_server.url("/large.tar.gz")
+    # longer than what the server has, so the range cannot be served
+    _leave_partial_download(url, tmp_path, LARGE_CONTENT, '"v1"')
+
+    download = download_resumable(url, tmp_path)
+    assert download.sha256 == CONTENT_SHA256
+    assert [headers.get("Range") for _, headers in http_server.requests] == [
+        f"bytes={len(LARGE_CONTENT)}-",
+        None,
+    ]
+
+
+def test_no_resume_without_validator(http_server: LocalHTTPServer, tmp_path: Path) -> None:
+    http_server.routes["/large.tar.gz"] = {"body": LARGE_CONTENT, "ranges": True}
+    url = http_server.url("/large.tar.gz")
+    _leave_partial_download(url, tmp_path, b"bytes of an older file", None)
+
+    download = download_resumable(url, tmp_path)
+    assert download.path.read_bytes() == LARGE_CONTENT
+    assert http_server.requests[0][1].get("Range") is None
+
+
+def test_only_transient_errors_are_retried(http_server: LocalHTTPServer, tmp_path: Path) -> None:
+    http_server.routes["/gone.tar.gz"] = {"status": 404}
+    http_server.routes["/flaky.tar.gz"] = {"status": 503}
+
+    with pytest.raises(requests.HTTPError, match="404"):
+        download_resumable(http_server.url("/gone.tar.gz"), tmp_path)
+    assert len(http_server.requests) == 1
+
+    with pytest.raises(requests.HTTPError, match="503"):
+        download_resumable(http_server.url("/flaky.tar.gz"), tmp_path, max_attempts=3)
+    assert len(http_server.requests) == 4
@@ -0,0 +1,60 @@
+from __future__ import annotations
+
+import os
+from typing import TYPE_CHECKING
+
+from rattler_build_conda_compat import feedstock_index
+from rattler_build_conda_compat.feedstock_index import load_index, scan_feedstocks
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+    import pytest
+
+
+def _feedstock(root: Path, name: str, *recipes: str) -> Path:
+    recipe_dir = root / name / "recipe"
+    recipe_dir.mkdir(parents=True)
+    for recipe in recipes:
+        (recipe_dir / recipe).touch()
+    return root / name
+
+
+def test_scan_feedstocks(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    root = tmp_path / "feedstocks"
+    v1 = _feedstock(root, "v1-feedstock", "recipe.yaml")
+    legacy = _feedstock(root, "legacy-feedstock", "meta.yaml")
+    mixed = _feedstock(root, "mixed-feedstock", "recipe.yaml", "meta.yaml")
+    empty = _feedstock(root, "empty-feedstock")
+    (v1 / "build_artifacts").mkdir()
+    (v1 / "build_artifacts" / "meta.yaml").touch()
+    index_path = tmp_path / "index.json"
+
+    feedstocks = scan_feedstocks(root, index_path=index_path)
+    assert {os.path.basename(path): info.format for path, info in feedstocks.items()} == {
+        "v1-feedstock": "v1",
+        "legacy-feedstock": "legacy",
+        "mixed-feedstock": "mixed",
+        "empty-feedstock": "none",
+    }
+    assert feedstocks[str(v1)].recipe_path == str(v1 / "recipe" / "recipe.yaml")
+    assert feedstocks[str(legacy)].recipe_path == str(legacy / "recipe" / "meta.yaml")
+    assert feedstocks[str(mixed)].recipe_path == str(mixed / "recipe" / "recipe.yaml")
+    assert load_index(index_path) == feedstocks
+
+    # only the feedstock that changed is scanned again
+    scanned: list[str] = []
+    classify = feedstock_index.classify_feedstock
+
+    def counting_classify(path: str, ignores: tuple[str, ...]) -> feedstock_index.FeedstockInfo:
+        scanned.append(path)
+        return classify(path, ignores)
+
+    monkeypatch.setattr(feedstock_index, "classify_feedstock", counting_classify)
+    (legacy / "recipe" / "meta.yaml").rename(legacy / "recipe" / "recipe.yaml")
+    os.utime(legacy / "recipe", (0, 1))
+
+    feedstocks = scan_feedstocks(root, index_path=index_path)
+    assert scanned == [str(legacy)]
+    assert feedstocks[str(legacy)].format == "v1"
+    assert feedstocks[str(empty)].format == "none"
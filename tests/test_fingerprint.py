@@ -0,0 +1,47 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+from rattler_build_conda_compat.fingerprint import directory_digest, variant_fingerprint
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+
+def test_directory_digest(tmp_path: Path) -> None:
+    (tmp_path / "recipe.yaml").write_text("package:\n  name: foo\n")
+    (tmp_path / "patches").mkdir()
+    (tmp_path / "patches" / "fix.patch").write_text("a")
+    (tmp_path / "__pycache__").mkdir()
+    (tmp_path / "__pycache__" / "x.pyc").write_text("ignored")
+
+    digest = directory_digest(tmp_path)
+    assert directory_digest(tmp_path) == digest
+
+    (tmp_path / "__pycache__" / "y.pyc").write_text("ignored")
+    assert directory_digest(tmp_path) == digest
+
+    (tmp_path / "patches" / "fix.patch").write_text("changed")
+    assert directory_digest(tmp_path) != digest
+
+
+def test_variant_fingerprint(tmp_path: Path) -> None:
+    (tmp_path / "recipe.yaml").write_text("package:\n  name: foo\n")
+    recipe = {"package": {"name": "foo", "version": "1.0"}, "build": {"number": 0}}
+    variant = {"python": "3.12", "numpy": "2"}
+
+    fingerprint = variant_fingerprint(recipe, variant, tmp_path, tool_version="0.1")
+    # independent of the order of mappings
+    assert fingerprint == variant_fingerprint(
+        {"build": {"number": 0}, "package": {"version": "1.0", "name": "foo"}},
+        {"numpy": "2", "python": "3.12"},
+        tmp_path,
+        tool_version="0.1",
+    )
+
+    assert fingerprint != variant_fingerprint(recipe, variant, tmp_path, tool_version="0.2")
+    assert fingerprint != variant_fingerprint(
+        recipe, {**variant, "python": "3.13"}, tmp_path, tool_version="0.1"
+    )
+    (tmp_path / "build.sh").write_text("make")
+    assert fingerprint != variant_fingerprint(recipe, variant, tmp_path, tool_version="0.1")
@@ -0,0 +1,63 @@
+from __future__ import annotations
+
+import copy
+import json
+import pickle
+
+import pytest
+from rattler_build_conda_compat.frozen import (
+    FrozenDict,
+    FrozenList,
+    TreeInterner,
+    share_rendered_recipes,
+)
+
+
+def _rendered(python: str) -> dict:
+    return {
+        "recipe": {
+            "package": {"name": "foo", "version": "1.0"},
+            "about": {"license": "MIT", "summary": "foo"},
+            "requirements": {"host": ["python " + python, "pip"], "run": ["numpy"]},
+        },
+        "build_configuration": {"variant": {"python": python}},
+    }
+
+
+def test_share_rendered_recipes() -> None:
+    first, second = share_rendered_recipes([_rendered("3.12"), _rendered("3.13")])
+
+    assert first == _rendered("3.12")
+    assert second == _rendered("3.13")
+    assert json.loads(json.dumps(first)) == _rendered("3.12")
+
+    assert first["recipe"]["about"] is second["recipe"]["about"]
+    assert first["recipe"]["requirements"]["run"] is second["recipe"]["requirements"]["run"]
+    assert first["recipe"]["requirements"]["host"] is not second["recipe"]["requirements"]["host"]
+
+    # the top level stays mutable, e.g. for `MetaData.meta["about"]`
+    first["about"] = first["recipe"]["about"]
+    with pytest.raises(TypeError, match="read-only"):
+        first["recipe"]["about"]["license"] = "BSD"
+    with pytest.raises(TypeError, match="read-only"):
+        first["recipe"]["requirements"]["run"].append("scipy")
+
+
+def test_interner_keeps_types_apart() -> None:
+    interner = TreeInterner()
+    one = interner.intern({"value": 1})
+    true = interner.intern({"value": True})
+
+    assert one is not true
+    assert true["value"] is True
+    assert interner.intern([1, {"value": 1}]) is interner.intern([1, {"value": 1}])
+
+
+def test_frozen_copies() -> None:
+    frozen = TreeInterner().intern({"a": [1, {"b": "c"}]})
+
+    assert copy.deepcopy(frozen) is frozen
+    unpickled = pickle.loads(pickle.dumps(frozen))  # noqa: S301
+    assert unpickled == frozen
+    assert isinstance(unpickled, FrozenDict)
+    assert isinstance(unpickled["a"], FrozenList)
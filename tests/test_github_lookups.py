@@ -0,0 +1,174 @@
+from __future__ import annotations
+
+import json
+import os
+import time
+from typing import TYPE_CHECKING
+
+import github
+import pytest
+from rattler_build_conda_compat import github_lookups, lint_data
+from rattler_build_conda_compat.github_lookups import GitHubLookups, TTLCache
+from rattler_build_conda_compat.lint import run_conda_forge_specific
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+    from conftest import LocalHTTPServer
+
+
+def _json(data: object, **headers: str) -> dict:
+    return {
+        "body": json.dumps(data).encode(),
+        "headers": {"Content-Type": "application/json", **headers},
+    }
+
+
+@pytest.fixture()
+def fake_github(http_server: LocalHTTPServer) -> github.Github:
+    return github.Github(base_url=http_server.url(""), seconds_between_requests=None, retry=None)
+
+
+def test_existence_lookups(http_server: LocalHTTPServer, fake_github: github.Github) -> None:
+    http_server.routes["/users/alice"] = _json({"login": "alice"})
+    http_server.routes["/repos/conda-forge/foo-feedstock"] = _json({"name": "foo-feedstock"})
+    http_server.routes["/repos/bioconda/bioconda-recipes/contents/recipes/foo"] = _json([])
+
+    lookups = GitHubLookups(fake_github, cache=TTLCache())
+    assert lookups.user_exists("alice")
+    assert not lookups.user_exists("bob")
+    assert lookups.repo_exists("conda-forge", "foo-feedstock")
+    assert not lookups.repo_exists("conda-forge", "bar-feedstock")
+    assert lookups.path_exists("bioconda", "bioconda-recipes", "recipes/foo")
+
+    # answers are cached
+    assert lookups.user_exists("alice")
+    assert not lookups.user_exists("bob")
+    assert len(http_server.requests) == 5
+
+
+def test_expired_entries_are_revalidated(
+    http_server: LocalHTTPServer, fake_github: github.Github
+) -> None:
+    http_server.routes["/users/alice"] = _json({"login": "alice"}, ETag='"alice-v1"')
+
+    lookups = GitHubLookups(fake_github, cache=TTLCache(ttl=0))
+    assert lookups.user_exists("alice")
+    assert lookups.user_exists("alice")
+    assert http_server.requests[1][1]["If-None-Match"] == '"alice-v1"'
+
+
+def test_maintainers_are_checked_concurrently(
+    http_server: LocalHTTPServer, fake_github: github.Github
+) -> None:
+    maintainers = [f"maintainer-{i}" for i in range(8)]
+    for maintainer in maintainers:
+        http_server.routes[f"/users/{maintainer}"] = {**_json({"login": maintainer}), "delay": 0.5}
+
+    lookups = GitHubLookups(fake_github, cache=TTLCache())
+    start = time.monotonic()
+    assert lookups.users_exist([*maintainers, "ghost"]) == {
+        **{maintainer: True for maintainer in maintainers},
+        "ghost": False,
+    }
+    assert time.monotonic() - start < 2
+
+
+def _staged_recipes_pr(
+    http_server: LocalHTTPServer, number: int, author: str, commenters: list[str]
+) -> None:
+    repo_url = http_server.url("/repos/conda-forge/staged-recipes")
+    http_server.routes["/repos/conda-forge/staged-recipes"] = _json(
+        {"full_name": "conda-forge/staged-recipes", "url": repo_url}
+    )
+    http_server.routes[f"/repos/conda-forge/staged-recipes/pulls/{number}"] = _json(
+        {
+            "number": number,
+            "url": f"{repo_url}/pulls/{number}",
+            "issue_url": f"{repo_url}/issues/{number}",
+            "user": {"login": author},
+        }
+    )
+    # the first commenter leaves an issue comment, the others a review
+    http_server.routes[f"/repos/conda-forge/staged-recipes/issues/{number}/comments"] = _json(
+        [{"id": 1, "user": {"login": login}} for login in commenters[:1]]
+    )
+    http_server.routes[f"/repos/conda-forge/staged-recipes/pulls/{number}/reviews"] = _json(
+        [{"id": i, "user": {"login": login}} for i, login in enumerate(commenters[1:], 2)]
+    )
+
+
+def test_pr_participants(http_server: LocalHTTPServer, fake_github: github.Github) -> None:
+    _staged_recipes_pr(http_server, 42, "author", ["alice", "bob"])
+
+    lookups = GitHubLookups(fake_github, cache=TTLCache())
+    author, commenters = lookups.pr_participants("conda-forge/staged-recipes", 42)
+    assert author == "author"
+    assert commenters == {"alice", "bob"}
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="needs fork")
+def test_shared_executor_after_fork() -> None:
+    parent_executor = github_lookups._default_executor()  # noqa: SLF001
+    assert parent_executor.submit(lambda: 1).result() == 1
+
+    pid = os.fork()
+    if pid == 0:
+        # the threads of the parent's executor do not exist in the child
+        executor = github_lookups._default_executor()  # noqa: SLF001
+        ok = executor is not parent_executor and executor.submit(lambda: 1).result(timeout=5) == 1
+        os._exit(0 if ok else 1)
+    _, status = os.waitpid(pid, 0)
+    assert status == 0
+    assert github_lookups._default_executor() is parent_executor  # noqa: SLF001
+
+
+def test_run_conda_forge_specific(
+    http_server: LocalHTTPServer, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    http_server.routes["/users/alice"] = _json({"login": "alice"})
+    http_server.routes["/users/bob"] = _json({"login": "bob"})
+    http_server.routes["/repos/conda-forge/foo-bar-feedstock"] = _json(
+        {"name": "foo-bar-feedstock"}
+    )
+    http_server.routes["/repos/bioconda/bioconda-recipes/contents/recipes/foo_bar"] = _json([])
+    _staged_recipes_pr(http_server, 42, "alice", ["bob"])
+    http_server.routes["/hints.toml"] = {"body": b'[hints]\nmatplotlib = "Use matplotlib-base."\n'}
+    http_server.routes["/name_mapping.yaml"] = {
+        "body": b"- pypi_name: foo-bar\n  conda_name: foo-bar-py\n"
+    }
+    monkeypatch.setattr(lint_data, "HINTS_URL", http_server.url("/hints.toml"))
+    monkeypatch.setattr(lint_data, "NAME_MAPPING_URL", http_server.url("/name_mapping.yaml"))
+    lint_data.get_pypi_name_mapping.cache_clear()
+    monkeypatch.setenv("GH_TOKEN", "token")
+    monkeypatch.setenv("GITHUB_API_URL", http_server.url(""))
+    monkeypatch.setenv("STAGED_RECIPES_PR_NUMBER", "42")
+
+    recipe_dir = tmp_path / "recipes" / "foo_bar"
+    recipe_dir.mkdir(parents=True)
+    (tmp_path / "recipes" / "example").mkdir()
+    (tmp_path / "recipes" / "example" / "meta.yaml").write_text("")
+
+    lints, hints = run_conda_forge_specific(
+        str(recipe_dir),
+        {"name": "foo_bar"},
+        {"recipe-maintainers": ["alice", "bob", "ghost"]},
+        [{"url": "https://pypi.io/packages/source/f/foo-bar/foo-bar-1.0.tar.gz"}],
+        {"run": ["matplotlib"]},
+        [],
+    )
+    lint_data.get_pypi_name_mapping.cache_clear()
+
+    assert lints == [
+        'Recipe maintainer "ghost" does not exist',
+        "The following maintainers have not yet confirmed that they are willing to be listed "
+        "here: ghost. Please ask them to comment on this PR if they are.",
+    ]
+    assert hints == [
+        "Feedstock with the name foo-bar exists in conda-forge. Is it the same as this package "
+        "(foo_bar)?",
+        "Recipe with the same name exists in bioconda: please discuss with "
+        "@conda-forge/bioconda-recipes.",
+        "A conda package with same name (foo-bar-py) already exists.",
+        "Use matplotlib-base.",
+    ]
@@ -0,0 +1,77 @@
+from __future__ import annotations
+
+import json
+import subprocess
+import sys
+
+import pytest
+
+# importing any of these costs a few hundred milliseconds
+HEAVY_MODULES = {"conda", "conda_build", "github", "jsonschema", "requests"}
+
+# every module imports ruamel.yaml, its import time is the yardstick for the others
+BASELINE_MODULE = "ruamel.yaml"
+
+# cumulative `-X importtime` budgets, as multiples of the import time of the baseline module
+IMPORT_BUDGET = {
+    "loader": 5,
+    "recipe_sources": 3,
+    "utils": 3,
+    "lint": 8,
+    "lint_rules": 8,
+    "modify_recipe": 8,
+}
+
+# the best of a few runs, so a single slow run does not fail the budget
+RUNS = 3
+
+
+def _import_in_subprocess(module: str) -> tuple[set[str], int]:
+    code = f"import sys, json, {module}; print(json.dumps(sorted(sys.modules)))"
+    result = subprocess.run(  # noqa: S603
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    cumulative_us = 0
+    for line in result.stderr.splitlines():
+        # import time: self [us] | cumulative | imported package
+        if line.startswith("import time:") and line.split("|")[-1].strip() == module:
+            cumulative_us = int(line.split("|")[1])
+    return set(json.loads(result.stdout)), cumulative_us
+
+
+def _best_import_time(module: str) -> int:
+    return min(_import_in_subprocess(module)[1] for _ in range(RUNS))
+
+
+@pytest.mark.parametrize("module", sorted(IMPORT_BUDGET))
+def test_import_is_lazy(module: str) -> None:
+    modules, _ = _import_in_subprocess(f"rattler_build_conda_compat.{module}")
+    assert not {name.split(".")[0] for name in modules} & HEAVY_MODULES
+
+
+@pytest.mark.import_time()
+@pytest.mark.parametrize("module", sorted(IMPORT_BUDGET))
+def test_import_time_budget(module: str) -> None:
+    baseline_us = _best_import_time(BASELINE_MODULE)
+    cumulative_us = _best_import_time(f"rattler_build_conda_compat.{module}")
+    assert cumulative_us <= IMPORT_BUDGET[module] * baseline_us, (
+        f"importing {module} took {cumulative_us} us, "
+        f"{cumulative_us / baseline_us:.1f} times as long as {BASELINE_MODULE}"
+    )
+
+
+def test_lazy_names_of_lint() -> None:
+    import github
+    import jsonschema
+    import requests
+    from rattler_build_conda_compat import lint
+
+    assert lint.github is github
+    assert lint.requests is requests
+    assert lint.Draft202012Validator is jsonschema.Draft202012Validator
+    assert lint.VersionOrder.__name__ == "VersionOrder"
+    with pytest.raises(AttributeError):
+        lint.does_not_exist  # noqa: B018
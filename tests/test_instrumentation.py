@@ -0,0 +1,80 @@
+from __future__ import annotations
+
+import json
+from typing import TYPE_CHECKING
+
+import pytest
+from rattler_build_conda_compat import instrumentation, lint
+from rattler_build_conda_compat.lint_rules import run_lint_rules
+from rattler_build_conda_compat.remote_data import fetch_remote_data
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+    from pathlib import Path
+
+    from conftest import LocalHTTPServer
+
+
+@pytest.fixture()
+def instrumented() -> Iterator[list[instrumentation.Measurement]]:
+    measurements: list[instrumentation.Measurement] = []
+    instrumentation.reset()
+    instrumentation.enable()
+    instrumentation.add_hook(measurements.append)
+    yield measurements
+    instrumentation.remove_hook(measurements.append)
+    instrumentation.disable()
+    instrumentation.reset()
+
+
+def test_rules_are_timed(instrumented: list[instrumentation.Measurement], tmp_path: Path) -> None:
+    recipe = {"requirements": {"host": ["python >=3.8"], "run": ["numpy>=1", "pip"]}}
+    report = run_lint_rules(recipe)
+
+    rules = instrumentation.report()["rule"]
+    assert rules["requirement-spacing"]["calls"] == 3
+    assert rules["requirement-spacing"]["results"] == 1
+    assert sum(stats["results"] for stats in rules.values()) == len(report.messages)
+    # the rules call the functions of `lint`, which are timed too
+    assert {m.category for m in instrumented} == {"rule", "lint"}
+
+    path = tmp_path / "report.json"
+    instrumentation.write_report(path)
+    assert json.loads(path.read_text()) == instrumentation.report()
+
+
+def test_lint_functions_are_timed(instrumented: list[instrumentation.Measurement]) -> None:
+    requirements = {"host": ["python >=3.8"], "run": ["python"]}
+    lints = lint.lint_non_noarch_dont_constrain_python_and_rbase(requirements)
+    lint.lint_non_noarch_dont_constrain_python_and_rbase({})
+
+    stats = instrumentation.report()["lint"]["lint_non_noarch_dont_constrain_python_and_rbase"]
+    assert stats["calls"] == 2
+    assert stats["results"] == len(lints) == 1
+    assert lint.lint_non_noarch_dont_constrain_python_and_rbase.__name__ == (
+        "lint_non_noarch_dont_constrain_python_and_rbase"
+    )
+    assert {m.category for m in instrumented} == {"lint"}
+
+
+def test_network_calls_are_timed(
+    instrumented: list[instrumentation.Measurement],  # noqa: ARG001
+    http_server: LocalHTTPServer,
+) -> None:
+    http_server.routes["/data.json"] = {"body": b"{}"}
+    url = http_server.url("/data.json")
+    fetch_remote_data(url)
+    fetch_remote_data(url, max_age=60)
+
+    assert instrumentation.report()["network"][url]["calls"] == 1
+
+
+def test_timed_iter_counts_items(instrumented: list[instrumentation.Measurement]) -> None:
+    assert list(instrumentation.timed_iter("schema", "validation", iter("abc"))) == ["a", "b", "c"]
+    assert instrumented[-1].results == 3
+
+
+def test_disabled_by_default() -> None:
+    instrumentation.reset()
+    run_lint_rules({"requirements": {"run": ["numpy>=1"]}})
+    assert instrumentation.report() == {}
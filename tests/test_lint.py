@@ -0,0 +1,52 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+from jsonschema import Draft202012Validator
+from rattler_build_conda_compat import lint
+from rattler_build_conda_compat.lint_rules import lint_recipe
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+    import pytest
+
+
+def test_lint_recipe_yaml_by_schema(recipe_schema: str, tmp_path: Path) -> None:  # noqa: ARG001
+    recipe = tmp_path / "recipe.yaml"
+    recipe.write_text("build:\n  number: foo\n")
+
+    lints = lint.lint_recipe_yaml_by_schema(recipe)
+    assert len(lints) == 2
+    assert any("'package' is a required property" in msg for msg in lints)
+
+    # the validator is built only once
+    assert lint.get_recipe_schema_validator() is lint.get_recipe_schema_validator()
+
+
+def test_iter_recipe_yaml_schema_lints(recipe_schema: str, tmp_path: Path) -> None:  # noqa: ARG001
+    recipe = tmp_path / "recipe.yaml"
+    recipe.write_text("build:\n  number: foo\n")
+
+    assert len(list(lint.iter_recipe_yaml_schema_lints(recipe))) == 2
+    assert len(list(lint.iter_recipe_yaml_schema_lints(recipe, max_errors=1))) == 1
+    assert len(list(lint.iter_recipe_yaml_schema_lints(recipe, fail_fast=True))) == 1
+    assert len(lint.lint_recipe_yaml_by_schema(recipe, max_errors=1)) == 1
+
+
+def test_schema_lints_are_deduplicated(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    schema = {"type": "object", "additionalProperties": {"type": "integer"}}
+    validator = Draft202012Validator(schema)
+    monkeypatch.setattr(lint, "get_recipe_schema_validator", lambda: validator)
+
+    recipe = tmp_path / "recipe.yaml"
+    recipe.write_text("a: foo\nb: bar\nc: baz\n")
+
+    assert len(list(lint.iter_recipe_yaml_schema_lints(recipe, deduplicate=True))) == 1
+    assert len(list(lint.iter_recipe_yaml_schema_lints(recipe))) == 3
+
+    # both entry points report the same schema lints
+    schema_lints = lint.lint_recipe_yaml_by_schema(recipe)
+    assert len(schema_lints) == 3
+    report = lint_recipe(recipe)
+    assert [m.message for m in report.messages if m.rule == "schema"] == schema_lints
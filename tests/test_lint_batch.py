@@ -0,0 +1,55 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+import pytest
+from rattler_build_conda_compat import lint, lint_data
+from rattler_build_conda_compat.lint_batch import lint_many
+from rattler_build_conda_compat.lint_rules import lint_recipe
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+    from conftest import LocalHTTPServer
+
+
+@pytest.mark.parametrize("max_workers", [1, 2])
+def test_lint_many(
+    recipe_schema: str,  # noqa: ARG001
+    http_server: LocalHTTPServer,
+    monkeypatch: pytest.MonkeyPatch,
+    tmp_path: Path,
+    max_workers: int,
+) -> None:
+    monkeypatch.setattr(lint_data, "HINTS_URL", http_server.url("/hints.toml"))
+
+    recipes = []
+    for i in range(5):
+        (tmp_path / f"r{i}").mkdir()
+        recipe = tmp_path / f"r{i}" / "recipe.yaml"
+        recipe.write_text(f"package:\n  name: r{i}\nrequirements:\n  run:\n    - numpy>={i}\n")
+        recipes.append(recipe)
+    broken = tmp_path / "broken.yaml"
+    broken.write_text("package: [unclosed\n")
+
+    results = dict(lint_many([*recipes, broken], max_workers=max_workers))
+
+    assert set(results) == {str(path) for path in [*recipes, broken]}
+    for recipe in recipes:
+        assert results[str(recipe)] == lint_recipe(recipe)
+    assert [m.rule for m in results[str(broken)].messages] == ["load"]
+
+
+def test_lint_many_without_schema(
+    http_server: LocalHTTPServer, monkeypatch: pytest.MonkeyPatch, tmp_path: Path
+) -> None:
+    monkeypatch.setattr(lint, "SCHEMA_URL", http_server.url("/missing-schema.json"))
+    lint.get_recipe_schema.cache_clear()
+    lint.get_recipe_schema_validator.cache_clear()
+    recipe = tmp_path / "recipe.yaml"
+    recipe.write_text("package:\n  name: foo\n")
+
+    # the failed warm-up does not break the pool, every recipe reports the error instead
+    results = dict(lint_many([recipe, recipe], max_workers=2))
+    assert [m.rule for m in results[str(recipe)].messages] == ["load"]
+    assert "missing-schema.json" in results[str(recipe)].messages[0].message
@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+import pytest
+from rattler_build_conda_compat import lint_data
+from rattler_build_conda_compat.remote_data import CACHE_DIR_ENV
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+    from pathlib import Path
+
+    from conftest import LocalHTTPServer
+
+NAME_MAPPING = b"""
+- pypi_name: build
+  conda_name: python-build
+  import_name: build
+- pypi_name: torch
+  conda_name: pytorch
+- pypi_name: torch
+  conda_name: pytorch-cpu
+"""
+
+
+@pytest.fixture()
+def name_mapping_url(
+    http_server: LocalHTTPServer, monkeypatch: pytest.MonkeyPatch
+) -> Iterator[str]:
+    http_server.routes["/name_mapping.yaml"] = {
+        "body": NAME_MAPPING,
+        "headers": {"ETag": '"mapping-v1"'},
+    }
+    monkeypatch.setattr(lint_data, "NAME_MAPPING_URL", http_server.url("/name_mapping.yaml"))
+    lint_data.get_pypi_name_mapping.cache_clear()
+    yield lint_data.NAME_MAPPING_URL
+    lint_data.get_pypi_name_mapping.cache_clear()
+
+
+def test_pypi_name_lookup(name_mapping_url: str, http_server: LocalHTTPServer) -> None:  # noqa: ARG001
+    assert lint_data.conda_names_for_pypi_name("build") == ["python-build"]
+    assert lint_data.conda_names_for_pypi_name("torch") == ["pytorch", "pytorch-cpu"]
+    assert lint_data.conda_names_for_pypi_name("unknown") == []
+    assert len(http_server.requests) == 1
+
+
+def test_index_is_reused_until_the_mapping_changes(
+    name_mapping_url: str,  # noqa: ARG001
+    http_server: LocalHTTPServer,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setattr(lint_data, "LINT_DATA_MAX_AGE", 0)
+    lint_data.get_pypi_name_mapping()
+    lint_data.get_pypi_name_mapping.cache_clear()
+
+    def fail(raw: bytes) -> None:
+        raise AssertionError(raw)
+
+    # an unchanged mapping is revalidated but not parsed again
+    parse_name_mapping = lint_data._parse_name_mapping  # noqa: SLF001
+    monkeypatch.setattr(lint_data, "_parse_name_mapping", fail)
+    assert lint_data.conda_names_for_pypi_name("build") == ["python-build"]
+    assert http_server.requests[1][1]["If-None-Match"] == '"mapping-v1"'
+    monkeypatch.setattr(lint_data, "_parse_name_mapping", parse_name_mapping)
+
+    lint_data.get_pypi_name_mapping.cache_clear()
+    http_server.routes["/name_mapping.yaml"] = {
+        "body": b"- pypi_name: build\n  conda_name: build\n",
+        "headers": {"ETag": '"mapping-v2"'},
+    }
+    assert lint_data.conda_names_for_pypi_name("build") == ["build"]
+
+
+def test_index_without_a_writable_cache(
+    name_mapping_url: str,  # noqa: ARG001
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    (tmp_path / "file").write_text("")
+    monkeypatch.setenv(CACHE_DIR_ENV, str(tmp_path / "file" / "cache"))
+    assert lint_data.conda_names_for_pypi_name("torch") == ["pytorch", "pytorch-cpu"]
+
+
+@pytest.fixture()
+def hints_url(http_server: LocalHTTPServer, monkeypatch: pytest.MonkeyPatch) -> str:
+    http_server.routes["/hints.toml"] = {
+        "body": b'[hints]\nmatplotlib = "Use matplotlib-base."\n',
+        "headers": {"ETag": '"hints-v1"'},
+    }
+    monkeypatch.setattr(lint_data, "HINTS_URL", http_server.url("/hints.toml"))
+    return lint_data.HINTS_URL
+
+
+def test_linter_hints_are_fetched_once(hints_url: str, http_server: LocalHTTPServer) -> None:  # noqa: ARG001
+    for _ in range(500):
+        assert lint_data.get_linter_hints() == {"matplotlib": "Use matplotlib-base."}
+    assert len(http_server.requests) == 1
+
+
+def test_linter_hints_expire(
+    hints_url: str,  # noqa: ARG001
+    http_server: LocalHTTPServer,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setattr(lint_data, "LINT_DATA_MAX_AGE", 0)
+    lint_data.get_linter_hints()
+    lint_data.get_linter_hints()
+    assert http_server.requests[1][1]["If-None-Match"] == '"hints-v1"'
+
+    # without a network, the cached copy is used
+    http_server.stop()
+    assert lint_data.get_linter_hints() == {"matplotlib": "Use matplotlib-base."}
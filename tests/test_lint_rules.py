@@ -0,0 +1,110 @@
+from __future__ import annotations
+
+from typing import Any
+
+import pytest
+from rattler_build_conda_compat import lint
+from rattler_build_conda_compat.lint_rules import (
+    LintReport,
+    LintRule,
+    Node,
+    Scope,
+    register_rule,
+    run_lint_rules,
+)
+
+RECIPE: dict[str, Any] = {
+    "context": {"name": "foo", "version": "1.0.0"},
+    "package": {"name": "${{ name }}", "version": "${{ version }}"},
+    "source": {"url": "https://example.com/foo-1.0.0.tar.gz"},
+    "build": {"number": 0, "script": "python setup.py install"},
+    "requirements": {
+        "host": ["python >=3.8", "pip"],
+        "run": ["python", "numpy>=1.20"],
+    },
+    "about": {"homepage": "https://example.com", "license": "MIT", "summary": "foo"},
+    "extra": {"recipe-maintainers": ["someone"]},
+    "outputs": [
+        {
+            "package": {"name": "libfoo"},
+            "requirements": {
+                "build": ["pip", "numpy x.x"],
+                "run": [{"if": "unix", "then": ["bar >= 1.0"]}],
+            },
+        }
+    ],
+}
+
+
+def test_run_lint_rules() -> None:
+    report = run_lint_rules(RECIPE)
+
+    assert "license_file entry is missing, but is required." in report.lints
+    assert (
+        "When defining a source/url please add a sha256, sha1 or md5 checksum (sha256 preferably)."
+        in report.lints
+    )
+    assert any("Using pinned numpy packages" in msg for msg in report.lints)
+    assert any("python packages should use pip" in msg for msg in report.hints)
+
+    # requirement rules see the top-level recipe, the outputs and conditional branches
+    by_rule = {(m.rule, m.output): m.message for m in report.messages}
+    assert ("requirement-spacing", None) in by_rule
+    assert "``requirements: run: bar >= 1.0``" in by_rule[("requirement-spacing", "libfoo")]
+    assert ("non-noarch-language-constraints", None) in by_rule
+
+    # the selector in the output keeps it from being a noarch candidate
+    assert not any(m.rule == "noarch-usage" for m in report.messages)
+
+    # the engine agrees with the standalone lint functions
+    assert lint.lint_usage_of_single_space_in_pinned_requirements(RECIPE["requirements"]) == [
+        m.message for m in report.messages if m.rule == "requirement-spacing" and m.output is None
+    ]
+
+
+def test_recipe_is_walked_once() -> None:
+    seen: list[tuple[str, str | None]] = []
+
+    class CountingRule(LintRule):
+        name = "counting"
+        node_kinds = ("requirement",)
+
+        def visit(self, node: Node, report: LintReport) -> None:  # noqa: ARG002
+            seen.append((node.value, node.section))
+
+    report = run_lint_rules(RECIPE, rules=[CountingRule])
+    assert report.messages == []
+    assert seen == [
+        ("python >=3.8", "host"),
+        ("pip", "host"),
+        ("python", "run"),
+        ("numpy>=1.20", "run"),
+        ("pip", "build"),
+        ("numpy x.x", "build"),
+        ("bar >= 1.0", "run"),
+    ]
+
+
+def test_requirements_are_collected_per_scope() -> None:
+    collected: dict[str | None, tuple[dict[str, list[str]], bool]] = {}
+
+    class CollectingRule(LintRule):
+        name = "collecting"
+
+        def leave_scope(self, scope: Scope, report: LintReport) -> None:  # noqa: ARG002
+            collected[scope.name] = (scope.requirements, scope.has_conditional_requirements)
+
+    run_lint_rules(RECIPE, rules=[CollectingRule])
+    assert collected == {
+        None: ({"host": ["python >=3.8", "pip"], "run": ["python", "numpy>=1.20"]}, False),
+        "libfoo": ({"build": ["pip", "numpy x.x"], "run": ["bar >= 1.0"]}, True),
+    }
+
+
+def test_register_rule_rejects_unknown_node_kinds() -> None:
+    class BadRule(LintRule):
+        name = "bad"
+        node_kinds = ("nonsense",)
+
+    with pytest.raises(ValueError, match="unknown node kinds"):
+        register_rule(BadRule)
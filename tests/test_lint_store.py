@@ -0,0 +1,91 @@
+from __future__ import annotations
+
+import json
+from typing import TYPE_CHECKING
+
+import pytest
+from rattler_build_conda_compat import lint, lint_data, lint_store
+from rattler_build_conda_compat.lint_store import LintResultStore, lint_recipes_incremental
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+    from conftest import LocalHTTPServer
+
+RECIPE = """\
+package:
+  name: foo
+  version: 1.0.0
+build:
+  number: foo
+requirements:
+  run:
+    - numpy>=1.20
+"""
+
+
+@pytest.fixture()
+def linted(recipe_schema: str, monkeypatch: pytest.MonkeyPatch) -> list[str]:  # noqa: ARG001
+    linted: list[str] = []
+    lint_recipe = lint_store.lint_recipe
+
+    def counting_lint_recipe(recipe_file: str) -> lint_store.LintReport:
+        linted.append(str(recipe_file))
+        return lint_recipe(recipe_file)
+
+    monkeypatch.setattr(lint_store, "lint_recipe", counting_lint_recipe)
+    return linted
+
+
+def test_unchanged_recipes_are_not_linted_again(
+    linted: list[str], http_server: LocalHTTPServer, tmp_path: Path
+) -> None:
+    recipes = []
+    for name in ("foo", "bar"):
+        (tmp_path / name).mkdir()
+        recipe = tmp_path / name / "recipe.yaml"
+        recipe.write_text(RECIPE)
+        recipes.append(recipe)
+
+    with LintResultStore(tmp_path / "store.sqlite") as store:
+        first = lint_recipes_incremental(recipes, store=store)
+        assert len(linted) == 2
+        assert any(m.rule == "schema" for m in first[str(recipes[0])].messages)
+        assert any(m.rule == "requirement-spacing" for m in first[str(recipes[0])].messages)
+
+        recipes[1].write_text(RECIPE.replace("1.0.0", "1.0.1"))
+        second = lint_recipes_incremental(recipes, store=store)
+        assert linted == [str(recipes[0]), str(recipes[1]), str(recipes[1])]
+        assert second[str(recipes[0])] == first[str(recipes[0])]
+
+    # the results survive the process, but a new schema invalidates them
+    http_server.routes["/schema.json"] = {"body": json.dumps({"type": "object"}).encode()}
+    lint.get_recipe_schema.cache_clear()
+    lint.get_recipe_schema_validator.cache_clear()
+    with LintResultStore(tmp_path / "store.sqlite") as store:
+        third = lint_recipes_incremental(recipes, store=store)
+    assert len(linted) == 5
+    assert not any(m.rule == "schema" for m in third[str(recipes[0])].messages)
+
+
+def test_linter_hints_do_not_invalidate_results(
+    recipe_schema: str,  # noqa: ARG001
+    http_server: LocalHTTPServer,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setattr(lint_data, "HINTS_URL", http_server.url("/hints.toml"))
+    http_server.routes["/hints.toml"] = {"body": b'[hints]\nfoo = "bar"\n'}
+    key = lint_store.lint_inputs_key()
+
+    # `lint_recipe` does not use the hints, so they are not part of the key
+    http_server.routes["/hints.toml"] = {"body": b'[hints]\nfoo = "baz"\n'}
+    assert lint_store.lint_inputs_key() == key
+    assert "/hints.toml" not in http_server.requested_paths()
+
+
+def test_store_round_trip(tmp_path: Path) -> None:
+    report = lint_store.LintReport([lint_store.LintMessage("lint", "rule", "message", "out")])
+    with LintResultStore(tmp_path / "store.sqlite") as store:
+        store.put("recipe.yaml", "key", report)
+        assert store.get("recipe.yaml", "key") == report
+        assert store.get("recipe.yaml", "other key") is None
@@ -23,6 +23,22 @@ def test_render_recipe(python_recipe: Path, unix_namespace: dict[str, Any], snap
     assert snapshot == all_used_variants
 
 
+def test_sharded_render_matches_unsharded(
+    python_recipe: Path, unix_namespace: dict[str, Any]
+) -> None:
+    variants = parse_recipe_config_file(str(python_recipe / "variants.yaml"), unix_namespace)
+
+    def rendered_variants(shards: int | None) -> list[tuple[dict[str, Any], dict[str, Any]]]:
+        rendered = render(
+            str(python_recipe), variants=variants, shards=shards, platform="linux", arch="64"
+        )
+        return [(meta.meta["recipe"], meta.get_used_variant()) for meta, _, _ in rendered]
+
+    unsharded = rendered_variants(None)
+    assert len(unsharded) == 2
+    assert rendered_variants(2) == unsharded
+
+
 def test_environ_is_passed_to_rattler_build(env_recipe, snapshot) -> None:
     try:
         os.environ["TEST_SHOULD_BE_PASSED"] = "false"
@@ -89,3 +105,25 @@ def test_metadata_when_rendering_multiple_output(
 
     assert rendered[0][0].name() == "libmamba"
     assert rendered[0][0].version() == "1.5.8"
+
+
+def test_metadata_views_are_cached(feedstock_dir_with_recipe: Path, rich_recipe: Path) -> None:
+    recipe_path = feedstock_dir_with_recipe / "recipe" / "recipe.yaml"
+    (recipe_path).write_text(rich_recipe.read_text(), encoding="utf8")
+
+    metadata = render(str(recipe_path), platform="linux", arch="64")[0][0]
+
+    assert metadata.get_section("about") is metadata.get_section("about")
+    # empty sections are new objects, changing them does not change later results
+    metadata.get_section("outputs").append({"package": {"name": "other"}})
+    assert metadata.get_section("outputs") == []
+    # sections changed in place are seen by the next lookup
+    metadata.meta["recipe"]["requirements"] = {"run": ["python"]}
+    assert metadata.get_section("requirements") == {"run": ["python"]}
+    used_variant = metadata.get_used_variant()
+    used_variant["not_used"] = "1"
+    assert "not_used" not in metadata.get_used_variant()
+
+    # replacing `meta` drops the cached views
+    metadata.meta = {**metadata.meta, "build_configuration": {"variant": {"python-min": "3.9"}}}
+    assert metadata.get_used_variant() == {"python_min": "3.9"}
@@ -4,7 +4,11 @@ from pathlib import Path
 
 import pytest
 from rattler_build_conda_compat.loader import load_yaml
-from rattler_build_conda_compat.recipe_sources import get_all_url_sources
+from rattler_build_conda_compat.recipe_sources import (
+    get_all_url_mirrors,
+    get_all_url_sources,
+    get_sources_by_output,
+)
 
 
 @pytest.mark.parametrize(
@@ -24,3 +28,22 @@ def test_recipe_sources(partial_recipe: str, expected_output: list[str]) -> None
     path = Path(f"{Path(__file__).parent}/data/{partial_recipe}")
     recipe = load_yaml(path.read_text())
     assert list(get_all_url_sources(recipe)) == expected_output
+
+
+def test_recipe_url_mirrors() -> None:
+    path = Path(f"{Path(__file__).parent}/data/list_of_url_sources.yaml")
+    recipe = load_yaml(path.read_text())
+    assert list(get_all_url_sources(recipe)) == ["https://foo.com"]
+    assert list(get_all_url_mirrors(recipe)) == [["https://foo.com", "https://bar.com"]]
+
+
+def test_recipe_sources_by_output() -> None:
+    path = Path(f"{Path(__file__).parent}/data/outputs_source.yaml")
+    recipe = load_yaml(path.read_text())
+    recipe["outputs"][1]["package"] = {"name": "bar"}
+    assert [(output, source["url"]) for output, source in get_sources_by_output(recipe)] == [
+        ("bar", "https://foo.com"),
+        ("bar", "https://bar.com"),
+        ("bar", "https://baz.com"),
+        ("bar", "https://qux.com"),
+    ]
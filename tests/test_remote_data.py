@@ -0,0 +1,106 @@
+from __future__ import annotations
+
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING
+
+import pytest
+from rattler_build_conda_compat.remote_data import (
+    CACHE_DIR_ENV,
+    OFFLINE_ENV,
+    RemoteDataUnavailableError,
+    atomic_write,
+    cached_path,
+    clear_memory_cache,
+    fetch_remote_data,
+)
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+    from conftest import LocalHTTPServer
+
+
+def test_revalidates_with_etag(http_server: LocalHTTPServer) -> None:
+    http_server.routes["/schema.json"] = {"body": b"{}", "headers": {"ETag": '"abc"'}}
+    url = http_server.url("/schema.json")
+
+    assert fetch_remote_data(url) == b"{}"
+    assert cached_path(url).read_bytes() == b"{}"
+
+    # the second request is conditional and answered with a 304
+    assert fetch_remote_data(url) == b"{}"
+    assert http_server.requests[1][1]["If-None-Match"] == '"abc"'
+
+    # a changed file replaces the cached copy
+    http_server.routes["/schema.json"] = {"body": b"[]", "headers": {"ETag": '"def"'}}
+    assert fetch_remote_data(url) == b"[]"
+    assert cached_path(url).read_bytes() == b"[]"
+
+
+def test_offline_mode(http_server: LocalHTTPServer, monkeypatch: pytest.MonkeyPatch) -> None:
+    http_server.routes["/hints.toml"] = {"body": b"[hints]"}
+    url = http_server.url("/hints.toml")
+
+    with pytest.raises(RemoteDataUnavailableError):
+        fetch_remote_data(url, offline=True)
+
+    fetch_remote_data(url)
+    monkeypatch.setenv(OFFLINE_ENV, "1")
+    assert fetch_remote_data(url) == b"[hints]"
+    assert len(http_server.requests) == 1
+
+
+def test_falls_back_to_cache(http_server: LocalHTTPServer) -> None:
+    http_server.routes["/schema.json"] = {"body": b"{}"}
+    url = http_server.url("/schema.json")
+    fetch_remote_data(url)
+
+    http_server.routes["/schema.json"] = {"status": 500}
+    assert fetch_remote_data(url) == b"{}"
+
+    http_server.stop()
+    assert fetch_remote_data(url) == b"{}"
+    with pytest.raises(RemoteDataUnavailableError):
+        fetch_remote_data(http_server.url("/other.json"))
+
+
+def test_max_age(http_server: LocalHTTPServer) -> None:
+    http_server.routes["/hints.toml"] = {"body": b"[hints]", "headers": {"ETag": '"abc"'}}
+    url = http_server.url("/hints.toml")
+
+    assert fetch_remote_data(url, max_age=60) == b"[hints]"
+    assert fetch_remote_data(url, max_age=60) == b"[hints]"
+    # a new process still finds the fresh copy on disk
+    clear_memory_cache()
+    assert fetch_remote_data(url, max_age=60) == b"[hints]"
+    assert len(http_server.requests) == 1
+
+    assert fetch_remote_data(url, max_age=0) == b"[hints]"
+    assert len(http_server.requests) == 2
+
+
+def test_unwritable_cache_dir(
+    http_server: LocalHTTPServer, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    # a cache directory below a regular file can't be created
+    (tmp_path / "file").write_text("")
+    monkeypatch.setenv(CACHE_DIR_ENV, str(tmp_path / "file" / "cache"))
+    http_server.routes["/schema.json"] = {"body": b"{}", "headers": {"ETag": '"abc"'}}
+    url = http_server.url("/schema.json")
+
+    assert fetch_remote_data(url) == b"{}"
+    clear_memory_cache()
+    assert fetch_remote_data(url) == b"{}"
+    assert len(http_server.requests) == 2
+
+
+def test_concurrent_writers(tmp_path: Path) -> None:
+    path = tmp_path / "data.json"
+    contents = [bytes([i]) * 100_000 for i in range(8)]
+
+    with ThreadPoolExecutor(max_workers=len(contents)) as executor:
+        list(executor.map(lambda content: atomic_write(path, content), contents * 4))
+
+    # one writer wins completely, and no temporary file is left behind
+    assert path.read_bytes() in contents
+    assert [p.name for p in tmp_path.iterdir()] == ["data.json"]
@@ -0,0 +1,73 @@
+from __future__ import annotations
+
+import pytest
+from rattler_build_conda_compat import lint
+from rattler_build_conda_compat.requirement_spec import parse_requirement
+
+
+@pytest.mark.parametrize(
+    ("requirement", "name", "operator", "version", "build"),
+    [
+        ("python", "python", None, None, None),
+        ("python >=3.8", "python", ">=", "3.8", None),
+        ("numpy>=1.20", "numpy", ">=", "1.20", None),
+        ("numpy >= 1.20", "numpy", ">=", "1.20", None),
+        ("foo 1.2.* py_0", "foo", None, "1.2.*", "py_0"),
+        ("foo ==1.0 *_cpython", "foo", "==", "1.0", "*_cpython"),
+        ("python >=${{ python_min }}", "python", ">=", "${{ python_min }}", None),
+    ],
+)
+def test_parse_requirement(
+    requirement: str, name: str, operator: str | None, version: str | None, build: str | None
+) -> None:
+    spec = parse_requirement(requirement)
+    assert (spec.name, spec.operator, spec.version, spec.build) == (name, operator, version, build)
+
+
+@pytest.mark.parametrize(
+    ("requirement", "constraint"),
+    [
+        ("python", None),
+        ("python >=3.8", ">=3.8"),
+        ("python>=3.8", ">=3.8"),
+        ("numpy >= 1.20", ">=1.20"),
+        ("foo 1.2.* py_0", "1.2.* py_0"),
+        ("python >=${{ python_min }}", ">=${{ python_min }}"),
+    ],
+)
+def test_constraint(requirement: str, constraint: str | None) -> None:
+    spec = parse_requirement(requirement)
+    assert spec.constraint == constraint
+    assert spec.is_pinned == (constraint is not None)
+
+
+def test_jinja_requirement() -> None:
+    spec = parse_requirement("${{ pin_subpackage('foo', exact=True) }}")
+    assert spec.is_jinja
+    assert spec.name == "${{ pin_subpackage('foo', exact=True) }}"
+    assert spec.operator is None
+
+
+def test_specs_are_interned() -> None:
+    assert parse_requirement("python >=3.8") is parse_requirement("python >=3.8")
+
+
+def test_lint_rules_use_parsed_names() -> None:
+    # `python-dateutil` is not `python`
+    assert (
+        lint.lint_non_noarch_dont_constrain_python_and_rbase({"host": ["python-dateutil >=2"]})
+        == []
+    )
+    for python in ("python >=3.8", "python>=3.8"):
+        assert lint.lint_non_noarch_dont_constrain_python_and_rbase({"run": [python]}) == [
+            "Non noarch packages should have python requirement without any version constraints."
+        ]
+    assert lint.lint_lower_bound_on_python(["python >=${{ python_min }}"], []) == []
+    assert len(lint.lint_lower_bound_on_python(["python"], [])) == 1
+
+
+def test_noarch_hint_needs_a_bare_pip() -> None:
+    build = {"build": ["pip"]}
+    assert len(lint.hint_noarch_usage({}, build)) == 1
+    assert lint.hint_noarch_usage({}, {"build": ["pip >=24"]}) == []
+    assert lint.hint_noarch_usage({}, {"build": ["pip", "${{ compiler('c') }}"]}) == []
@@ -0,0 +1,81 @@
+from __future__ import annotations
+
+import io
+import json
+from typing import TYPE_CHECKING
+
+import pytest
+from rattler_build_conda_compat.source_corpus import iter_corpus_sources, write_corpus_sources
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+RECIPE = """\
+context:
+  version: "1.10"
+  name: foo
+package:
+  name: ${{ name }}
+  version: ${{ version }}
+source:
+  url:
+    - https://example.com/${{ name }}-${{ version }}.tar.gz
+    - https://mirror.example.com/${{ name }}-${{ version }}.tar.gz
+  sha256: abc
+outputs:
+  - package:
+      name: libfoo
+    source:
+      - if: win
+        then:
+          git: https://github.com/foo/foo
+        else:
+          url: https://example.com/libfoo-${{ unknown }}.zip
+          md5: def
+"""
+
+
+@pytest.mark.parametrize("max_workers", [1, 2])
+def test_iter_corpus_sources(tmp_path: Path, max_workers: int) -> None:
+    recipe = tmp_path / "recipe.yaml"
+    recipe.write_text(RECIPE)
+    broken = tmp_path / "broken.yaml"
+    broken.write_text("source: [unclosed\n")
+
+    records = sorted(
+        iter_corpus_sources([recipe, broken], max_workers=max_workers),
+        key=lambda record: (record["recipe"], record.get("url", "")),
+    )
+
+    assert records[0]["recipe"] == str(broken)
+    assert "error" in records[0]
+    assert records[1:] == [
+        {
+            "recipe": str(recipe),
+            "output": None,
+            "url": "https://example.com/foo-1.10.tar.gz",
+            "mirrors": [
+                "https://example.com/foo-1.10.tar.gz",
+                "https://mirror.example.com/foo-1.10.tar.gz",
+            ],
+            "hashes": {"sha256": "abc"},
+        },
+        {
+            "recipe": str(recipe),
+            "output": "libfoo",
+            "url": "https://example.com/libfoo-${{ unknown }}.zip",
+            "mirrors": ["https://example.com/libfoo-${{ unknown }}.zip"],
+            "hashes": {"md5": "def"},
+        },
+    ]
+
+
+def test_write_corpus_sources(tmp_path: Path) -> None:
+    recipe = tmp_path / "recipe.yaml"
+    recipe.write_text(RECIPE)
+
+    out = io.StringIO()
+    assert write_corpus_sources([recipe], out, max_workers=1, render=False) == 2
+
+    records = [json.loads(line) for line in out.getvalue().splitlines()]
+    assert records[0]["url"] == "https://example.com/${{ name }}-${{ version }}.tar.gz"
@@ -0,0 +1,75 @@
+from __future__ import annotations
+
+import os
+from typing import TYPE_CHECKING
+
+from rattler_build_conda_compat.source_index import SourceIndex, SourceReference, normalize_url
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+
+def _write_recipe(path: Path, url: str, sha256: str = "ABC") -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(
+        f"""\
+context:
+  version: 1.0
+source:
+  url: {url}
+  sha256: {sha256}
+outputs:
+  - package:
+      name: libfoo
+    source:
+      url:
+        - https://mirror.example.org/libfoo.tar.gz
+        - https://MIRROR.example.org:443/libfoo.tar.gz
+"""
+    )
+
+
+def test_normalize_url() -> None:
+    assert normalize_url("HTTPS://User@Example.COM:443/A/b.tar.gz#frag") == (
+        "https://example.com/A/b.tar.gz"
+    )
+    assert normalize_url("http://example.com:8080/x") == "http://example.com:8080/x"
+
+
+def test_source_index(tmp_path: Path) -> None:
+    foo = tmp_path / "foo" / "recipe.yaml"
+    bar = tmp_path / "bar" / "recipe.yaml"
+    _write_recipe(foo, "https://example.com/foo-${{ version }}.tar.gz")
+    _write_recipe(bar, "https://example.com/bar.tar.gz", sha256="def")
+
+    with SourceIndex(tmp_path / "index.sqlite") as index:
+        assert sorted(index.update([foo, bar])) == sorted([str(foo), str(bar)])
+
+        assert index.recipes_for_url("https://Example.com/foo-1.0.tar.gz") == [
+            SourceReference(str(foo), None)
+        ]
+        assert index.recipes_for_host("EXAMPLE.com") == [
+            SourceReference(str(bar), None),
+            SourceReference(str(foo), None),
+        ]
+        assert index.recipes_for_host("mirror.example.org") == [
+            SourceReference(str(bar), "libfoo"),
+            SourceReference(str(foo), "libfoo"),
+        ]
+        assert index.recipes_for_sha256("abc") == [SourceReference(str(foo), None)]
+
+        # unchanged recipes are not read again
+        assert index.update([foo, bar]) == []
+
+        _write_recipe(foo, "https://other.org/foo.tar.gz")
+        stat = os.stat(foo)
+        os.utime(foo, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+        assert index.update([foo, bar]) == [str(foo)]
+        assert index.recipes_for_host("example.com") == [SourceReference(str(bar), None)]
+        assert index.recipes_for_host("other.org") == [SourceReference(str(foo), None)]
+
+    # the index is persistent, and pruning drops recipes that are gone
+    with SourceIndex(tmp_path / "index.sqlite") as index:
+        assert index.recipes_for_sha256("def") == [SourceReference(str(bar), None)]
+        assert index.update([foo], prune=True) == [str(bar)]
+        assert index.recipes_for_sha256("def") == []
@@ -1,4 +1,12 @@
-from rattler_build_conda_compat.utils import has_recipe
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+import pytest
+from rattler_build_conda_compat.utils import IGNORED_DIRS, StatCache, find_recipe, has_recipe
+
+if TYPE_CHECKING:
+    from pathlib import Path
 
 
 def test_recipe_is_present(recipe_dir) -> None:
@@ -7,3 +15,38 @@ def test_recipe_is_present(recipe_dir) -> None:
 
 def test_recipe_is_absent(old_recipe_dir) -> None:
     assert has_recipe(old_recipe_dir) is False
+
+
+def test_find_recipe_prefers_top_level_recipe(tmp_path: Path) -> None:
+    (tmp_path / "recipe.yaml").touch()
+    (tmp_path / "nested").mkdir()
+    (tmp_path / "nested" / "recipe.yaml").touch()
+
+    assert find_recipe(tmp_path) == str(tmp_path / "recipe.yaml")
+
+
+def test_find_recipe_prunes_ignored_dirs(tmp_path: Path) -> None:
+    for ignored in ("build_artifacts", ".git", "vendored"):
+        (tmp_path / ignored).mkdir()
+        (tmp_path / ignored / "recipe.yaml").touch()
+    (tmp_path / "recipe").mkdir()
+    (tmp_path / "recipe" / "recipe.yaml").touch()
+
+    with pytest.raises(OSError, match="More than one"):
+        find_recipe(tmp_path)
+    assert find_recipe(tmp_path, ignores=(*IGNORED_DIRS, "vend*")) == str(
+        tmp_path / "recipe" / "recipe.yaml"
+    )
+
+
+def test_find_recipe_with_stat_cache(tmp_path: Path) -> None:
+    (tmp_path / "recipe").mkdir()
+    (tmp_path / "recipe" / "recipe.yaml").touch()
+
+    stat_cache = StatCache()
+    assert find_recipe(tmp_path, stat_cache=stat_cache) == str(tmp_path / "recipe" / "recipe.yaml")
+
+    # the listings are reused, even after the tree changed
+    (tmp_path / "recipe" / "recipe.yaml").unlink()
+    assert has_recipe(tmp_path, stat_cache=stat_cache)
+    assert not has_recipe(tmp_path)
@@ -0,0 +1,83 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any
+
+from rattler_build_conda_compat.variant_index import (
+    VariantIndex,
+    VariantUsage,
+    feedstock_inputs_key,
+)
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+
+class RenderedOutput:
+    """The part of `render.MetaData` that the index uses."""
+
+    def __init__(self, name: str, used_variant: dict[str, Any]) -> None:
+        self._name = name
+        self._used_variant = used_variant
+
+    def name(self) -> str:
+        return self._name
+
+    def get_used_variant(self) -> dict[str, Any]:
+        return self._used_variant
+
+
+def test_variant_index(tmp_path: Path) -> None:
+    with VariantIndex(tmp_path / "index.sqlite") as index:
+        index.update_from_metadata(
+            "numpy-feedstock",
+            [
+                RenderedOutput("numpy", {"python": "3.12", "target_platform": "linux-64"}),
+                RenderedOutput("numpy", {"python": "3.13", "target_platform": "linux-64"}),
+            ],
+            key="a",
+        )
+        index.update("scipy-feedstock", [("scipy", {"python": "3.12", "numpy": "2"})], key="b")
+
+        assert index.affected_feedstocks("python") == ["numpy-feedstock", "scipy-feedstock"]
+        assert index.affected_feedstocks("python", "3.13") == ["numpy-feedstock"]
+        assert index.usages("numpy") == [VariantUsage("scipy-feedstock", "scipy", "2")]
+        assert index.is_current("numpy-feedstock", "a")
+        assert not index.is_current("numpy-feedstock", "b")
+
+        # a new render replaces what was known about the feedstock
+        index.update("scipy-feedstock", [("scipy", {"python": "3.13"})], key="c")
+        assert index.affected_feedstocks("numpy") == []
+
+    with VariantIndex(tmp_path / "index.sqlite") as index:
+        assert index.affected_feedstocks("python", "3.13") == [
+            "numpy-feedstock",
+            "scipy-feedstock",
+        ]
+        index.remove("numpy-feedstock")
+        assert index.affected_feedstocks("target-platform") == []
+
+
+def test_variant_keys_are_normalized(tmp_path: Path) -> None:
+    with VariantIndex(tmp_path / "index.sqlite") as index:
+        index.update("foo-feedstock", [("foo", {"c-compiler": "gcc", "cxx_compiler": "gxx"})])
+
+        assert index.usages("c_compiler") == [VariantUsage("foo-feedstock", "foo", "gcc")]
+        assert index.usages("c-compiler") == index.usages("c_compiler")
+        assert index.affected_feedstocks("cxx-compiler") == ["foo-feedstock"]
+
+
+def test_feedstock_inputs_key(tmp_path: Path) -> None:
+    (tmp_path / "recipe.yaml").write_text("package:\n  name: foo\n")
+
+    key = feedstock_inputs_key(tmp_path)
+    assert feedstock_inputs_key(tmp_path) == key
+
+    (tmp_path / "variants.yaml").write_text("numpy:\n  - 2\n")
+    assert feedstock_inputs_key(tmp_path) != key
+
+    # the key does not depend on where the feedstock is checked out
+    moved = tmp_path / "moved"
+    moved.mkdir()
+    for name in ("recipe.yaml", "variants.yaml"):
+        (moved / name).write_bytes((tmp_path / name).read_bytes())
+    assert feedstock_inputs_key(moved) == feedstock_inputs_key(tmp_path)
@@ -0,0 +1,332 @@
+from __future__ import annotations
+
+import itertools
+import json
+from typing import Any
+
+import pytest
+from rattler_build_conda_compat.variants import (
+    VariantSpace,
+    dedupe_rendered_recipes,
+    merge_rendered_recipes,
+    shard_variant_config,
+    variant_space,
+)
+
+SPEC = {
+    "python": ["3.11", "3.12", "3.13"],
+    "numpy": ["2.0", "2.0", "2.1"],
+    "cuda_compiler_version": ["None", "12.0"],
+    "c_compiler": ["gcc"],
+    "zip_keys": [["python", "numpy"]],
+    "pin_run_as_build": {"python": {"min_pin": "x.x"}},
+}
+
+
+def test_variant_space() -> None:
+    space = VariantSpace.from_spec(SPEC)
+
+    assert len(space) == 6
+    variants = list(space)
+    assert len(variants) == 6
+    assert variants[0] == {
+        "cuda_compiler_version": "None",
+        "c_compiler": "gcc",
+        "python": "3.11",
+        "numpy": "2.0",
+        "zip_keys": [["python", "numpy"]],
+        "pin_run_as_build": {"python": {"min_pin": "x.x"}},
+    }
+    assert {(v["python"], v["numpy"]) for v in variants} == {
+        ("3.11", "2.0"),
+        ("3.12", "2.0"),
+        ("3.13", "2.1"),
+    }
+
+
+def test_variant_space_restrict() -> None:
+    space = VariantSpace.from_spec(SPEC).restrict(["numpy", "c_compiler"])
+
+    # only the used part of the zip group is kept, and equal points are merged
+    assert len(space) == 2
+    assert list(space) == [
+        {"c_compiler": "gcc", "numpy": "2.0"},
+        {"c_compiler": "gcc", "numpy": "2.1"},
+    ]
+
+
+def test_variant_space_matching() -> None:
+    space = VariantSpace.from_spec(SPEC)
+    variants = list(space)
+
+    used = {"python": "3.12", "c_compiler": "gcc", "target_platform": "linux-64"}
+    assert list(space.matching(used)) == [
+        variant
+        for variant in variants
+        if all(variant[key] == value for key, value in used.items() if key in variant)
+    ]
+    assert len(space.matching({"python": "3.12", "numpy": "2.1"})) == 0
+    assert len(space.matching({"pin_run_as_build": {}})) == 0
+
+
+def test_variant_space_count_only() -> None:
+    spec = {f"key{i}": [str(v) for v in range(10)] for i in range(12)}
+
+    # 10**12 variants are counted, but never generated
+    space = VariantSpace.from_spec(spec)
+    assert len(space) == 10**12
+    assert len(space.restrict(["key0", "key1"])) == 100
+
+
+def test_variant_space_zip_length_mismatch() -> None:
+    with pytest.raises(ValueError, match="different lengths"):
+        VariantSpace.from_spec({"a": ["1", "2"], "b": ["1"], "zip_keys": [["a", "b"]]})
+
+
+def test_variant_space_filtered_by_specs() -> None:
+    specs = {
+        "internal_defaults": {"c_compiler": ["gcc"]},
+        "conda_build_config.yaml": {"python": ["3.11", "3.12", "3.13"]},
+        "argument_variants": {"python": ["3.12"], "cuda_compiler_version": ["11.8"]},
+    }
+
+    space = variant_space(SPEC, specs, used_keys=["python", "cuda_compiler_version"])
+
+    # a filter that would remove every variant is ignored
+    assert list(space) == [
+        {"cuda_compiler_version": "None", "python": "3.12"},
+        {"cuda_compiler_version": "12.0", "python": "3.12"},
+    ]
+
+
+def _explode(spec: dict[str, Any]) -> list[dict[str, Any]]:
+    # every variant of the spec, the way conda-build's `explode_variants` spans them
+    groups = [tuple(group) for group in spec.get("zip_keys", [])]
+    zipped = {key for group in groups for key in group}
+    pass_through = {"zip_keys", "extend_keys", "pin_run_as_build"}
+    axes = [
+        [{key: value} for value in values]
+        for key, values in spec.items()
+        if key not in pass_through and key not in zipped
+    ]
+    axes += [
+        [dict(zip(group, point)) for point in zip(*(spec[k] for k in group))] for group in groups
+    ]
+    constants = {key: spec[key] for key in pass_through if key in spec}
+    return [
+        {**{k: v for part in parts for k, v in part.items()}, **constants}
+        for parts in itertools.product(*axes)
+    ]
+
+
+def _filter_combined_spec_to_used_keys(
+    combined_spec: dict[str, Any], specs: dict[str, dict[str, Any]]
+) -> list[dict[str, Any]]:
+    # conda-build's unoptimised filter over the exploded variants
+    extend_keys = combined_spec.get("extend_keys", [])
+    variants = _explode(combined_spec)
+    for source, source_spec in reversed(specs.items()):
+        if source == "internal_defaults":
+            continue
+        for key, values in source_spec.items():
+            if key in extend_keys or hasattr(values, "keys"):
+                continue
+            filtered = [v for v in variants if v.get(key) is not None and v.get(key) in values]
+            variants = filtered or variants
+    return variants
+
+
+def _sorted(variants: Any) -> list[str]:  # noqa: ANN401
+    return sorted(json.dumps(variant, sort_keys=True) for variant in variants)
+
+
+def test_variant_space_filtered_like_conda_build() -> None:
+    specs = {
+        "internal_defaults": {"c_compiler": ["gcc"], "python": ["3.10"]},
+        "conda_build_config.yaml": {
+            "python": ["3.11", "3.12", "3.13"],
+            "cuda_compiler_version": ["None", "12.0"],
+            "zip_keys": [["python", "numpy"]],
+        },
+        "variants.yaml": {"python": ["3.12", "3.13"], "numpy": ["2.0", "2.1"]},
+        "argument_variants": {"python": ["3.11", "3.12"], "cuda_compiler_version": ["11.8"]},
+    }
+
+    space = variant_space(SPEC, specs)
+
+    # every spec narrows the variants, not only the one with the highest priority for a key
+    expected = _filter_combined_spec_to_used_keys(SPEC, specs)
+    assert [v["python"] for v in expected] == ["3.12", "3.12"]
+    assert len(space) == len(expected)
+    assert _sorted(space) == _sorted(expected)
+
+    used_keys = ["python", "cuda_compiler_version"]
+    restricted = variant_space(SPEC, specs, used_keys=used_keys)
+    assert _sorted(restricted) == _sorted(
+        {key: variant[key] for key in used_keys} for variant in expected
+    )
+
+
+def test_variant_space_is_a_sequence() -> None:
+    space = VariantSpace.from_spec(SPEC)
+    variants = list(space)
+
+    assert [space[i] for i in range(len(space))] == variants
+    assert space[-1] == variants[-1]
+    assert space[1:4] == variants[1:4]
+    assert variants[2] in space
+    with pytest.raises(IndexError):
+        space[len(space)]
+
+    # a large space is indexed without generating the variants before the index
+    large = VariantSpace.from_spec({f"key{i}": [str(v) for v in range(10)] for i in range(12)})
+    assert large[-1] == {f"key{i}": "9" for i in range(12)}
+    assert large[123] == {
+        **{f"key{i}": "0" for i in range(9)},
+        "key9": "1",
+        "key10": "2",
+        "key11": "3",
+    }
+
+
+def test_shard_variant_config() -> None:
+    config = {
+        "python": ["3.10", "3.11", "3.12", "3.13"],
+        "numpy": ["1.26", "2.0", "2.0", "2.1"],
+        "mpi": ["openmpi", "mpich"],
+        "zip_keys": [["python", "numpy"]],
+    }
+
+    shards = shard_variant_config(config, 3)
+
+    # the zip group has the most values, and is split without breaking up its pairs
+    assert [shard["python"] for shard in shards] == [["3.10", "3.11"], ["3.12"], ["3.13"]]
+    assert [shard["numpy"] for shard in shards] == [["1.26", "2.0"], ["2.0"], ["2.1"]]
+    assert all(shard["mpi"] == ["openmpi", "mpich"] for shard in shards)
+    assert sum(len(VariantSpace.from_spec(shard)) for shard in shards) == len(
+        VariantSpace.from_spec(config)
+    )
+
+    assert shard_variant_config(config, 1) == [config]
+    assert shard_variant_config({"python": ["3.12"]}, 4) == [{"python": ["3.12"]}]
+
+
+def test_merge_rendered_recipes() -> None:
+    def rendered(name: str, python: str, mpi: str, shard: int) -> dict[str, Any]:
+        return {
+            "recipe": {"package": {"name": name}},
+            "build_configuration": {
+                "variant": {"python": python, "mpi": mpi},
+                "directories": f"/bld/{shard}",
+                "timestamp": shard,
+                "subpackages": {name: shard},
+            },
+        }
+
+    variants = {"python": ["3.10", "3.11", "3.12"], "mpi": ["openmpi", "mpich"]}
+    merged = merge_rendered_recipes(
+        [
+            [
+                rendered("lib", "3.12", "openmpi", 1),
+                rendered("pkg", "3.10", "openmpi", 1),
+                rendered("pkg", "3.10", "mpich", 1),
+            ],
+            [
+                rendered("lib", "3.12", "openmpi", 2),
+                rendered("pkg", "3.11", "openmpi", 2),
+                rendered("pkg", "3.11", "mpich", 2),
+                rendered("pkg", "3.12", "openmpi", 2),
+            ],
+        ],
+        variants,
+    )
+
+    # in output order, and within an output in the order of the product over the sorted keys
+    assert [
+        (r["recipe"]["package"]["name"], *r["build_configuration"]["variant"].values())
+        for r in merged
+    ] == [
+        ("lib", "3.12", "openmpi"),
+        ("pkg", "3.10", "openmpi"),
+        ("pkg", "3.11", "openmpi"),
+        ("pkg", "3.12", "openmpi"),
+        ("pkg", "3.10", "mpich"),
+        ("pkg", "3.11", "mpich"),
+    ]
+    assert merged[0]["build_configuration"]["timestamp"] == 1
+
+
+def _render_like_rattler_build(
+    config: dict[str, Any], outputs: dict[str, list[str]]
+) -> list[dict[str, Any]]:
+    # the outputs in order, and the variants of every output as the product over the sorted
+    # used keys, where zipped keys go together
+    rendered = []
+    for name, used_keys in outputs.items():
+        dimensions = []
+        for group in config["zip_keys"]:
+            keys = sorted(key for key in group if key in used_keys)
+            if keys:
+                columns = zip(*(config[key] for key in keys))
+                dimensions.append([dict(zip(keys, point)) for point in dict.fromkeys(columns)])
+        zipped = {key for group in config["zip_keys"] for key in group}
+        dimensions += [
+            [{key: value} for value in dict.fromkeys(config[key])]
+            for key in used_keys
+            if key not in zipped
+        ]
+        dimensions.sort(key=lambda dimension: sorted(dimension[0]))
+        for parts in itertools.product(*dimensions):
+            variant = {key: value for part in parts for key, value in part.items()}
+            rendered.append(
+                {"recipe": {"package": {"name": name}}, "build_configuration": {"variant": variant}}
+            )
+    return rendered
+
+
+def test_merged_order_is_the_unsharded_order() -> None:
+    config = {
+        "python": ["3.10", "3.11", "3.12", "3.13"],
+        "numpy": ["2.1", "2.0", "2.0", "2.1"],
+        "cuda_compiler_version": ["None", "12.0"],
+        "mpi": ["openmpi", "mpich"],
+        "zip_keys": [["python", "numpy"]],
+    }
+    outputs = {
+        "lib": ["mpi", "cuda_compiler_version"],
+        "pkg": ["numpy", "python", "mpi"],
+        "pkg-numpy": ["numpy"],
+        "doc": [],
+    }
+
+    unsharded = _render_like_rattler_build(config, outputs)
+    for count in (2, 3, 4):
+        shards = shard_variant_config(config, count)
+        merged = merge_rendered_recipes(
+            [_render_like_rattler_build(shard, outputs) for shard in shards], config
+        )
+        assert merged == unsharded
+
+
+def test_dedupe_rendered_recipes() -> None:
+    def rendered(noarch: str | None, variant: dict[str, str]) -> dict[str, Any]:
+        build = {"noarch": noarch} if noarch else {}
+        return {
+            "recipe": {"package": {"name": "pkg"}, "build": build},
+            "build_configuration": {"variant": variant},
+        }
+
+    deduped = dedupe_rendered_recipes(
+        [
+            rendered("python", {"target_platform": "linux-64", "python-min": "3.9"}),
+            rendered("python", {"target_platform": "osx-64", "python_min": "3.9"}),
+            rendered(None, {"target_platform": "linux-64"}),
+            rendered(None, {"target_platform": "osx-64"}),
+        ]
+    )
+
+    assert [len(covered) for _, covered in deduped] == [2, 1, 1]
+    assert deduped[0][1] == [
+        {"target_platform": "linux-64", "python-min": "3.9"},
+        {"target_platform": "osx-64", "python_min": "3.9"},
+    ]